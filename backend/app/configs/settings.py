@@ -13,10 +13,75 @@ class Settings(BaseSettings):
     BACKEND_SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: str
+    AUTH_TOKEN_CACHE_SIZE: int = 10000
+    AUTH_TOKEN_CACHE_TTL: float = 300.0
+    MAIN_SERVICE_VERIFY_ACCESS_TOKEN_URL: str | None = None
+    MAIN_SERVICE_TIMEOUT: float = 5.0
 
     DEBUG: bool
     LOG_LEVEL: str = "WARNING"
     LOG_PATH: str = "log"
+    LOG_FILE_LEVEL: str = "DEBUG"
+    LOG_MODULE_LEVELS: dict[str, str] = {}  # JSON: {"app.src.api.rabbitmq.publisher": "WARNING"}
+    LOG_JSON: bool = False
+    LOG_ENQUEUE: bool = True
+    LOG_ROTATION_MB: int = 50
+
+    RMQ_HOSTS: str = "rabbitmq-local"
+    RMQ_CONNECT_ATTEMPTS: int = 10
+    RMQ_CONNECT_TIMEOUT: float = 10.0
+    RMQ_RECONNECT_BACKOFF_INITIAL: float = 0.5
+    RMQ_RECONNECT_BACKOFF_MULTIPLIER: float = 2.0
+    RMQ_RECONNECT_BACKOFF_MAX: float = 30.0
+    RMQ_DECLARE_CONCURRENCY: int = 16
+    # Пересоздавать обменники и очереди с изменёнными параметрами (сообщения очередей теряются)
+    RMQ_TOPOLOGY_RECREATE: bool = False
+    RMQ_CONFIG_CACHE_DIR: str = ".cache"
+    RMQ_CONFIG_READY_STATE_FILE: str = "config_ready.json"
+    RMQ_CONFIG_WATCH: bool = False
+    RMQ_CONFIG_WATCH_INTERVAL: float = 1.0
+    RMQ_CONFIG_WATCH_DEBOUNCE: float = 0.5
+    RMQ_BACKGROUND_SETUP: bool = False
+    RMQ_HEALTH_PROBE_INTERVAL: float = 5.0
+    RMQ_HEALTH_PROBE_TIMEOUT: float = 5.0
+    RMQ_HEALTH_HEARTBEAT_TIMEOUT: float = 120.0
+    # Порог отставания потребителя (готовых сообщений в очереди) для readiness; 0 - не проверять
+    RMQ_HEALTH_LAG_THRESHOLD: int = 0
+    RMQ_CHANNEL_POOL_SIZE: int = 16
+    RMQ_CHANNEL_ACQUIRE_TIMEOUT: float = 10.0
+    RMQ_PUBLISH_CONFIRM_WINDOW: int = 1024
+    RMQ_INGRESS_HIGH_WATER_MARK: int = 10000
+    RMQ_INGRESS_WORKERS: int = 4
+    RMQ_INGRESS_RETRY_AFTER: int = 5
+    RMQ_CODEC: str = "json"  # json | msgpack
+    RMQ_COMPRESSION: str = "none"  # none | zlib | zstd
+    RMQ_COMPRESSION_MIN_BYTES: int = 1024
+    RMQ_CONSUMER_PREFETCH: int = 100
+    RMQ_CONSUMER_ACK_BATCH_SIZE: int = 50
+    RMQ_CONSUMER_ACK_FLUSH_INTERVAL: float = 0.05
+    RMQ_CONSUMER_DRAIN_TIMEOUT: float = 30.0
+    RMQ_DEDUP_CACHE_SIZE: int = 10000
+    RMQ_BROWSE_MAX_LIMIT: int = 1000
+    RMQ_BROWSE_MAX_SCAN: int = 10000
+    RMQ_BROWSE_TIMEOUT: float = 30.0
+    RMQ_BROWSE_MAX_BODY_BYTES: int = 65536
+    RMQ_REDRIVE_RATE_LIMIT: float = 500.0
+    RMQ_REDRIVE_BATCH_SIZE: int = 100
+    RMQ_REDRIVE_HISTORY_SIZE: int = 100
+    RMQ_RPC_TIMEOUT: float = 30.0
+    RMQ_RPC_MAX_IN_FLIGHT: int = 10000
+    RMQ_RPC_LATENCY_WINDOW: int = 1024
+    RMQ_LEADER_ELECTION: str = "lock"  # lock | queue | none
+    RMQ_LEADER_LOCK_FILE: str = "/tmp/api-orchestrator.leader.lock"
+    RMQ_LEADER_QUEUE: str = "orchestrator.leader"
+    RMQ_LEADER_RETRY_INTERVAL: float = 5.0
+    RMQ_ROUTING_QUEUE: str = "main.events"
+    RMQ_ROUTING_VHOST: str = "/"
+    RMQ_ROUTING_PREFETCH: int = 100
+
+    RMQ_MANAGEMENT_URL: str = "http://rabbitmq-local:15672/api"
+    RMQ_MANAGEMENT_CACHE_TTL: float = 1.0
+    RMQ_MANAGEMENT_TIMEOUT: float = 5.0
 
 
 @lru_cache()
@@ -1,19 +1,101 @@
 import json
+import time
 
+import httpx
+import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import APIKeyHeader, HTTPAuthorizationCredentials, HTTPBearer
-# from httpx import AsyncClient, Response
-# from jose import jwt
-from datetime import datetime, timedelta
 
 from app.src.api.auth.models import TokenBearer, TokenData
 from app.configs.settings import get_settings
-# from app.src.core.constants.constants import MAIN_SERVICE_VERIFY_ACCESS_TOKEN_URL
+from app.src.core.cache import TTLCache
 
 oauth2_scheme = HTTPBearer(bearerFormat='JWT', auto_error=False)
 config = get_settings()
 
 
+class TokenVerifier:
+    """
+    Проверка JWT с кешем результатов.
+
+    Подпись проверяется локально ключом BACKEND_SECRET_KEY. Проверенные токены
+    хранятся в LRU-кеше не дольше cache_ttl и не дольше их exp, поэтому
+    повторный запрос с тем же токеном стоит одного поиска в словаре. Если
+    задан remote_url, токены с чужой подписью проверяются в main сервисе
+    через один общий пул соединений.
+    """
+
+    def __init__(
+        self,
+        secret_key: str,
+        algorithm: str,
+        cache_size: int = 10000,
+        cache_ttl: float = 300.0,
+        remote_url: str | None = None,
+        remote_timeout: float = 5.0
+    ):
+        self._secret_key = secret_key
+        self._algorithms = [algorithm]
+        self._cache_ttl = cache_ttl
+        self._cache = TTLCache(ttl=cache_ttl, max_entries=cache_size)
+        self._remote_url = remote_url
+        self._remote_client = httpx.AsyncClient(timeout=remote_timeout) if remote_url else None
+
+    async def close(self) -> None:
+        if self._remote_client:
+            await self._remote_client.aclose()
+
+    async def verify(self, token: str) -> dict:
+        """Возвращает содержимое токена или выбрасывает HTTPException."""
+        found, claims = self._cache.get(token)
+        if found:
+            return claims
+
+        try:
+            claims = jwt.decode(token, self._secret_key, algorithms=self._algorithms)
+        except jwt.ExpiredSignatureError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except jwt.InvalidTokenError as e:
+            if self._remote_client is None:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+            claims = await self._verify_remote(token)
+
+        ttl = self._ttl_for(claims)
+        if ttl > 0:
+            self._cache.set(token, claims, ttl=ttl)
+        return claims
+
+    # ==== Приватные методы / помощники ====
+    async def _verify_remote(self, token: str) -> dict:
+        """Проверяет токен через main сервис."""
+        headers = {'Token': self._secret_key}
+        data = {'access_token': token, 'token_type': 'bearer'}
+
+        response = await self._remote_client.post(url=self._remote_url, json=data, headers=headers)
+
+        if response.status_code == status.HTTP_200_OK:
+            return json.loads(response.content.decode('utf-8'))
+        else:
+            detail = json.loads(response.content.decode('utf-8')).get('detail')
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+    def _ttl_for(self, claims: dict) -> float:
+        exp = claims.get('exp') if isinstance(claims, dict) else None
+        if not isinstance(exp, (int, float)):
+            return self._cache_ttl
+        return min(self._cache_ttl, exp - time.time())
+
+
+token_verifier = TokenVerifier(
+    secret_key=config.BACKEND_SECRET_KEY,
+    algorithm=config.ALGORITHM,
+    cache_size=config.AUTH_TOKEN_CACHE_SIZE,
+    cache_ttl=config.AUTH_TOKEN_CACHE_TTL,
+    remote_url=config.MAIN_SERVICE_VERIFY_ACCESS_TOKEN_URL,
+    remote_timeout=config.MAIN_SERVICE_TIMEOUT
+)
+
+
 def create_access_token(token_data: TokenData) -> TokenBearer:
     """
     Создает bearer токен
@@ -33,7 +115,7 @@ def create_access_token(token_data: TokenData) -> TokenBearer:
 
 async def verify_access_token(token: str) -> dict:
     """
-    Проверяет JWT токен credentials через main сервис
+    Проверяет JWT токен: локально по подписи, с кешем, при необходимости через main сервис
 
     Args:
         token (str): Содержимое токена.
@@ -41,19 +123,7 @@ async def verify_access_token(token: str) -> dict:
     Returns:
         dict: Содержимое JWT токен после проверки.
     """
-    async with AsyncClient() as client:
-        service_key = config.BACKEND_SECRET_KEY
-        url = MAIN_SERVICE_VERIFY_ACCESS_TOKEN_URL
-        headers = {'Token': service_key}
-        data = {'access_token': token, 'token_type': 'bearer'}
-
-        response: Response = await client.post(url=url, json=data, headers=headers)
-
-        if response.status_code == status.HTTP_200_OK:
-            return json.loads(response.content.decode('utf-8'))
-        else:
-            detail = json.loads(response.content.decode('utf-8')).get('detail')
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+    return await token_verifier.verify(token)
 
 
 async def access_token(token: HTTPAuthorizationCredentials = Depends(oauth2_scheme)) -> dict | None:
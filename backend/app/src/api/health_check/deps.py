@@ -0,0 +1,5 @@
+from fastapi import Request
+
+
+async def get_health_monitor(request: Request):
+    return request.app.state.health_monitor
@@ -0,0 +1,210 @@
+import asyncio
+import time
+from contextlib import suppress
+from dataclasses import asdict, dataclass, field, replace
+
+from app.configs.settings import get_settings
+from app.src.api.rabbitmq.client import RabbitMQClient
+from app.src.api.rabbitmq.connection import VhostConnection
+from app.src.core.logging import logger
+
+config = get_settings()
+
+
+@dataclass
+class VhostHealth:
+    """Состояние соединения с vhost на момент проверки."""
+    vhost: str
+    connected: bool
+    blocked: bool
+    heartbeat_age_s: float | None
+    channels_in_use: int
+    channels_waiting: int
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class QueueLag:
+    """Готовые к доставке сообщения очереди, которую потребляет процесс."""
+    queue: str
+    vhost: str
+    messages: int | None
+    lagging: bool
+    error: str | None = None
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class HealthState:
+    """Снимок здоровья, который отдают /health/live и /health/ready."""
+    live: bool
+    ready: bool
+    reasons: list[str] = field(default_factory=list)
+    checked_at: float | None = None
+    role: str | None = None
+    infrastructure_applied: bool = False
+    vhosts: list[VhostHealth] = field(default_factory=list)
+    queues: list[QueueLag] = field(default_factory=list)
+    error: str | None = None
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        data["age_s"] = round(time.time() - self.checked_at, 3) if self.checked_at else None
+        return data
+
+
+class HealthMonitor:
+    """
+    Фоновая проверка здоровья клиента RabbitMQ.
+
+    Раз в interval секунд собирает состояние соединений (разрыв,
+    connection.blocked, давность последнего кадра от брокера), пула каналов,
+    применённой инфраструктуры и отставания потребителей (passive declare
+    потребляемых очередей). Пробы Kubernetes читают готовый снимок и не
+    открывают соединений с брокером, как бы часто их ни вызывали.
+
+    Liveness зависит только от того, что цикл проверки крутится: если снимок
+    устарел, event loop завис или задача упала - процесс нужно перезапустить.
+    Недоступность брокера - повод снять под с балансировки (readiness), а не
+    перезапускать его.
+    """
+
+    def __init__(
+        self,
+        client: RabbitMQClient,
+        interval: float = config.RMQ_HEALTH_PROBE_INTERVAL,
+        timeout: float = config.RMQ_HEALTH_PROBE_TIMEOUT,
+        heartbeat_timeout: float = config.RMQ_HEALTH_HEARTBEAT_TIMEOUT,
+        lag_threshold: int = config.RMQ_HEALTH_LAG_THRESHOLD
+    ):
+        self.interval = interval
+        self.timeout = timeout
+        self.heartbeat_timeout = heartbeat_timeout
+        self.lag_threshold = lag_threshold
+        self._client = client
+        self._state = HealthState(live=True, ready=False, reasons=["not checked yet"])
+        self._checked_monotonic: float | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def state(self) -> HealthState:
+        """Последний снимок; устаревший снимок означает, что цикл проверки не работает."""
+        state = self._state
+        if self._checked_monotonic is not None and self._is_stale():
+            reason = f"health probe stale for {time.monotonic() - self._checked_monotonic:.1f}s"
+            return replace(state, live=False, ready=False, reasons=[reason])
+        return state
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def probe(self) -> HealthState:
+        """Одна проверка: обновляет и возвращает снимок."""
+        try:
+            async with asyncio.timeout(self.timeout):
+                state = await self._collect()
+        except TimeoutError:
+            state = HealthState(live=True, ready=False, reasons=[f"health probe timed out after {self.timeout}s"])
+        except Exception as e:
+            state = HealthState(live=True, ready=False, reasons=[f"health probe failed: {e}"], error=str(e))
+        state.checked_at = time.time()
+        if state.ready != self._state.ready:
+            log = logger.info if state.ready else logger.warning
+            log(f"Готовность RabbitMQ: {state.ready} {state.reasons or ''}".rstrip())
+        self._state = state
+        self._checked_monotonic = time.monotonic()
+        return state
+
+    # ==== Приватные методы / помощники ====
+    async def _run(self) -> None:
+        while True:
+            await self.probe()
+            await asyncio.sleep(self.interval)
+
+    def _is_stale(self) -> bool:
+        return time.monotonic() - self._checked_monotonic > 3 * self.interval + self.timeout
+
+    async def _collect(self) -> HealthState:
+        client = self._client
+        readiness = client.readiness()
+        reasons: list[str] = []
+        if readiness["error"]:
+            reasons.append(f"startup failed: {readiness['error']}")
+        # Топологию применяет только ведущий: ведомому достаточно загруженной конфигурации
+        if readiness["role"] == "follower":
+            prepared, missing = readiness["config_loaded"], "infrastructure config not loaded"
+        else:
+            prepared, missing = readiness["infrastructure_applied"], "infrastructure not applied"
+        if not prepared:
+            reasons.append(missing)
+        elif not readiness["ready"]:
+            reasons.append("infrastructure setup in progress")
+
+        vhost_connections = client.vhost_connections()
+        if not vhost_connections:
+            reasons.append("not connected")
+        vhosts = [self._vhost_health(vhost_connection) for vhost_connection in vhost_connections]
+        for vhost in vhosts:
+            if not vhost.connected:
+                reasons.append(f"vhost '{vhost.vhost}' disconnected")
+            elif vhost.heartbeat_age_s is not None and vhost.heartbeat_age_s > self.heartbeat_timeout:
+                reasons.append(f"vhost '{vhost.vhost}' no frames from broker for {vhost.heartbeat_age_s:.0f}s")
+
+        queues = await self._queue_lags({vhost.vhost for vhost in vhosts if vhost.connected})
+        for queue in queues:
+            if queue.lagging:
+                reasons.append(f"queue '{queue.queue}' lag {queue.messages} > {self.lag_threshold}")
+
+        return HealthState(
+            live=True,
+            ready=not reasons,
+            reasons=reasons,
+            role=readiness["role"],
+            infrastructure_applied=readiness["infrastructure_applied"],
+            vhosts=vhosts,
+            queues=queues
+        )
+
+    @staticmethod
+    def _vhost_health(vhost_connection: VhostConnection) -> VhostHealth:
+        pool = vhost_connection.channel_pool.stats()
+        heartbeat_age = vhost_connection.heartbeat_age
+        return VhostHealth(
+            vhost=vhost_connection.vhost,
+            connected=vhost_connection.is_connected,
+            blocked=vhost_connection.is_blocked,
+            heartbeat_age_s=None if heartbeat_age is None else round(heartbeat_age, 3),
+            channels_in_use=pool.in_use,
+            channels_waiting=pool.waiting
+        )
+
+    async def _queue_lags(self, connected_vhosts: set[str]) -> list[QueueLag]:
+        """Глубина потребляемых очередей: по одному passive declare на очередь через пул каналов."""
+        consumed = sorted({
+            (stats["vhost"], stats["queue"]) for stats in self._client.consumers_stats()
+            if stats["vhost"] in connected_vhosts
+        })
+        return list(await asyncio.gather(*(self._queue_lag(vhost, queue) for vhost, queue in consumed)))
+
+    async def _queue_lag(self, vhost: str, queue_name: str) -> QueueLag:
+        try:
+            vhost_connection = await self._client.vhost(vhost)
+            async with vhost_connection.channel_pool.acquire() as channel:
+                queue = await channel.declare_queue(queue_name, passive=True)
+        except Exception as e:
+            return QueueLag(queue=queue_name, vhost=vhost, messages=None, lagging=False, error=str(e))
+        messages = queue.declaration_result.message_count
+        lagging = bool(self.lag_threshold) and messages > self.lag_threshold
+        return QueueLag(queue=queue_name, vhost=vhost, messages=messages, lagging=lagging)
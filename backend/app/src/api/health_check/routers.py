@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+
+from app.src.api.health_check.deps import get_health_monitor
+from app.src.api.health_check.monitor import HealthMonitor
+
+health_check_router = APIRouter()
+
+
+@health_check_router.get(path="/health/live", tags=["health"])
+async def liveness(monitor: HealthMonitor = Depends(get_health_monitor)):
+    """
+    Процесс жив: фоновая проверка здоровья выполняется вовремя. Не зависит от
+    состояния брокера и не обращается к нему.
+    """
+    state = monitor.state
+    content = {"status": "ok" if state.live else "stale", "checked_at": state.checked_at, "reasons": state.reasons}
+    return JSONResponse(status_code=200 if state.live else 503, content=content)
+
+
+@health_check_router.get(path="/health/ready", tags=["health"])
+async def readiness(monitor: HealthMonitor = Depends(get_health_monitor)):
+    """
+    Готовность к работе по последнему снимку фоновой проверки: соединения
+    установлены, heartbeat свежий, инфраструктура применена, отставание
+    потребителей ниже порога.
+    """
+    state = monitor.state
+    return JSONResponse(status_code=200 if state.ready else 503, content=state.as_dict())
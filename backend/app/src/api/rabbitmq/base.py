@@ -24,11 +24,11 @@ class BaseAMQPBroker(ABC):
         ...
 
     @abstractmethod
-    async def consume_events(self, callback) -> None:
+    async def consume_events(self, callback) -> str:
         ...
 
     @abstractmethod
-    async def stop_consuming(self, topic: str):
+    async def stop_consuming(self, consumer_tag: str):
         ...
 
     @abstractmethod
@@ -37,7 +37,7 @@ class BaseAMQPBroker(ABC):
 
 
 class AMQPConnectionFactory(Protocol):
-    async def __call__(self) -> AbstractRobustConnection:
+    async def __call__(self, virtualhost: str = "/") -> AbstractRobustConnection:
         ...
 
 
@@ -0,0 +1,223 @@
+import base64
+import datetime
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from decimal import Decimal
+from enum import Enum
+from typing import Any, AsyncIterator
+
+from aio_pika.abc import AbstractChannel, AbstractIncomingMessage, AbstractQueue
+
+from app.src.core.logging import logger
+
+
+class BrowseMode(str, Enum):
+    PEEK = "peek"  # сообщения возвращаются в очередь
+    DRAIN = "drain"  # выданные сообщения удаляются из очереди
+
+
+def topic_matches(pattern: str, routing_key: str) -> bool:
+    """Сопоставление ключа с topic-шаблоном RabbitMQ: '*' - ровно одно слово, '#' - ноль или больше слов."""
+    words = routing_key.split(".") if routing_key else []
+    # matched[j] - совпадает ли обработанная часть шаблона с первыми j словами ключа
+    matched = [True] + [False] * len(words)
+    for part in pattern.split(".") if pattern else []:
+        if part == "#":
+            for j in range(1, len(matched)):
+                matched[j] = matched[j] or matched[j - 1]
+        else:
+            for j in range(len(words), 0, -1):
+                matched[j] = matched[j - 1] and (part == "*" or part == words[j - 1])
+            matched[0] = False
+    return matched[-1]
+
+
+@dataclass
+class MessageFilter:
+    """Фильтр сообщений: topic-шаблон ключа маршрутизации и точные значения заголовков."""
+    routing_key: str | None = None
+    headers: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_query(cls, routing_key: str | None, headers: list[str]) -> "MessageFilter":
+        """Заголовки передаются как 'name:value'."""
+        parsed = {}
+        for item in headers:
+            name, sep, value = item.partition(":")
+            if not sep or not name:
+                raise ValueError(f"Header filter must be 'name:value', got '{item}'")
+            parsed[name] = value
+        return cls(routing_key=routing_key or None, headers=parsed)
+
+    @property
+    def is_empty(self) -> bool:
+        return self.routing_key is None and not self.headers
+
+    def matches(self, message: AbstractIncomingMessage) -> bool:
+        if self.routing_key is not None and not topic_matches(self.routing_key, message.routing_key or ""):
+            return False
+        message_headers = message.headers or {}
+        for name, value in self.headers.items():
+            if name not in message_headers or _header_str(message_headers[name]) != value:
+                return False
+        return True
+
+
+@dataclass
+class BrowseSummary:
+    """Итог просмотра очереди - последняя строка NDJSON."""
+    queue: str
+    vhost: str
+    mode: str
+    returned: int = 0
+    scanned: int = 0
+    stopped: str = "limit"  # limit | scan_limit | empty | timeout
+    duration_ms: float = 0.0
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        data["duration_ms"] = round(self.duration_ms, 3)
+        return data
+
+
+class QueueBrowser:
+    """
+    Просмотр сообщений очереди с выдачей по одному (NDJSON).
+
+    Сообщения забираются через basic.get на выделенном канале по одному и
+    только когда предыдущая строка ушла клиенту, поэтому память не зависит от
+    глубины очереди, а медленный клиент притормаживает чтение из брокера.
+    В режиме peek все полученные сообщения остаются неподтверждёнными и
+    возвращаются в очередь в конце (в исходном порядке). В режиме drain
+    подтверждаются только выданные клиенту сообщения; не прошедшие фильтр
+    возвращаются в очередь. Брокер не выдаёт повторно неподтверждённые
+    сообщения, поэтому каждое сообщение просматривается один раз, а их
+    количество ограничено max_scan.
+    """
+
+    def __init__(
+        self,
+        channel: AbstractChannel,
+        queue_name: str,
+        vhost: str = "/",
+        mode: BrowseMode = BrowseMode.PEEK,
+        message_filter: MessageFilter | None = None,
+        limit: int = 100,
+        max_scan: int = 1000,
+        timeout: float | None = None,
+        max_body_bytes: int = 65536
+    ):
+        self._channel = channel
+        self._queue: AbstractQueue | None = None
+        self.queue_name = queue_name
+        self.mode = mode
+        self.filter = message_filter or MessageFilter()
+        self.limit = max(1, limit)
+        self.max_scan = max(self.limit, max_scan)
+        self.timeout = timeout
+        self.max_body_bytes = max_body_bytes
+        self.summary = BrowseSummary(queue=queue_name, vhost=vhost, mode=mode.value)
+
+    async def open(self) -> None:
+        """Проверяет существование очереди (до начала ответа, чтобы вернуть 404)."""
+        self._queue = await self._channel.declare_queue(self.queue_name, passive=True)
+
+    async def close(self) -> None:
+        """Закрытие канала возвращает в очередь все неподтверждённые сообщения."""
+        if not self._channel.is_closed:
+            try:
+                await self._channel.close()
+            except Exception as e:
+                logger.warning(f"Не удалось закрыть канал просмотра очереди '{self.queue_name}': {e}")
+
+    async def messages(self) -> AsyncIterator[dict]:
+        """Выдаёт сообщения, прошедшие фильтр, пока не сработает одно из ограничений."""
+        started = time.perf_counter()
+        deadline = started + self.timeout if self.timeout else None
+        # Последнее неподтверждённое сообщение: в конце одним nack(multiple) возвращаем всё в очередь
+        pending: AbstractIncomingMessage | None = None
+        try:
+            while True:
+                if self.summary.returned >= self.limit:
+                    self.summary.stopped = "limit"
+                    break
+                if self.summary.scanned >= self.max_scan:
+                    self.summary.stopped = "scan_limit"
+                    break
+                if deadline and time.perf_counter() > deadline:
+                    self.summary.stopped = "timeout"
+                    break
+
+                message = await self._queue.get(no_ack=False, fail=False)
+                if message is None:
+                    self.summary.stopped = "empty"
+                    break
+                self.summary.scanned += 1
+                if not self.filter.matches(message):
+                    pending = message
+                    continue
+
+                self.summary.returned += 1
+                yield self.serialize(message)
+                if self.mode == BrowseMode.DRAIN:
+                    # Подтверждаем после того, как строка ушла клиенту
+                    await message.ack()
+                else:
+                    pending = message
+            if pending is not None and not self._channel.is_closed:
+                await pending.nack(multiple=True, requeue=True)
+        finally:
+            self.summary.duration_ms = (time.perf_counter() - started) * 1000
+            await self.close()
+        logger.info(
+            f"Просмотр очереди '{self.queue_name}' ({self.mode.value}): выдано {self.summary.returned}, "
+            f"просмотрено {self.summary.scanned}, остановка: {self.summary.stopped}"
+        )
+
+    async def ndjson(self) -> AsyncIterator[bytes]:
+        """Сообщения по одному в строке и сводка последней строкой."""
+        async for item in self.messages():
+            yield _dumps({"message": item})
+        yield _dumps({"summary": self.summary.as_dict()})
+
+    def serialize(self, message: AbstractIncomingMessage) -> dict:
+        body = message.body[:self.max_body_bytes]
+        try:
+            body_text, body_encoding = body.decode("utf-8"), "utf-8"
+        except UnicodeDecodeError:
+            body_text, body_encoding = base64.b64encode(body).decode(), "base64"
+        return {
+            "exchange": message.exchange,
+            "routing_key": message.routing_key,
+            "redelivered": message.redelivered,
+            "message_id": message.message_id,
+            "content_type": message.content_type,
+            "content_encoding": message.content_encoding,
+            "timestamp": message.timestamp,
+            "headers": message.headers or {},
+            "body": body_text,
+            "body_encoding": body_encoding,
+            "body_size": len(message.body),
+            "truncated": len(message.body) > self.max_body_bytes,
+        }
+
+
+# ==== Помощники ====
+def _header_str(value: Any) -> str:
+    return value.decode("utf-8", "replace") if isinstance(value, bytes) else str(value)
+
+
+def _json_default(value: Any) -> Any:
+    # Заголовки AMQP могут содержать bytes, datetime (x-death) и Decimal
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def _dumps(data: dict) -> bytes:
+    return json.dumps(data, ensure_ascii=False, default=_json_default).encode() + b"\n"
@@ -1,14 +1,29 @@
+import asyncio
 import json
+import time
+from contextlib import suppress
+from functools import partial
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Optional, Sequence
 
-import aio_pika
-from aio_pika import ExchangeType, Message
-from aio_pika.abc import AbstractChannel, AbstractRobustConnection
+from aio_pika import ExchangeType
+from aio_pika.abc import AbstractChannel, AbstractIncomingMessage, AbstractRobustConnection
 
 from app.configs.settings import get_settings
 from app.src.api.rabbitmq.base import AMQPChannelFactory, AMQPConnectionFactory, BaseAMQPBroker
+from app.src.api.rabbitmq.browse import BrowseMode, MessageFilter, QueueBrowser
+from app.src.api.rabbitmq.codecs import JSON_CONTENT_TYPE, EncodedBody, MessageCodec, create_message_codec
+from app.src.api.rabbitmq.connection import (
+    ConnectionStats,
+    ExponentialBackoff,
+    FailoverRobustConnection,
+    VhostConnection,
+    build_urls,
+    connect_with_retry,
+    parse_hosts
+)
 from app.src.api.rabbitmq.constants import (
+    DEFAULT_VHOST,
     DLX_EXCHANGE_NAME,
     DLX_QUEUE_NAME,
     RMQ_EXCHANGE_NAME,
@@ -20,8 +35,36 @@ from app.src.api.rabbitmq.constants import (
     SYSTEM_EXCHANGE_NAME,
     RabbitMQEventType
 )
-from app.src.api.rabbitmq.schemas import ConfigReadyEvent, InfrastructureConfig, RMQDestinationType, ServiceConfig
+from app.src.api.rabbitmq.consumer import MessageHandler, QueueConsumer
+from app.src.api.rabbitmq.dedup import CONFIG_HASH_HEADER, ConfigReadyStore, config_hash, config_ready_message_id
+from app.src.api.rabbitmq.ingress import PublishIngress
+from app.src.api.rabbitmq.leader import LeaderElection
+from app.src.api.rabbitmq.loader import CompiledInfrastructure, InfrastructureLoader
+from app.src.api.rabbitmq.metrics import (
+    AMQP_OPERATION_DURATION,
+    CONFIG_READY_SKIPPED,
+    CONFIG_RELOADS,
+    RECONNECTS,
+    RECOVERY_DURATION
+)
+from app.src.api.rabbitmq.pool import ChannelPool
+from app.src.api.rabbitmq.publisher import EventPublisher, OutgoingMessage, PublishResult
+from app.src.api.rabbitmq.redrive import RedriveManager
+from app.src.api.rabbitmq.retry import RetryScheduler
+from app.src.api.rabbitmq.routing import EventRouter
+from app.src.api.rabbitmq.rpc import RpcClient
+from app.src.api.rabbitmq.schemas import (
+    ConfigReadyEvent,
+    Event,
+    InfrastructureConfig,
+    RetryPolicyConfig,
+    ServiceBindingConfig,
+    ServiceConfig
+)
+from app.src.api.rabbitmq.topology import DeclarationReport, TopologyDeclarer, TopologyPlan, TopologySnapshot
+from app.src.api.rabbitmq.watcher import ConfigWatcher
 from app.src.core.logging import logger
+from app.src.core.metrics import timed
 
 config = get_settings()
 
@@ -29,247 +72,898 @@ QueueInfo = dict[str, Any]
 ExchangeInfo = dict[str, Any]
 
 
-# TODO Разделение ответственности: вынести публикацию событий в отдельный класс.
 # TODO Импорты: получать константы из конфига.
-# TODO Retry-логика для соединения
-# TODO Health-check методы
-# TODO Механизм подтверждения (ack/nack) для сообщений
 # TODO Переделать обработку ошибок
 
 
-class InfrastructureLoader:
-    @staticmethod
-    def load(path: Path) -> InfrastructureConfig:
-        """Загружает JSON-конфигурацию из файла."""
-        if not path.exists():
-            raise FileNotFoundError(f"Config file {path} not found")
-        with open(path, 'r') as f:
-            data = json.load(f)
-        return InfrastructureConfig(**data)
-
-
 class RabbitMQClient(BaseAMQPBroker):
     def __init__(
         self,
         connection: AbstractRobustConnection | None = None,
-        channel: AbstractChannel | None = None,
+        channel_pool: ChannelPool | None = None,
         connection_factory: Optional[AMQPConnectionFactory] = None,
-        channel_factory: AMQPChannelFactory | None = None
+        channel_factory: AMQPChannelFactory | None = None,
+        declare_concurrency: int | None = None,
+        leader_election: LeaderElection | None = None,
+        watch_config: bool | None = None,
+        codec: MessageCodec | None = None
     ):
         # Зависимости
         self.connection: AbstractRobustConnection | None = connection
-        self.channel: AbstractChannel | None = channel
+        self.channel_pool: ChannelPool | None = channel_pool
+        # Без выбора ведущего процесс сам настраивает топологию (режим одного воркера)
+        self.election: LeaderElection | None = leader_election
         self._connection_factory = connection_factory or self._default_connection_factory
         self._channel_factory = channel_factory or self._default_channel_factory
 
         # Конфигурация
         self.config_file: Path = Path("app/configs/load_definition.json")
         self.infrastructure_config: InfrastructureConfig | None = None
+        self.declare_concurrency: int = declare_concurrency or config.RMQ_DECLARE_CONCURRENCY
+        self._loader = InfrastructureLoader(cache_dir=config.RMQ_CONFIG_CACHE_DIR or None)
+        # Хеши конфигураций, о которых сервисы уже уведомлены - переживают рестарт
+        self._config_ready_store = ConfigReadyStore(
+            Path(config.RMQ_CONFIG_CACHE_DIR, config.RMQ_CONFIG_READY_STATE_FILE) if config.RMQ_CONFIG_CACHE_DIR else None
+        )
+        self.watch_config: bool = config.RMQ_CONFIG_WATCH if watch_config is None else watch_config
+        # Кодек и сжатие исходящих событий; входящие разбираются по content_type/content_encoding
+        self.codec: MessageCodec = codec or create_message_codec()
+        self._backoff = ExponentialBackoff(
+            initial=config.RMQ_RECONNECT_BACKOFF_INITIAL,
+            multiplier=config.RMQ_RECONNECT_BACKOFF_MULTIPLIER,
+            maximum=config.RMQ_RECONNECT_BACKOFF_MAX
+        )
+
+        # Состояние
+        self.publisher: EventPublisher | None = None
+        self._applied_topology: TopologySnapshot | None = None
+        self._declared_service_queues: set[tuple[str, str]] = set()
+        self._consumers: dict[str, QueueConsumer] = {}
+        self._rpc_clients: dict[str, RpcClient] = {}
+        self._vhosts: dict[str, VhostConnection] = {}
+        self._vhost_locks: dict[str, asyncio.Lock] = {}
+        self._connection_stats: dict[str, ConnectionStats] = {DEFAULT_VHOST: ConnectionStats()}
+        self._setup_lock = asyncio.Lock()
+        self._ready = asyncio.Event()
+        self._recovery_tasks: dict[str, asyncio.Task] = {}
+        self._leadership_task: asyncio.Task | None = None
+        self._control_consumer_tag: str | None = None
+        self._config_watcher: ConfigWatcher | None = None
+        self._routing_consumer_tag: str | None = None
+        self.event_router = EventRouter(self.vhost)
+        self.startup_error: Exception | None = None
+        self.redrive = RedriveManager(
+            self,
+            default_rate_limit=config.RMQ_REDRIVE_RATE_LIMIT,
+            default_batch_size=config.RMQ_REDRIVE_BATCH_SIZE,
+            history_size=config.RMQ_REDRIVE_HISTORY_SIZE
+        )
+        self.ingress = PublishIngress(
+            self,
+            high_water_mark=config.RMQ_INGRESS_HIGH_WATER_MARK,
+            workers=config.RMQ_INGRESS_WORKERS,
+            retry_after=config.RMQ_INGRESS_RETRY_AFTER
+        )
+
+    @property
+    def is_leader(self) -> bool:
+        """Процесс владеет топологией и публикацией CONFIG_READY."""
+        return self.election is None or self.election.is_leader
+
+    @property
+    def connection_stats(self) -> ConnectionStats:
+        """Статистика соединения с vhost по умолчанию."""
+        return self._connection_stats[DEFAULT_VHOST]
 
     # ==== Методы жизненного цикла ====
+    @timed(AMQP_OPERATION_DURATION, operation="connect")
     async def connect(self) -> None:
-        """Устанавливает соединение с RabbitMQ."""
-        if not self.connection:
-            self.connection = await self._connection_factory()
-        if not self.channel:
-            self.channel = await self._channel_factory(self.connection)
+        """Устанавливает соединение с vhost по умолчанию. Остальные vhost подключаются лениво."""
+        if DEFAULT_VHOST not in self._vhosts:
+            vhost_connection = await self._open_vhost(DEFAULT_VHOST, self.connection, self.channel_pool)
+            self._vhosts[DEFAULT_VHOST] = vhost_connection
+            self.connection = vhost_connection.connection
+            self.channel_pool = vhost_connection.channel_pool
+            self.publisher = vhost_connection.publisher
         logger.info("Соединение с RabbitMQ установлено")
 
+    async def vhost(self, vhost: str = DEFAULT_VHOST) -> VhostConnection:
+        """Соединение с vhost, открываемое при первом обращении."""
+        vhost_connection = self._vhosts.get(vhost)
+        if vhost_connection is not None:
+            return vhost_connection
+        self._ensure_connected()
+
+        async with self._vhost_locks.setdefault(vhost, asyncio.Lock()):
+            if vhost not in self._vhosts:
+                self._vhosts[vhost] = await self._open_vhost(vhost)
+                logger.info(f"Соединение с vhost '{vhost}' установлено")
+        return self._vhosts[vhost]
+
+    def vhost_connections(self) -> list[VhostConnection]:
+        return list(self._vhosts.values())
+
+    async def open_channel(self, vhost: str = DEFAULT_VHOST) -> AbstractChannel:
+        """Выделенный канал вне пула - для долгих операций с неподтверждёнными сообщениями."""
+        vhost_connection = await self.vhost(vhost)
+        return await self._channel_factory(vhost_connection.connection)
+
+    async def start(self) -> None:
+        """
+        Подключается и применяет инфраструктуру, после чего клиент считается готовым.
+        Может выполняться в фоне: статус доступен через is_ready/readiness().
+        При нескольких воркерах инфраструктуру применяет и CONFIG_READY публикует только
+        ведущий процесс; остальные лишь читают конфигурацию и периодически пытаются
+        стать ведущим, если прежний завершился.
+        """
+        try:
+            await self.connect()
+            if self.election is None or await self.election.try_acquire(self.open_channel):
+                await self._lead()
+            else:
+                await self._follow()
+        except Exception as e:
+            self.startup_error = e
+            logger.error(f"Не удалось подготовить инфраструктуру RabbitMQ: {e}")
+            raise
+        # Ошибка прошлой попытки остаётся видна в readiness() до успешного старта
+        self.startup_error = None
+        self._ready.set()
+
+    async def start_with_retry(self) -> None:
+        """
+        start() с повторами до успеха или отмены задачи - для фоновой настройки:
+        брокер, недоступный при старте процесса, не оставляет его неготовым навсегда.
+        Пауза между попытками растёт по той же схеме, что и при переподключении.
+        """
+        attempt = 0
+        while True:
+            try:
+                await self.start()
+                return
+            except Exception:
+                # Ошибка уже залогирована в start() и видна в readiness() до следующей попытки
+                delay = self._backoff.delay(attempt)
+                attempt += 1
+                logger.warning(f"Повтор настройки RabbitMQ через {delay:.1f} с (неудачных попыток: {attempt})")
+                await asyncio.sleep(delay)
+
+    @property
+    def is_ready(self) -> bool:
+        """Соединение установлено и инфраструктура применена."""
+        return self._ready.is_set()
+
+    async def wait_ready(self, timeout: float | None = None) -> bool:
+        try:
+            async with asyncio.timeout(timeout):
+                await self._ready.wait()
+        except TimeoutError:
+            return False
+        return True
+
+    def readiness(self) -> dict:
+        return {
+            "ready": self.is_ready,
+            "role": "leader" if self.is_leader else "follower",
+            "connected": self.channel_pool is not None and not self.channel_pool.is_closed,
+            "infrastructure_applied": self._applied_topology is not None,
+            "config_loaded": self.infrastructure_config is not None,
+            "routing_rules": len(self.event_router.index),
+            "error": str(self.startup_error) if self.startup_error else None,
+        }
+
     async def close(self) -> None:
         """Закрывает соединение с RabbitMQ"""
-        if self.connection:
-            await self.connection.close()
+        self._ready.clear()
+        # Буфер HTTP-публикации дописывается, пока соединение ещё открыто
+        await self.ingress.close(drain_timeout=config.RMQ_CONSUMER_DRAIN_TIMEOUT)
+        if self._config_watcher:
+            await self._config_watcher.stop()
+        tasks = [*self._recovery_tasks.values(), *([self._leadership_task] if self._leadership_task else [])]
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        await self.redrive.close()
+        if self._consumers:
+            await asyncio.gather(*(self.stop_consuming(tag) for tag in list(self._consumers)))
+        if self._rpc_clients:
+            await asyncio.gather(*(rpc.close() for rpc in self._rpc_clients.values()))
+        if self.election is not None:
+            await self.election.release()
+        if self._vhosts:
+            await asyncio.gather(*(vhost_connection.close() for vhost_connection in self._vhosts.values()))
             logger.info("Соединение с RabbitMQ закрыто")
 
     # ==== Общее API / Бизнесс логика ====
-    async def setup_infrastructure(self, config_file: str | Path | None = None):
-        """Основная точка входа для настройки инфраструктуры."""
+    @timed(AMQP_OPERATION_DURATION, operation="setup_infrastructure")
+    async def setup_infrastructure(
+        self,
+        config_file: str | Path | None = None,
+        dry_run: bool = False,
+        force: bool = False,
+        recreate: bool | None = None
+    ) -> DeclarationReport | None:
+        """
+        Основная точка входа для настройки инфраструктуры.
+        Применяет только разницу с последней применённой топологией.
+        :param dry_run: Только построить план, ничего не объявляя
+        :param force: Объявить все сущности заново, игнорируя применённую топологию
+        :param recreate: Удалить и заново объявить обменники и очереди с изменёнными параметрами
+            (сообщения таких очередей теряются). По умолчанию RMQ_TOPOLOGY_RECREATE;
+            без него они пропускаются и попадают в conflicts отчёта
+        :return: Отчёт с планом и таймингами фаз либо None для дефолтной инфраструктуры
+        """
         if config_file:
             self.config_file = Path(config_file)
-        await self._setup_infrastructure()
+        if recreate is None:
+            recreate = config.RMQ_TOPOLOGY_RECREATE
+        # Фоновая настройка при старте и PUT /set_rabbitmq_config не должны применять план одновременно
+        async with self._setup_lock:
+            return await self._setup_infrastructure(dry_run=dry_run, force=force, recreate=recreate)
 
-    async def publish_configuration_ready(self, services_config: list[ServiceConfig]):
+    async def apply_configuration(
+        self,
+        dry_run: bool = False,
+        force: bool = False,
+        recreate: bool | None = None
+    ) -> dict | None:
         """
-        Публикует событие о готовности очереди в системный обменник.
-        :param queue_name: Имя очереди, которая была создана
-        :param routing_key: Роутинг ключ, по которому она доступна
+        Применяет изменения конфигурации топологии. Ведущий процесс делает это сам,
+        остальные передают команду ведущему через его управляющую очередь (RPC).
         """
+        if self.is_leader:
+            report = await self.setup_infrastructure(dry_run=dry_run, force=force, recreate=recreate)
+            return report.as_dict() if report else None
+
+        command = {"command": "setup_infrastructure", "dry_run": dry_run, "force": force, "recreate": recreate}
+        reply = await self.rpc_call("", self.election.control_queue, json.dumps(command).encode())
+        result = json.loads(reply.body)
+        if "error" in result:
+            raise RuntimeError(result["error"])
+        return result["result"]
+
+    @timed(AMQP_OPERATION_DURATION, operation="publish")
+    async def publish(
+        self,
+        exchange: str,
+        routing_key: str,
+        event: Event | bytes,
+        headers: dict | None = None,
+        message_id: str | None = None,
+        vhost: str = DEFAULT_VHOST
+    ) -> PublishResult:
+        """Публикует событие с подтверждением брокера."""
+        vhost_connection = await self.vhost(vhost)
+        return await vhost_connection.publisher.publish(
+            exchange=exchange,
+            routing_key=routing_key,
+            event=event,
+            headers=headers,
+            message_id=message_id
+        )
 
-        if not self.channel:
-            logger.error("Канал не инициализирован")
-            raise RuntimeError("Сначала вызовите connect()")
-
-        system_exchange = await self.channel.declare_exchange(
-            name=SYSTEM_EXCHANGE_NAME,
-            type=ExchangeType.TOPIC,
-            durable=True
+    @timed(AMQP_OPERATION_DURATION, operation="publish_many")
+    async def publish_many(
+        self,
+        exchange: str,
+        routing_key: str,
+        events: Sequence[Event],
+        headers: dict | None = None,
+        vhost: str = DEFAULT_VHOST
+    ) -> PublishResult:
+        """Публикует пачку событий конвейером с окном подтверждений."""
+        vhost_connection = await self.vhost(vhost)
+        return await vhost_connection.publisher.publish_many(
+            exchange=exchange,
+            routing_key=routing_key,
+            events=events,
+            headers=headers
         )
 
-        for service in services_config:
+    async def rpc_call(
+        self,
+        exchange: str,
+        routing_key: str,
+        event: Event | bytes,
+        headers: dict | None = None,
+        timeout: float | None = None,
+        vhost: str = DEFAULT_VHOST
+    ) -> AbstractIncomingMessage:
+        """
+        Отправляет запрос и возвращает ответ сервиса (запрос-ответ через direct reply-to).
+        Одновременные вызовы vhost используют один канал и одного потребителя ответов.
+        """
+        if isinstance(event, bytes):
+            encoded = EncodedBody(event, JSON_CONTENT_TYPE)
+        else:
+            encoded = self.codec.encode_events([event])[0]
+        rpc = await self.rpc(vhost)
+        return await rpc.call(
+            exchange,
+            routing_key,
+            encoded.body,
+            headers=headers,
+            timeout=timeout,
+            content_type=encoded.content_type,
+            content_encoding=encoded.content_encoding
+        )
 
-            service_name = service.service_name
-            service_routing_key = service.service_routing_key
-            service_binding_conf = service.service_binding_conf
+    async def rpc(self, vhost: str = DEFAULT_VHOST) -> RpcClient:
+        """RPC-клиент vhost, запускаемый при первом вызове."""
+        rpc = self._rpc_clients.get(vhost)
+        if rpc is not None:
+            return rpc
+        vhost_connection = await self.vhost(vhost)
+        async with self._vhost_locks.setdefault(vhost, asyncio.Lock()):
+            if vhost not in self._rpc_clients:
+                rpc = RpcClient(
+                    connection=vhost_connection.connection,
+                    channel_factory=self._channel_factory,
+                    vhost=vhost,
+                    default_timeout=config.RMQ_RPC_TIMEOUT,
+                    max_in_flight=config.RMQ_RPC_MAX_IN_FLIGHT,
+                    latency_window=config.RMQ_RPC_LATENCY_WINDOW
+                )
+                await rpc.start()
+                self._rpc_clients[vhost] = rpc
+        return self._rpc_clients[vhost]
 
-            system_queue = await self.channel.declare_queue(name=service_name, durable=True)
-            await system_queue.bind(system_exchange, routing_key=service_routing_key)
+    def rpc_stats(self) -> list[dict]:
+        return [rpc.stats().as_dict() for rpc in self._rpc_clients.values()]
 
-            ready_event = ConfigReadyEvent(
-                event_type=RabbitMQEventType.CONFIG_READY,
-                payload=service_binding_conf
+    @timed(AMQP_OPERATION_DURATION, operation="publish_configuration_ready")
+    async def publish_configuration_ready(self, services_config: list[ServiceConfig]) -> PublishResult:
+        """
+        Публикует событие о готовности конфигурации каждому сервису в системный обменник.
+        Системный обменник и очереди сервисов объявляются один раз за жизнь соединения.
+        События публикуются конвейером с подтверждениями. message_id - хеш конфигурации
+        сервиса (ключ идемпотентности для MessageDeduplicator потребителя); хеши
+        подтверждённых событий запоминаются, и неизменившиеся сервисы больше не уведомляются.
+        :param services_config: Конфигурации сервисов
+        """
+        self._ensure_connected()
+
+        await self.publisher.ensure_exchange(SYSTEM_EXCHANGE_NAME, type=ExchangeType.TOPIC, durable=True)
+        await self._ensure_service_queues(services_config)
+
+        ready_events = [
+            ConfigReadyEvent(event_type=RabbitMQEventType.CONFIG_READY, payload=service.service_binding_conf)
+            for service in services_config
+        ]
+        digests = [config_hash(service) for service in services_config]
+        messages = [
+            OutgoingMessage.encoded(
+                service.service_routing_key,
+                encoded,
+                message_id=config_ready_message_id(service, digest),
+                headers={CONFIG_HASH_HEADER: digest}
             )
+            for service, digest, encoded in zip(services_config, digests, self.codec.encode_events(ready_events))
+        ]
+
+        result = await self.publisher.publish_messages(SYSTEM_EXCHANGE_NAME, messages)
+        if result.failed:
+            logger.error("Ошибка при публикации события configuration_ready: {error}", error=result.errors[0])
+            raise RuntimeError(f"Не подтверждено событий configuration_ready: {result.failed}")
+        self._config_ready_store.update(
+            {service.service_name: digest for service, digest in zip(services_config, digests)}
+        )
 
-            try:
+        # Список сервисов собирается, только если уровень INFO включён
+        logger.opt(lazy=True).info(
+            "Событие configuration_ready опубликовано для сервисов: {services}",
+            services=lambda: ", ".join(service.service_name for service in services_config)
+        )
+        return result
 
-                message = Message(
-                    body=ready_event.model_dump_json().encode(),
-                    content_type="application/json",
-                    delivery_mode=2  # persistent message
-                )
+    # ==== Приватные методы / помощники ====
+    async def _lead(self) -> None:
+        """Обязанности ведущего: топология, CONFIG_READY, отслеживание файла и управляющая очередь."""
+        self._config_ready_store.load()
+        await self.setup_infrastructure()
+        self._watch_config_file()
+        if self.election is None:
+            return
+        await self._declare_control_queue()
+        self._control_consumer_tag = await self.consume_events(
+            self._on_control_message,
+            queue_name=self.election.control_queue,
+            prefetch_count=1
+        )
+        logger.info(f"Процесс {self.election.kind}-выбором назначен ведущим ({self.election.control_queue})")
+
+    async def _follow(self) -> None:
+        """Ведомый процесс: конфигурация читается для потребителей, топологию применяет ведущий."""
+        compiled = await self._load_config()
+        self.infrastructure_config = compiled.config
+        await self._sync_event_routing(raise_errors=False)
+        self._watch_config_file()
+        self._leadership_task = asyncio.create_task(self._watch_leadership())
+        logger.info("Процесс работает ведомым: топологию и CONFIG_READY обслуживает ведущий")
+
+    def _watch_config_file(self) -> None:
+        """Ведущий применяет изменения файла, ведомые - только обновляют правила маршрутизации."""
+        if not self.watch_config:
+            return
+        self._config_watcher = self._config_watcher or ConfigWatcher(
+            self.config_file,
+            on_change=self._on_config_file_change,
+            interval=config.RMQ_CONFIG_WATCH_INTERVAL,
+            debounce=config.RMQ_CONFIG_WATCH_DEBOUNCE
+        )
+        self._config_watcher.start()
 
-                await system_exchange.publish(
-                    message=message,
-                    routing_key=service_routing_key
+    async def _sync_event_routing(self, raise_errors: bool = True) -> None:
+        """
+        Перекомпилирует правила маршрутизации событий MinIO и запускает или
+        останавливает их потребителя. Потребитель работает в каждом процессе:
+        очередь событий делится между воркерами.
+        """
+        rules = self.infrastructure_config.routing_rules if self.infrastructure_config else []
+        self.event_router.update(rules)
+        if rules and self._routing_consumer_tag is None:
+            try:
+                self._routing_consumer_tag = await self.consume_events(
+                    self.event_router.handle,
+                    queue_name=config.RMQ_ROUTING_QUEUE,
+                    prefetch_count=config.RMQ_ROUTING_PREFETCH,
+                    vhost=config.RMQ_ROUTING_VHOST
                 )
-
-                logger.info(f"Событие configuration_ready опубликовано для {service_name} с ключом {service_routing_key}")
             except Exception as e:
-                logger.error(f"Ошибка при публикации события configuration_ready: {e}")
-                raise
+                if raise_errors:
+                    raise
+                # Ведомый мог стартовать раньше, чем ведущий объявил очередь: повтор в _watch_leadership
+                logger.warning(f"Маршрутизация событий из '{config.RMQ_ROUTING_QUEUE}' пока не запущена: {e}")
+                return
+            logger.info(f"Маршрутизация событий из '{config.RMQ_ROUTING_QUEUE}' запущена: {len(rules)} правил")
+        elif not rules and self._routing_consumer_tag is not None:
+            tag, self._routing_consumer_tag = self._routing_consumer_tag, None
+            await self.stop_consuming(tag)
+            logger.info("Правила маршрутизации удалены, потребитель событий остановлен")
+
+    async def _watch_leadership(self) -> None:
+        """Периодически пытается стать ведущим - на случай завершения прежнего."""
+        while not self.is_leader:
+            await asyncio.sleep(config.RMQ_LEADER_RETRY_INTERVAL)
+            try:
+                if self._routing_consumer_tag is None:
+                    await self._sync_event_routing(raise_errors=False)
+                if not await self.election.try_acquire(self.open_channel):
+                    continue
+                logger.warning("Ведущий процесс сменился: этот процесс применяет топологию")
+                await self._lead()
+            except Exception as e:
+                logger.error(f"Не удалось принять обязанности ведущего: {e}")
+                await self.election.release()
+
+    async def _demote(self) -> None:
+        """Ведущим за время разрыва соединения стал другой процесс."""
+        if self._control_consumer_tag:
+            await self.stop_consuming(self._control_consumer_tag)
+            self._control_consumer_tag = None
+        logger.warning("Процесс больше не ведущий: топологию обслуживает другой процесс")
+        if self._leadership_task is None or self._leadership_task.done():
+            self._leadership_task = asyncio.create_task(self._watch_leadership())
+
+    async def _on_config_file_change(self, raw: bytes) -> None:
+        """Новая версия файла конфигурации: валидация, затем применение только разницы."""
+        try:
+            compiled = self._loader.load_compiled_bytes(raw, source=self.config_file)
+        except Exception as e:
+            CONFIG_RELOADS.labels(outcome="invalid").inc()
+            logger.error(f"Изменённый конфиг {self.config_file} не прошёл валидацию и не применён: {e}")
+            return
+        if not self.is_leader:
+            # Топологию применит ведущий; ведомому нужны только новые правила маршрутизации
+            self.infrastructure_config = compiled.config
+            await self._sync_event_routing(raise_errors=False)
+            CONFIG_RELOADS.labels(outcome="loaded").inc()
+            return
+        try:
+            # Применяется именно провалидированная версия: файл мог измениться ещё раз после чтения
+            async with self._setup_lock:
+                report = await self._setup_infrastructure(recreate=config.RMQ_TOPOLOGY_RECREATE, compiled=compiled)
+        except Exception:
+            CONFIG_RELOADS.labels(outcome="failed").inc()
+            raise
+        CONFIG_RELOADS.labels(outcome="applied").inc()
+        if report is not None:
+            logger.info(
+                f"Изменённый конфиг {self.config_file} применён: {report.plan.as_dict()}, "
+                f"CONFIG_READY: {report.notified_services or '-'}"
+            )
 
-    # ==== Приватные методы / помощники ====
-    async def _load_config(self) -> None:
-        """Загружает JSON-конфигурацию из файла."""
+    async def _declare_control_queue(self) -> None:
+        # В режиме queue очередь уже объявлена при выборе
+        if self.election.kind != "queue":
+            async with self.channel_pool.acquire() as channel:
+                await channel.declare_queue(self.election.control_queue, exclusive=True)
+
+    async def _on_control_message(self, message: AbstractIncomingMessage) -> None:
+        """Команда ведомого процесса. Ошибка возвращается в ответе, а не через nack."""
+        try:
+            command = json.loads(message.body)
+            if command.get("command") != "setup_infrastructure":
+                raise ValueError(f"Unknown command: {command.get('command')}")
+            report = await self.setup_infrastructure(
+                dry_run=bool(command.get("dry_run")),
+                force=bool(command.get("force")),
+                recreate=command.get("recreate")
+            )
+            reply = {"result": report.as_dict() if report else None}
+        except Exception as e:
+            reply = {"error": str(e)}
+        if not message.reply_to:
+            return
+        await self.publisher.publish_messages("", [OutgoingMessage(
+            routing_key=message.reply_to,
+            body=json.dumps(reply, default=str).encode(),
+            correlation_id=message.correlation_id,
+            persistent=False
+        )])
+
+    async def _load_config(self) -> CompiledInfrastructure:
+        """Загружает скомпилированную конфигурацию (из кеша, если файл не менялся)."""
         try:
             config_path = Path(self.config_file)
-            self.infrastructure_config = InfrastructureLoader.load(config_path)
+            return self._loader.load_compiled(config_path)
         except Exception as e:
             logger.error(f"Ошибка при загрузке конфига: {e}")
             raise
 
-    async def _setup_infrastructure(self) -> None:
-        """Основной метод настройки инфраструктуры."""
-        if not self.channel:
+    async def _ensure_service_queues(self, services_config: list[ServiceConfig]) -> None:
+        """Объявляет и привязывает системные очереди сервисов, ещё не объявленные в этом соединении."""
+        pending = [
+            service for service in services_config
+            if (service.service_name, service.service_routing_key) not in self._declared_service_queues
+        ]
+        if not pending:
+            return
+
+        # Параллельно на каналах пула, не больше declare_concurrency одновременно
+        slots = asyncio.Semaphore(self.declare_concurrency)
+
+        async def declare(service: ServiceConfig) -> None:
+            async with slots, self.channel_pool.acquire() as channel:
+                system_queue = await channel.declare_queue(name=service.service_name, durable=True)
+                await system_queue.bind(SYSTEM_EXCHANGE_NAME, routing_key=service.service_routing_key)
+            self._declared_service_queues.add((service.service_name, service.service_routing_key))
+
+        await asyncio.gather(*(declare(service) for service in pending))
+
+    async def _open_vhost(
+        self,
+        vhost: str,
+        connection: AbstractRobustConnection | None = None,
+        channel_pool: ChannelPool | None = None
+    ) -> VhostConnection:
+        """Открывает соединение с vhost (с повторами) и создаёт для него пул каналов и публикатор."""
+        stats = self._connection_stats.setdefault(vhost, ConnectionStats())
+        if connection is None:
+            # Фабрики без параметра virtualhost поддерживаются для vhost по умолчанию
+            factory = self._connection_factory if vhost == DEFAULT_VHOST else partial(
+                self._connection_factory, virtualhost=vhost
+            )
+            connection = await connect_with_retry(
+                factory,
+                attempts=config.RMQ_CONNECT_ATTEMPTS,
+                backoff=self._backoff,
+                stats=stats
+            )
+        connection.reconnect_callbacks.add(partial(self._on_reconnect, vhost))
+        connection.close_callbacks.add(self._on_connection_lost)
+
+        channel_pool = channel_pool or ChannelPool(
+            connection=connection,
+            channel_factory=self._channel_factory,
+            max_size=config.RMQ_CHANNEL_POOL_SIZE,
+            acquire_timeout=config.RMQ_CHANNEL_ACQUIRE_TIMEOUT
+        )
+        publisher = EventPublisher(
+            channel_pool=channel_pool,
+            confirm_window=config.RMQ_PUBLISH_CONFIRM_WINDOW,
+            codec=self.codec
+        )
+        return VhostConnection(
+            vhost=vhost,
+            connection=connection,
+            channel_pool=channel_pool,
+            publisher=publisher,
+            stats=stats
+        )
+
+    async def _apply_plan(self, plan: TopologyPlan, recreate: bool = False) -> DeclarationReport:
+        """Применяет план: у каждого vhost своё соединение, поэтому vhost объявляются параллельно."""
+        plans = plan.by_vhost()
+        if len(plans) <= 1:
+            vhost_connection = await self.vhost(next(iter(plans), DEFAULT_VHOST))
+            return await TopologyDeclarer(vhost_connection.channel_pool, self.declare_concurrency, recreate).apply(plan)
+
+        vhost_connections = await asyncio.gather(*(self.vhost(vhost) for vhost in plans))
+        reports = await asyncio.gather(*(
+            TopologyDeclarer(vc.channel_pool, self.declare_concurrency, recreate).apply(plans[vc.vhost])
+            for vc in vhost_connections
+        ))
+        return DeclarationReport.merge(plan, dict(zip(plans, reports)))
+
+    def _on_connection_lost(self, *args: Any) -> None:
+        self._ready.clear()
+
+    def _on_reconnect(self, vhost: str, *args: Any) -> None:
+        RECONNECTS.inc()
+        logger.warning(f"Соединение с vhost '{vhost}' восстановлено после разрыва, восстанавливаем топологию")
+        task = self._recovery_tasks.get(vhost)
+        if task and not task.done():
+            task.cancel()
+        self._recovery_tasks[vhost] = asyncio.create_task(self._recover(vhost))
+
+    async def _recover(self, vhost: str = DEFAULT_VHOST) -> None:
+        """
+        После переподключения брокер мог потерять всё (рестарт без durable-данных, другой узел кластера):
+        заново объявляет последнюю применённую топологию vhost, очереди сервисов и перезапускает потребителей.
+        """
+        started = time.perf_counter()
+        self._ready.clear()
+        vhost_connection = self._vhosts[vhost]
+        vhost_connection.publisher.reset()
+        try:
+            if vhost == DEFAULT_VHOST and self.election is not None and self.is_leader:
+                if not await self.election.confirm(self.open_channel):
+                    await self._demote()
+                else:
+                    await self._declare_control_queue()
+            async with self._setup_lock:
+                plan = self._applied_topology.diff(None).by_vhost().get(vhost) if self._applied_topology else None
+                if plan and self.is_leader:
+                    declarer = TopologyDeclarer(vhost_connection.channel_pool, self.declare_concurrency)
+                    await declarer.apply(plan)
+                services_config = self.infrastructure_config and self.infrastructure_config.services_config
+                if vhost == DEFAULT_VHOST and services_config and self.is_leader:
+                    self._declared_service_queues.clear()
+                    await self.publisher.ensure_exchange(SYSTEM_EXCHANGE_NAME, type=ExchangeType.TOPIC, durable=True)
+                    await self._ensure_service_queues(services_config)
+            consumers = [consumer for consumer in self._consumers.values() if consumer.vhost == vhost]
+            await asyncio.gather(*(consumer.restart() for consumer in consumers))
+            if vhost in self._rpc_clients:
+                await self._rpc_clients[vhost].restart()
+        except Exception as e:
+            logger.error(f"Не удалось восстановить топологию vhost '{vhost}' после переподключения: {e}")
+            return
+
+        duration = time.perf_counter() - started
+        RECOVERY_DURATION.observe(duration)
+        if self._applied_topology is not None or not self.is_leader:
+            self._ready.set()
+        logger.info(
+            f"Топология vhost '{vhost}' и {len(consumers)} потребителей восстановлены за {duration * 1000:.1f} мс"
+        )
+
+    def _ensure_connected(self) -> None:
+        if not self.channel_pool:
             logger.error("Канал не инициализирован")
             raise RuntimeError("Сначала вызовите connect()")
 
-        await self._load_config()
-
-        if not self.infrastructure_config:
+    async def _setup_infrastructure(
+        self,
+        dry_run: bool = False,
+        force: bool = False,
+        recreate: bool = False,
+        compiled: CompiledInfrastructure | None = None
+    ) -> DeclarationReport | None:
+        """Основной метод настройки инфраструктуры. compiled - уже загруженная версия конфига вместо файла."""
+        self._ensure_connected()
+
+        compiled = compiled or await self._load_config()
+        infrastructure_config = compiled.config
+
+        if not infrastructure_config:
             logger.info("Используется дефолтная инфраструктура")
             await self._setup_default_infrastructure()
             return
 
-        await self._setup_exchanges_from_config()
-        await self._setup_queues_from_config()
-        await self._setup_bindings_from_config()
+        snapshot = compiled.snapshot
+        plan = snapshot.diff(None if force else self._applied_topology)
+        # CONFIG_READY - только сервисам, чья конфигурация изменилась (с force - всем)
+        changed_services = self._changed_services(infrastructure_config, force=force)
+        if dry_run:
+            return DeclarationReport(
+                dry_run=True,
+                plan=plan,
+                notified_services=[service.service_name for service in changed_services],
+                conflicts=[] if recreate else plan.changed_entities,
+                recreated=plan.changed_entities if recreate else []
+            )
+
+        report = await self._apply_plan(plan, recreate=recreate)
+        self.infrastructure_config = infrastructure_config
+        # Конфликтующие сущности не применены - следующая настройка снова покажет их в плане
+        self._applied_topology = snapshot.with_conflicts(report.conflicts, self._applied_topology)
         logger.info("Инфраструктура RabbitMQ успешно создана")
+        await self._sync_event_routing()
 
-        if self.infrastructure_config.services_config:
-            await self.publish_configuration_ready(self.infrastructure_config.services_config)
-
-    async def _setup_exchanges_from_config(self) -> None:
-        """Создаёт обменники из конфига."""
-        exchanges = self.infrastructure_config.exchanges
-        for exchange_cfg in exchanges:
-            await self.channel.declare_exchange(
-                name=exchange_cfg.name,
-                type=exchange_cfg.type,
-                durable=exchange_cfg.durable,
-                auto_delete=exchange_cfg.auto_delete,
-                internal=exchange_cfg.internal,
-                arguments=exchange_cfg.arguments
-            )
+        if infrastructure_config.services_config:
+            # Очереди сервисов нужны и тем, кого не уведомляем (брокер мог быть пересоздан)
+            await self.publisher.ensure_exchange(SYSTEM_EXCHANGE_NAME, type=ExchangeType.TOPIC, durable=True)
+            await self._ensure_service_queues(infrastructure_config.services_config)
+        CONFIG_READY_SKIPPED.inc(len(infrastructure_config.services_config or []) - len(changed_services))
+        if changed_services:
+            await self.publish_configuration_ready(changed_services)
+            report.notified_services = [service.service_name for service in changed_services]
 
-    async def _setup_queues_from_config(self) -> None:
-        """Создаёт очереди из конфига."""
-        queues = self.infrastructure_config.queues
-        for queue_cfg in queues:
-            await self.channel.declare_queue(
-                name=queue_cfg.name,
-                durable=queue_cfg.durable,
-                auto_delete=queue_cfg.auto_delete,
-                arguments=queue_cfg.arguments
-            )
+        return report
 
-    async def _setup_bindings_from_config(self) -> None:
-        """Создаёт привязки из конфига."""
-        bindings = self.infrastructure_config.bindings
-        for binding in bindings:
-            if binding.destination_type == RMQDestinationType.QUEUE:
-                queue = await self.channel.get_queue(binding.destination)
-                await queue.bind(
-                    exchange=binding.source,
-                    routing_key=binding.routing_key,
-                    arguments=binding.arguments
-                )
-            elif binding['destination_type'] == RMQDestinationType.EXCHANGE:
-                exchange = await self.channel.get_exchange(binding['destination'])
-                await exchange.bind(
-                    exchange=binding.source,
-                    routing_key=binding.routing_key,
-                    arguments=binding.arguments
-                )
+    def _changed_services(self, current: InfrastructureConfig, force: bool = False) -> list[ServiceConfig]:
+        """
+        Сервисы, чей хеш конфигурации (service_binding_conf, ключ маршрутизации) отличается
+        от последнего подтверждённого CONFIG_READY, в том числе до рестарта процесса.
+        """
+        services = current.services_config or []
+        if force:
+            return list(services)
+        return [
+            service for service in services
+            if self._config_ready_store.get(service.service_name) != config_hash(service)
+        ]
 
     async def _setup_default_infrastructure(self) -> None:
         """Создаёт дефолтную инфраструктуру, если конфиг не найден."""
-        exchange = await self.channel.declare_exchange(
-            name=RMQ_EXCHANGE_NAME,
-            type=ExchangeType.TOPIC,
-            durable=True
-        )
-        dlx_exchange = await self.channel.declare_exchange(
-            name=DLX_EXCHANGE_NAME,
-            type=ExchangeType.TOPIC,
-            durable=True
-        )
+        async with self.channel_pool.acquire() as channel:
+            exchange = await channel.declare_exchange(
+                name=RMQ_EXCHANGE_NAME,
+                type=ExchangeType.TOPIC,
+                durable=True
+            )
+            dlx_exchange = await channel.declare_exchange(
+                name=DLX_EXCHANGE_NAME,
+                type=ExchangeType.TOPIC,
+                durable=True
+            )
 
-        dlx_queue = await self.channel.declare_queue(name=DLX_QUEUE_NAME, durable=True, arguments={'x-queue-type': 'classic'})
-        await dlx_queue.bind(exchange=dlx_exchange, routing_key='#')
+            dlx_queue = await channel.declare_queue(name=DLX_QUEUE_NAME, durable=True, arguments={'x-queue-type': 'classic'})
+            await dlx_queue.bind(exchange=dlx_exchange, routing_key='#')
 
-        queue_args = {
-            'x-dead-letter-exchange': DLX_EXCHANGE_NAME,
-            'x-dead-letter-routing-key': DLX_QUEUE_NAME,
-            'x-queue-type': 'classic'
-        }
+            queue_args = {
+                'x-dead-letter-exchange': DLX_EXCHANGE_NAME,
+                'x-dead-letter-routing-key': DLX_QUEUE_NAME,
+                'x-queue-type': 'classic'
+            }
 
-        main_queue = await self.channel.declare_queue(name=RMQ_QUEUE_NAME, durable=True, arguments=queue_args)
-        await main_queue.bind(exchange=exchange, routing_key=RMQ_ROUTING_KEY)
+            main_queue = await channel.declare_queue(name=RMQ_QUEUE_NAME, durable=True, arguments=queue_args)
+            await main_queue.bind(exchange=exchange, routing_key=RMQ_ROUTING_KEY)
 
         logger.info("Дефолтная инфраструктура настроена")
 
     # ==== Фабрики по умолчанию (могут быть переопределены с помощью DI) ====
-    async def _default_connection_factory(self) -> AbstractRobustConnection:
-        return await aio_pika.connect_robust(
-            host='rabbitmq-local',
-            port=RMQ_PORT,
-            login=RMQ_USER,
-            password=RMQ_PASS,
+    async def _default_connection_factory(self, virtualhost: str = DEFAULT_VHOST) -> AbstractRobustConnection:
+        hosts = parse_hosts(config.RMQ_HOSTS, RMQ_PORT)
+        urls = build_urls(hosts, login=RMQ_USER, password=RMQ_PASS, virtualhost=virtualhost)
+        stats = self._connection_stats.setdefault(virtualhost, ConnectionStats())
+        connection = FailoverRobustConnection(
+            urls,
+            backoff=self._backoff,
+            stats=stats,
+            connect_timeout=config.RMQ_CONNECT_TIMEOUT,
+            # Каждая следующая попытка подключения начинается со следующего узла
+            start_index=stats.connect_attempts - 1,
+            reconnect_interval=self._backoff.initial
         )
+        try:
+            await connection.connect(timeout=config.RMQ_CONNECT_TIMEOUT)
+        except BaseException:
+            with suppress(Exception):
+                await connection.close()
+            raise
+        return connection
 
     async def _default_channel_factory(self, connection: AbstractRobustConnection) -> AbstractChannel:
         return await connection.channel()
 
     # ==== Методы Consumer ====
-    async def consume_events(self, callback) -> None:
-        """Запускает потребителя событий"""
-        pass
+    async def consume_events(
+        self,
+        callback: MessageHandler,
+        queue_name: str = RMQ_QUEUE_NAME,
+        prefetch_count: int | None = None,
+        concurrency: int | None = None,
+        retry_policy: RetryPolicyConfig | None = None,
+        vhost: str = DEFAULT_VHOST
+    ) -> str:
+        """
+        Запускает потребителя очереди на выделенном канале.
+        Сообщение подтверждается, если callback завершился без исключения. Иначе при заданной
+        retry_policy оно откладывается на повтор через очереди задержки, а после max_attempts уходит в DLX.
+        :return: consumer_tag для остановки через stop_consuming
+        """
+        vhost_connection = await self.vhost(vhost)
+        retry = RetryScheduler(vhost_connection.publisher, queue_name, retry_policy) if retry_policy else None
+        consumer = QueueConsumer(
+            connection=vhost_connection.connection,
+            channel_factory=self._channel_factory,
+            queue_name=queue_name,
+            handler=callback,
+            prefetch_count=prefetch_count or config.RMQ_CONSUMER_PREFETCH,
+            concurrency=concurrency,
+            ack_batch_size=config.RMQ_CONSUMER_ACK_BATCH_SIZE,
+            ack_flush_interval=config.RMQ_CONSUMER_ACK_FLUSH_INTERVAL,
+            retry=retry,
+            vhost=vhost
+        )
+        consumer_tag = await consumer.start()
+        self._consumers[consumer_tag] = consumer
+        return consumer_tag
+
+    async def consume_service_binding(self, binding: ServiceBindingConfig, callback: MessageHandler) -> str:
+        """Запускает потребителя очереди сервиса с prefetch_count и retry_policy из его конфигурации."""
+        return await self.consume_events(
+            callback,
+            queue_name=binding.queue,
+            prefetch_count=binding.prefetch_count,
+            retry_policy=binding.retry_policy,
+            vhost=binding.vhost
+        )
+
+    async def stop_consuming(self, consumer_tag: str, drain_timeout: float | None = None) -> None:
+        """Останавливает потребителя, дождавшись завершения текущих обработчиков."""
+        consumer = self._consumers.pop(consumer_tag, None)
+        if consumer is None:
+            logger.warning(f"Потребитель {consumer_tag} не найден")
+            return
+        await consumer.stop(drain_timeout=drain_timeout or config.RMQ_CONSUMER_DRAIN_TIMEOUT)
 
-    async def stop_consuming(self, topic: str):
-        pass
+    def consumers_stats(self) -> list[dict]:
+        return [consumer.stats().as_dict() for consumer in self._consumers.values()]
 
     # ==== Прикладные методы ====
-    async def get_queue_info(self, queue_name: str) -> QueueInfo:
+    async def browse_queue(
+        self,
+        queue_name: str,
+        vhost: str = DEFAULT_VHOST,
+        mode: BrowseMode = BrowseMode.PEEK,
+        message_filter: MessageFilter | None = None,
+        limit: int = 100,
+        max_scan: int | None = None
+    ) -> QueueBrowser:
+        """
+        Готовит просмотр сообщений очереди на выделенном канале.
+        Очередь проверяется сразу, сообщения читаются при итерации по browser.ndjson().
+        """
+        channel = await self.open_channel(vhost)
+        browser = QueueBrowser(
+            channel=channel,
+            queue_name=queue_name,
+            vhost=vhost,
+            mode=mode,
+            message_filter=message_filter,
+            limit=min(limit, config.RMQ_BROWSE_MAX_LIMIT),
+            max_scan=min(max_scan or limit * 10, config.RMQ_BROWSE_MAX_SCAN),
+            timeout=config.RMQ_BROWSE_TIMEOUT,
+            max_body_bytes=config.RMQ_BROWSE_MAX_BODY_BYTES
+        )
+        try:
+            await browser.open()
+        except BaseException:
+            await browser.close()
+            raise
+        return browser
+
+    @timed(AMQP_OPERATION_DURATION, operation="get_queue_info")
+    async def get_queue_info(self, queue_name: str, vhost: str = DEFAULT_VHOST) -> QueueInfo:
         """Возвращает информацию о конкретной очереди."""
         try:
-            queue = await self.channel.declare_queue(
-                queue_name,
-                passive=True  # Только проверка существования
-            )
+            vhost_connection = await self.vhost(vhost)
+            # Пассивное объявление несуществующей очереди закрывает канал - пул заменит его новым
+            async with vhost_connection.channel_pool.acquire() as channel:
+                queue = await channel.declare_queue(
+                    queue_name,
+                    passive=True  # Только проверка существования
+                )
             return {
                 "name": queue.name,
+                "vhost": vhost,
                 "messages": queue.declaration_result.message_count,
                 "consumers": queue.declaration_result.consumer_count
             }
         except Exception as e:
-            return {"name": queue_name, "error": str(e)}
+            return {"name": queue_name, "vhost": vhost, "error": str(e)}
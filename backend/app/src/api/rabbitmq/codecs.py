@@ -0,0 +1,265 @@
+import zlib
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Iterable
+
+import pydantic_core
+from aio_pika.abc import AbstractIncomingMessage
+from pydantic import BaseModel
+
+from app.configs.settings import get_settings
+from app.src.api.rabbitmq.schemas import Event
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - необязательная зависимость
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - необязательная зависимость
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - необязательная зависимость
+    zstandard = None
+
+config = get_settings()
+
+JSON_CONTENT_TYPE = "application/json"
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+
+
+class CodecError(ValueError):
+    """Неизвестный content_type/content_encoding или не установлена библиотека кодека."""
+
+
+# ==== Кодеки тела сообщения (content_type) ====
+class Codec:
+    name: str
+    content_type: str
+
+    def encode(self, obj: Any) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, body: bytes) -> Any:
+        raise NotImplementedError
+
+    def encode_events(self, events: Iterable[BaseModel]) -> list[bytes]:
+        """Модели сериализуются в примитивы pydantic-core, минуя model_dump и валидацию."""
+        return [self.encode(event.__pydantic_serializer__.to_python(event, mode="json")) for event in events]
+
+    def ensure_available(self) -> None:
+        """Проверяет при старте, что библиотека кодека установлена."""
+
+
+class JsonCodec(Codec):
+    """
+    JSON. Модели сериализуются сериализатором pydantic-core сразу в bytes,
+    произвольные объекты и разбор - через orjson, если он установлен, иначе
+    через pydantic-core (тот же порядок скорости, без новой зависимости).
+    """
+    name = "json"
+    content_type = JSON_CONTENT_TYPE
+
+    def encode(self, obj: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(obj)
+        return pydantic_core.to_json(obj)
+
+    def decode(self, body: bytes) -> Any:
+        if orjson is not None:
+            return orjson.loads(body)
+        return pydantic_core.from_json(body)
+
+    def encode_events(self, events: Iterable[BaseModel]) -> list[bytes]:
+        return [event.__pydantic_serializer__.to_json(event) for event in events]
+
+
+class MsgPackCodec(Codec):
+    """MessagePack (пакет msgpack): компактнее JSON на числах и бинарных данных."""
+    name = "msgpack"
+    content_type = MSGPACK_CONTENT_TYPE
+
+    def encode(self, obj: Any) -> bytes:
+        self.ensure_available()
+        return msgpack.packb(obj, use_bin_type=True)
+
+    def decode(self, body: bytes) -> Any:
+        self.ensure_available()
+        return msgpack.unpackb(body, raw=False)
+
+    def ensure_available(self) -> None:
+        if msgpack is None:
+            raise CodecError("Кодек msgpack требует пакет msgpack")
+
+
+# ==== Сжатие (content_encoding) ====
+class Compression:
+    name: str
+
+    def compress(self, body: bytes) -> bytes:
+        raise NotImplementedError
+
+    def decompress(self, body: bytes) -> bytes:
+        raise NotImplementedError
+
+    def ensure_available(self) -> None:
+        ...
+
+
+class ZlibCompression(Compression):
+    name = "deflate"
+
+    def __init__(self, level: int = 6):
+        self.level = level
+
+    def compress(self, body: bytes) -> bytes:
+        return zlib.compress(body, self.level)
+
+    def decompress(self, body: bytes) -> bytes:
+        return zlib.decompress(body)
+
+
+class ZstdCompression(Compression):
+    name = "zstd"
+
+    def __init__(self, level: int = 3):
+        self.level = level
+
+    def compress(self, body: bytes) -> bytes:
+        self.ensure_available()
+        return zstandard.ZstdCompressor(level=self.level).compress(body)
+
+    def decompress(self, body: bytes) -> bytes:
+        self.ensure_available()
+        return zstandard.ZstdDecompressor().decompress(body)
+
+    def ensure_available(self) -> None:
+        if zstandard is None:
+            raise CodecError("Сжатие zstd требует пакет zstandard")
+
+
+CODECS: dict[str, Codec] = {codec.content_type: codec for codec in (JsonCodec(), MsgPackCodec())}
+COMPRESSIONS: dict[str, Compression] = {
+    compression.name: compression for compression in (ZlibCompression(), ZstdCompression())
+}
+# Имена в настройках: RMQ_CODEC=json|msgpack, RMQ_COMPRESSION=none|zlib|zstd
+_CODEC_ALIASES = {codec.name: codec for codec in CODECS.values()}
+_COMPRESSION_ALIASES = {"zlib": COMPRESSIONS["deflate"], **COMPRESSIONS}
+
+
+def get_codec(content_type: str | None) -> Codec:
+    """Кодек по content_type (параметры вида '; charset=utf-8' игнорируются). Без content_type - JSON."""
+    if not content_type:
+        return CODECS[JSON_CONTENT_TYPE]
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    codec = CODECS.get(media_type) or _CODEC_ALIASES.get(media_type)
+    if codec is None:
+        raise CodecError(f"Unsupported content_type: {content_type}")
+    return codec
+
+
+def get_compression(content_encoding: str | None) -> Compression | None:
+    if not content_encoding or content_encoding == "identity":
+        return None
+    compression = _COMPRESSION_ALIASES.get(content_encoding.lower())
+    if compression is None:
+        raise CodecError(f"Unsupported content_encoding: {content_encoding}")
+    return compression
+
+
+def decode_body(body: bytes, content_type: str | None = None, content_encoding: str | None = None) -> Any:
+    """Распаковывает и разбирает тело в примитивы Python (dict/list/...), без построения моделей."""
+    compression = get_compression(content_encoding)
+    codec = get_codec(content_type)
+    try:
+        if compression is not None:
+            body = compression.decompress(body)
+        return codec.decode(body)
+    except CodecError:
+        raise
+    except Exception as e:
+        # Ошибки библиотек (zlib.error, msgpack, orjson) - к одному типу
+        raise CodecError(f"Не удалось декодировать тело ({content_type}, {content_encoding}): {e}") from e
+
+
+@dataclass
+class EncodedBody:
+    body: bytes
+    content_type: str
+    content_encoding: str | None = None
+
+
+class MessageCodec:
+    """
+    Кодирование исходящих сообщений: кодек тела и сжатие. Сжимаются только
+    тела не меньше compress_min_bytes - на маленьких сообщениях сжатие
+    тратит CPU, не уменьшая размер.
+    """
+
+    def __init__(self, codec: Codec, compression: Compression | None = None, compress_min_bytes: int = 1024):
+        codec.ensure_available()
+        if compression is not None:
+            compression.ensure_available()
+        self.codec = codec
+        self.compression = compression
+        self.compress_min_bytes = compress_min_bytes
+
+    @property
+    def content_type(self) -> str:
+        return self.codec.content_type
+
+    def encode(self, obj: Any) -> EncodedBody:
+        return self._pack(self.codec.encode(obj))
+
+    def encode_events(self, events: Iterable[Event]) -> list[EncodedBody]:
+        return [self._pack(body) for body in self.codec.encode_events(events)]
+
+    # ==== Приватные методы / помощники ====
+    def _pack(self, body: bytes) -> EncodedBody:
+        if self.compression is not None and len(body) >= self.compress_min_bytes:
+            return EncodedBody(self.compression.compress(body), self.codec.content_type, self.compression.name)
+        return EncodedBody(body, self.codec.content_type)
+
+
+def create_message_codec(
+    codec: str = config.RMQ_CODEC,
+    compression: str = config.RMQ_COMPRESSION,
+    compress_min_bytes: int = config.RMQ_COMPRESSION_MIN_BYTES
+) -> MessageCodec:
+    return MessageCodec(
+        codec=get_codec(codec),
+        compression=None if compression == "none" else get_compression(compression),
+        compress_min_bytes=compress_min_bytes
+    )
+
+
+class LazyMessage:
+    """
+    Входящее сообщение с ленивым разбором тела: data декодируется при первом
+    обращении и кешируется. Обработчик, которому нужны заголовки или одно поле,
+    не строит модель pydantic; as_event() - когда нужна валидация.
+    """
+
+    def __init__(self, message: AbstractIncomingMessage):
+        self.message = message
+
+    @property
+    def body(self) -> bytes:
+        return self.message.body
+
+    @cached_property
+    def data(self) -> Any:
+        return decode_body(self.message.body, self.message.content_type, self.message.content_encoding)
+
+    @property
+    def event_type(self) -> str | None:
+        return self.data.get("event_type") if isinstance(self.data, dict) else None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.data.get(key, default) if isinstance(self.data, dict) else default
+
+    def as_event(self, model: type[Event] = Event) -> Event:
+        return model.model_validate(self.data)
@@ -0,0 +1,244 @@
+import asyncio
+import random
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Sequence
+
+from aio_pika import RobustConnection
+from aio_pika.abc import AbstractRobustConnection
+from aio_pika.exceptions import CONNECTION_EXCEPTIONS
+from yarl import URL
+
+from app.src.api.rabbitmq.base import AMQPConnectionFactory
+from app.src.api.rabbitmq.metrics import CONNECTION_ATTEMPTS, RECONNECT_DURATION
+from app.src.api.rabbitmq.pool import ChannelPool
+from app.src.api.rabbitmq.publisher import EventPublisher
+from app.src.core.logging import logger
+
+
+@dataclass
+class ExponentialBackoff:
+    """Пауза перед попыткой attempt (с 0): initial * multiplier ** attempt, не больше maximum, со случайным разбросом."""
+    initial: float = 0.5
+    multiplier: float = 2.0
+    maximum: float = 30.0
+    jitter: bool = True
+
+    def delay(self, attempt: int) -> float:
+        delay = min(self.maximum, self.initial * self.multiplier ** attempt)
+        # Разброс не даёт всем репликам одновременно ломиться в поднимающийся брокер
+        return random.uniform(delay / 2, delay) if self.jitter else delay
+
+
+@dataclass
+class ConnectionStats:
+    """Счётчики подключений к брокеру."""
+    url: str | None = None
+    connected: bool = False
+    connect_attempts: int = 0
+    connect_failures: int = 0
+    reconnects: int = 0
+    failovers: int = 0
+    last_reconnect_duration_ms: float | None = None
+    disconnected_since: float | None = None
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        data["disconnected_for_ms"] = (
+            round((time.monotonic() - self.disconnected_since) * 1000, 1) if self.disconnected_since else None
+        )
+        del data["disconnected_since"]
+        return data
+
+
+@dataclass
+class VhostConnection:
+    """Соединение с одним vhost: у каждого vhost свои соединение, пул каналов и публикатор."""
+    vhost: str
+    connection: AbstractRobustConnection
+    channel_pool: ChannelPool
+    publisher: EventPublisher
+    stats: ConnectionStats
+
+    def as_dict(self) -> dict:
+        return {
+            "vhost": self.vhost,
+            "connection": self.stats.as_dict(),
+            "channel_pool": self.channel_pool.stats().as_dict(),
+        }
+
+    @property
+    def is_connected(self) -> bool:
+        return self.stats.connected and not self.connection.is_closed
+
+    @property
+    def is_blocked(self) -> bool:
+        """Брокер прислал connection.blocked (memory/disk alarm): публикации не уходят до unblocked."""
+        unblocked = unblocked_event(self.connection)
+        return unblocked is not None and not unblocked.is_set()
+
+    @property
+    def heartbeat_age(self) -> float | None:
+        """Секунд с последнего кадра от брокера (данные или heartbeat); None - неизвестно."""
+        last_frame = last_frame_time(self.connection)
+        return None if last_frame is None else max(0.0, asyncio.get_running_loop().time() - last_frame)
+
+    async def wait_unblocked(self) -> None:
+        unblocked = unblocked_event(self.connection)
+        if unblocked is not None:
+            await unblocked.wait()
+
+    async def close(self) -> None:
+        await self.channel_pool.close()
+        await self.connection.close()
+
+
+def unblocked_event(connection: AbstractRobustConnection) -> asyncio.Event | None:
+    """
+    Событие соединения aiormq: сбрасывается по connection.blocked и выставляется по
+    connection.unblocked (aiormq ждёт его перед каждой записью в сокет). У aio_pika
+    нет публичного API для этого состояния, поэтому читаем его из транспорта;
+    после переподключения транспорт новый - событие берётся при каждом обращении.
+    """
+    transport = getattr(connection, "transport", None)
+    return getattr(getattr(transport, "connection", None), "_Connection__connection_unblocked", None)
+
+
+def last_frame_time(connection: AbstractRobustConnection) -> float | None:
+    """
+    Время (loop.time()) последнего кадра, полученного aiormq. Брокер шлёт heartbeat
+    каждые heartbeat/2 секунд простоя, поэтому давно не обновлявшееся значение
+    означает зависшее соединение ещё до того, как aiormq его разорвёт.
+    """
+    transport = getattr(connection, "transport", None)
+    return getattr(getattr(transport, "connection", None), "_Connection__last_frame_time", None)
+
+
+def parse_hosts(hosts: str, default_port: int) -> list[tuple[str, int]]:
+    """Разбирает список узлов вида 'host1:5672,host2'."""
+    result = []
+    for item in hosts.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        host, _, port = item.partition(":")
+        result.append((host, int(port) if port else default_port))
+    return result
+
+
+def build_urls(hosts: Sequence[tuple[str, int]], login: str, password: str, virtualhost: str = "/") -> list[URL]:
+    # Пустой путь aiormq трактует как vhost "/"
+    path = "/" + virtualhost.lstrip("/")
+    return [URL.build(scheme="amqp", user=login, password=password, host=host, port=port, path=path) for host, port in hosts]
+
+
+def mask_url(url: URL) -> str:
+    return str(url.with_password("******")) if url.password else str(url)
+
+
+class FailoverRobustConnection(RobustConnection):
+    """
+    RobustConnection с перебором узлов кластера и экспоненциальной паузой.
+
+    aio_pika переподключается к self.url и ждёт reconnect_interval между
+    неудачными попытками. Пока соединение разорвано, сторож увеличивает паузу
+    по backoff и переключает self.url на следующий узел, если текущий не
+    поднялся за отведённое время. После восстановления пауза сбрасывается.
+    """
+
+    def __init__(
+        self,
+        urls: Sequence[URL],
+        backoff: ExponentialBackoff | None = None,
+        stats: ConnectionStats | None = None,
+        connect_timeout: float | None = None,
+        start_index: int = 0,
+        **kwargs: Any
+    ):
+        self.urls = list(urls)
+        self._url_index = start_index % len(self.urls)
+        super().__init__(self.urls[self._url_index], **kwargs)
+        self.backoff = backoff or ExponentialBackoff(initial=self.reconnect_interval)
+        self.stats = stats or ConnectionStats()
+        self.stats.url = mask_url(self.url)
+        self._connect_timeout = connect_timeout
+        self._watchdog: asyncio.Task | None = None
+
+    async def _on_connection_close(self, closing: asyncio.Future) -> None:
+        was_connected = self.connected.is_set()
+        await super()._on_connection_close(closing)
+        if self._close_called or self.is_closed or not was_connected:
+            return
+        self.stats.connected = False
+        self.stats.disconnected_since = time.monotonic()
+        logger.warning(f"Соединение с RabbitMQ {mask_url(self.url)} потеряно")
+        if self._watchdog is None or self._watchdog.done():
+            self._watchdog = self.loop.create_task(self._watch_reconnect())
+
+    async def _on_connected(self) -> None:
+        if self.stats.disconnected_since is not None:
+            duration = time.monotonic() - self.stats.disconnected_since
+            self.stats.reconnects += 1
+            self.stats.last_reconnect_duration_ms = round(duration * 1000, 1)
+            self.stats.disconnected_since = None
+            RECONNECT_DURATION.observe(duration)
+            logger.info(f"Соединение с RabbitMQ {mask_url(self.url)} восстановлено за {duration:.2f} с")
+        self.stats.connected = True
+        self.stats.url = mask_url(self.url)
+        self.reconnect_interval = self.backoff.initial
+        await super()._on_connected()
+
+    async def close(self, exc: Any = asyncio.CancelledError) -> None:
+        if self._watchdog and not self._watchdog.done():
+            self._watchdog.cancel()
+        self.stats.connected = False
+        await super().close(exc)
+
+    # ==== Приватные методы / помощники ====
+    async def _watch_reconnect(self) -> None:
+        attempt = 0
+        while not self.connected.is_set() and not self.is_closed:
+            self.reconnect_interval = self.backoff.delay(attempt)
+            try:
+                async with asyncio.timeout(self.reconnect_interval + (self._connect_timeout or 0)):
+                    await self.connected.wait()
+                return
+            except TimeoutError:
+                attempt += 1
+                if len(self.urls) > 1:
+                    self._url_index = (self._url_index + 1) % len(self.urls)
+                    self.url = self.urls[self._url_index]
+                    self.stats.failovers += 1
+                    logger.warning(f"Переключение на узел RabbitMQ {mask_url(self.url)}")
+
+
+async def connect_with_retry(
+    factory: AMQPConnectionFactory,
+    attempts: int,
+    backoff: ExponentialBackoff,
+    stats: ConnectionStats | None = None
+) -> AbstractRobustConnection:
+    """
+    Вызывает фабрику соединений до attempts раз с экспоненциальной паузой.
+    Фабрика сама выбирает узел по номеру попытки (см. RabbitMQClient._default_connection_factory).
+    """
+    stats = stats or ConnectionStats()
+    last_error: BaseException | None = None
+    for attempt in range(max(1, attempts)):
+        stats.connect_attempts += 1
+        try:
+            connection = await factory()
+        except (*CONNECTION_EXCEPTIONS, TimeoutError) as e:
+            last_error = e
+            stats.connect_failures += 1
+            CONNECTION_ATTEMPTS.labels(outcome="failure").inc()
+            if attempt + 1 >= attempts:
+                break
+            delay = backoff.delay(attempt)
+            logger.warning(f"Попытка подключения к RabbitMQ {attempt + 1}/{attempts} не удалась: {e}. Повтор через {delay:.1f} с")
+            await asyncio.sleep(delay)
+        else:
+            CONNECTION_ATTEMPTS.labels(outcome="success").inc()
+            stats.connected = True
+            return connection
+    raise ConnectionError(f"Не удалось подключиться к RabbitMQ за {attempts} попыток: {last_error}") from last_error
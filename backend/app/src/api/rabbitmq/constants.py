@@ -4,6 +4,7 @@ from enum import Enum
 RMQ_USER = "guest"
 RMQ_PASS = "guest"
 RMQ_PORT = 5672
+DEFAULT_VHOST = "/"
 RMQ_QUEUE_NAME = "main.events"
 RMQ_EXCHANGE_NAME = "minio_events"
 RMQ_ROUTING_KEY = "minio.bucket.events"
@@ -16,6 +17,11 @@ SYSTEM_EXCHANGE_NAME = "system.exchange"
 SYSTEM_NOTIFICATION_QUEUE_NAME = "system.notifications.main-local.queue"
 SYSTEM_ROUTING_KEY = "system.event.configuration_ready"
 
+RETRY_QUEUE_SUFFIX = ".retry"
+RETRY_ATTEMPT_HEADER = "x-retry-attempt"
+
+REPLY_TO_QUEUE = "amq.rabbitmq.reply-to"
+
 
 class RMQDestinationType(str, Enum):
     QUEUE = 'queue'
@@ -0,0 +1,285 @@
+import asyncio
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable
+
+from aio_pika.abc import AbstractChannel, AbstractIncomingMessage, AbstractQueue, AbstractRobustConnection
+
+from app.src.api.rabbitmq.base import AMQPChannelFactory
+from app.src.api.rabbitmq.constants import DEFAULT_VHOST
+from app.src.api.rabbitmq.metrics import MESSAGES_ACKED, MESSAGES_NACKED, MESSAGES_RETRIED
+from app.src.api.rabbitmq.retry import RetryScheduler
+from app.src.core.logging import logger
+
+MessageHandler = Callable[[AbstractIncomingMessage], Awaitable[Any]]
+
+
+@dataclass
+class ConsumerStats:
+    """Снимок метрик потребителя очереди."""
+    queue: str
+    vhost: str
+    consumer_tag: str | None
+    prefetch_count: int
+    concurrency: int
+    delivered: int
+    acked: int
+    nacked: int
+    retried: int
+    in_flight: int
+    pending_acks: int
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class AckBatcher:
+    """
+    Копит подтверждения и отправляет их одним basic.ack(multiple=True).
+
+    Обработчики завершаются не по порядку, а multiple=True подтверждает все
+    сообщения до указанного тега включительно. Поэтому подтверждается только
+    непрерывный префикс обработанных доставок. Отказы (nack) отправляются
+    сразу и поштучно - такие теги считаются закрытыми для префикса.
+    """
+
+    def __init__(self, batch_size: int = 50):
+        self._batch_size = max(1, batch_size)
+        self._outstanding: deque[int] = deque()
+        self._messages: dict[int, AbstractIncomingMessage] = {}
+        self._settled: dict[int, bool] = {}  # delivery_tag -> подтверждён (True) / отклонён (False)
+        self._ready = 0
+        self._lock = asyncio.Lock()
+
+        self.acked = 0
+        self.nacked = 0
+
+    @property
+    def pending(self) -> int:
+        return self._ready
+
+    def track(self, message: AbstractIncomingMessage) -> None:
+        """Регистрирует доставку. Вызывать в порядке поступления сообщений."""
+        self._outstanding.append(message.delivery_tag)
+        self._messages[message.delivery_tag] = message
+
+    def is_tracked(self, message: AbstractIncomingMessage) -> bool:
+        # Теги доставки нумеруются заново на каждом канале, поэтому сверяем сам объект сообщения
+        return self._messages.get(message.delivery_tag) is message
+
+    async def ack(self, message: AbstractIncomingMessage) -> None:
+        if not self.is_tracked(message):
+            return  # Доставка закрытого канала: брокер уже вернул сообщение в очередь
+        self._settled[message.delivery_tag] = True
+        self._ready += 1
+        if self._ready >= self._batch_size:
+            await self.flush()
+
+    async def nack(self, message: AbstractIncomingMessage, requeue: bool = False) -> None:
+        if not self.is_tracked(message):
+            return
+        await message.nack(requeue=requeue)
+        self._settled[message.delivery_tag] = False
+        self.nacked += 1
+
+    async def flush(self) -> None:
+        """Подтверждает непрерывный префикс обработанных доставок."""
+        async with self._lock:
+            last_acked: AbstractIncomingMessage | None = None
+            count = 0
+            while self._outstanding and self._outstanding[0] in self._settled:
+                tag = self._outstanding.popleft()
+                message = self._messages.pop(tag)
+                if self._settled.pop(tag):
+                    last_acked = message
+                    count += 1
+            if last_acked is None:
+                return
+            self._ready -= count
+            await last_acked.ack(multiple=True)
+            self.acked += count
+
+    def reset(self) -> None:
+        """Забывает доставки закрытого канала - брокер сам вернёт их в очередь."""
+        self._outstanding.clear()
+        self._messages.clear()
+        self._settled.clear()
+        self._ready = 0
+
+
+class QueueConsumer:
+    """
+    Потребитель одной очереди на выделенном канале.
+
+    Брокер держит не больше prefetch_count неподтверждённых сообщений,
+    одновременно выполняется не больше concurrency обработчиков. Успешно
+    обработанные сообщения подтверждаются пачками. При исключении в
+    обработчике сообщение откладывается на повтор (если задан retry), а когда
+    попытки исчерпаны - отклоняется без возврата в очередь (уходит в DLX).
+    """
+
+    def __init__(
+        self,
+        connection: AbstractRobustConnection,
+        channel_factory: AMQPChannelFactory,
+        queue_name: str,
+        handler: MessageHandler,
+        prefetch_count: int = 100,
+        concurrency: int | None = None,
+        ack_batch_size: int = 50,
+        ack_flush_interval: float = 0.05,
+        retry: RetryScheduler | None = None,
+        vhost: str = DEFAULT_VHOST
+    ):
+        self.queue_name = queue_name
+        self.vhost = vhost
+        self.prefetch_count = max(1, prefetch_count)
+        self.concurrency = max(1, min(concurrency or self.prefetch_count, self.prefetch_count))
+        self.consumer_tag: str | None = None
+
+        self._connection = connection
+        self._channel_factory = channel_factory
+        self._handler = handler
+        self._retry = retry
+        self._ack_flush_interval = ack_flush_interval
+        self._acks = AckBatcher(batch_size=min(ack_batch_size, self.prefetch_count))
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        self._channel: AbstractChannel | None = None
+        self._queue: AbstractQueue | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._flusher: asyncio.Task | None = None
+
+        self._delivered = 0
+        self._in_flight = 0
+        self._retried = 0
+
+        # Дочерние метрики берутся один раз - на каждое сообщение только инкремент
+        self._acked_metric = MESSAGES_ACKED.labels(queue=queue_name)
+        self._nacked_metric = MESSAGES_NACKED.labels(queue=queue_name)
+        self._retried_metric = MESSAGES_RETRIED.labels(queue=queue_name)
+
+    async def start(self) -> str:
+        """Открывает канал, выставляет prefetch и начинает потребление."""
+        self._channel = await self._channel_factory(self._connection)
+        self._channel.close_callbacks.add(self._on_channel_close)
+        await self._channel.set_qos(prefetch_count=self.prefetch_count)
+        self._queue = await self._channel.get_queue(self.queue_name, ensure=False)
+        self.consumer_tag = await self._queue.consume(self._on_message, consumer_tag=self.consumer_tag)
+        self._flusher = asyncio.create_task(self._flush_periodically())
+        logger.info(
+            f"Потребитель {self.consumer_tag} запущен для очереди '{self.queue_name}' "
+            f"(prefetch={self.prefetch_count}, concurrency={self.concurrency})"
+        )
+        return self.consumer_tag
+
+    async def stop(self, drain_timeout: float | None = None) -> None:
+        """
+        Останавливает потребление: отменяет подписку, дожидается текущих
+        обработчиков (не дольше drain_timeout), досылает подтверждения и закрывает канал.
+        Необработанные сообщения брокер вернёт в очередь при закрытии канала.
+        """
+        if self._channel and not self._channel.is_closed and self.consumer_tag:
+            try:
+                await self._queue.cancel(self.consumer_tag)
+            except Exception as e:
+                logger.warning(f"Не удалось отменить подписку {self.consumer_tag}: {e}")
+
+        if self._tasks:
+            _, pending = await asyncio.wait(set(self._tasks), timeout=drain_timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                logger.warning(f"Потребитель {self.consumer_tag}: прервано {len(pending)} обработчиков по таймауту")
+
+        if self._flusher:
+            self._flusher.cancel()
+        if self._channel and not self._channel.is_closed:
+            try:
+                await self._acks.flush()
+                await self._channel.close()
+            except Exception as e:
+                logger.warning(f"Потребитель {self.consumer_tag}: ошибка при закрытии канала: {e}")
+        logger.info(f"Потребитель {self.consumer_tag} очереди '{self.queue_name}' остановлен")
+
+    async def restart(self) -> None:
+        """
+        Возобновляет потребление на новом канале с тем же consumer_tag (после переподключения).
+        Доставки старого канала забываются - брокер вернул их в очередь.
+        """
+        old_channel = self._channel
+        self._channel = None
+        self._acks.reset()
+        if self._flusher:
+            self._flusher.cancel()
+        if old_channel and not old_channel.is_closed:
+            try:
+                await old_channel.close()
+            except Exception as e:
+                logger.warning(f"Потребитель {self.consumer_tag}: ошибка при закрытии старого канала: {e}")
+        await self.start()
+
+    def stats(self) -> ConsumerStats:
+        return ConsumerStats(
+            queue=self.queue_name,
+            vhost=self.vhost,
+            consumer_tag=self.consumer_tag,
+            prefetch_count=self.prefetch_count,
+            concurrency=self.concurrency,
+            delivered=self._delivered,
+            acked=self._acks.acked,
+            nacked=self._acks.nacked,
+            retried=self._retried,
+            in_flight=self._in_flight,
+            pending_acks=self._acks.pending,
+        )
+
+    # ==== Приватные методы / помощники ====
+    async def _on_message(self, message: AbstractIncomingMessage) -> None:
+        # Регистрация до первого await - сохраняет порядок тегов доставки
+        self._acks.track(message)
+        self._delivered += 1
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        try:
+            async with self._semaphore:
+                self._in_flight += 1
+                try:
+                    await self._handle(message)
+                finally:
+                    self._in_flight -= 1
+        finally:
+            self._tasks.discard(task)
+
+    async def _handle(self, message: AbstractIncomingMessage) -> None:
+        try:
+            await self._handler(message)
+        except Exception as e:
+            logger.error(
+                "Ошибка обработки сообщения {delivery_tag} из '{queue}': {error}",
+                delivery_tag=message.delivery_tag, queue=self.queue_name, error=e
+            )
+            if self._retry and await self._retry.schedule(message):
+                self._retried += 1
+                self._retried_metric.inc()
+                await self._acks.ack(message)
+            else:
+                self._nacked_metric.inc()
+                await self._acks.nack(message, requeue=False)
+        else:
+            self._acked_metric.inc()
+            await self._acks.ack(message)
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._ack_flush_interval)
+            if not self._acks.pending:
+                continue
+            try:
+                await self._acks.flush()
+            except Exception as e:
+                logger.error(f"Потребитель {self.consumer_tag}: не удалось отправить подтверждения: {e}")
+
+    def _on_channel_close(self, sender: Any = None, *args: Any) -> None:
+        if sender is None or sender is self._channel:
+            self._acks.reset()
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+from aio_pika.abc import AbstractIncomingMessage
+
+from app.configs.settings import get_settings
+from app.src.api.rabbitmq.consumer import MessageHandler
+from app.src.api.rabbitmq.metrics import DUPLICATES_SKIPPED
+from app.src.api.rabbitmq.schemas import ServiceConfig
+from app.src.core.logging import logger
+
+config = get_settings()
+
+CONFIG_HASH_HEADER = "x-config-hash"
+
+
+def config_hash(service: ServiceConfig) -> str:
+    """Хеш содержимого конфигурации сервиса: сериализация pydantic детерминирована по порядку полей."""
+    return hashlib.sha256(service.__pydantic_serializer__.to_json(service)).hexdigest()[:32]
+
+
+def config_ready_message_id(service: ServiceConfig, digest: str) -> str:
+    """Ключ идемпотентности CONFIG_READY: одинаковая конфигурация - одинаковый message_id."""
+    return f"{service.service_name}:{digest}"
+
+
+class ConfigReadyStore:
+    """
+    Хеши конфигураций, о которых сервисы уже уведомлены CONFIG_READY.
+
+    Хранится в файле каталога кеша, поэтому переживает рестарт и смену
+    ведущего на том же хосте: неизменившимся сервисам событие повторно не
+    отправляется. Без path хеши живут только в памяти процесса. Пишет файл
+    только ведущий процесс.
+    """
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path) if path else None
+        self._hashes: dict[str, str] = {}
+
+    def get(self, service_name: str) -> str | None:
+        return self._hashes.get(service_name)
+
+    def load(self) -> None:
+        """Перечитывает файл (при старте ведущего - его мог обновить прежний ведущий)."""
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            self._hashes = json.loads(self.path.read_bytes())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Состояние CONFIG_READY {self.path} не прочитано, сервисы будут уведомлены заново: {e}")
+            self._hashes = {}
+
+    def update(self, hashes: dict[str, str]) -> None:
+        self._hashes.update(hashes)
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(self._hashes, sort_keys=True))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Не удалось сохранить состояние CONFIG_READY в {self.path}: {e}")
+
+
+class MessageDeduplicator:
+    """
+    Пропуск повторно доставленных сообщений по message_id для потребителей.
+
+    Хранит max_size последних обработанных message_id (LRU). Идентификатор
+    запоминается только после успешной обработки, поэтому сообщение,
+    обработчик которого упал, при повторе будет обработано снова. Дубликат
+    подтверждается без вызова обработчика. Сообщения без message_id
+    обрабатываются всегда.
+
+        dedup = MessageDeduplicator()
+        await client.consume_service_binding(binding, dedup.wrap(handler))
+    """
+
+    def __init__(self, max_size: int = config.RMQ_DEDUP_CACHE_SIZE, name: str = ""):
+        self.max_size = max(1, max_size)
+        self.name = name
+        self.skipped = 0
+        self._seen: OrderedDict[str, None] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def is_duplicate(self, message_id: str | None) -> bool:
+        if not message_id or message_id not in self._seen:
+            return False
+        self._seen.move_to_end(message_id)
+        return True
+
+    def remember(self, message_id: str | None) -> None:
+        if not message_id:
+            return
+        self._seen[message_id] = None
+        self._seen.move_to_end(message_id)
+        if len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+
+    def wrap(self, handler: MessageHandler) -> MessageHandler:
+        async def deduplicated(message: AbstractIncomingMessage) -> None:
+            if self.is_duplicate(message.message_id):
+                self.skipped += 1
+                DUPLICATES_SKIPPED.labels(name=self.name).inc()
+                logger.debug("Сообщение {message_id} уже обработано, пропускаем", message_id=message.message_id)
+                return
+            await handler(message)
+            self.remember(message.message_id)
+
+        return deduplicated
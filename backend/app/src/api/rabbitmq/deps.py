@@ -1,26 +1,36 @@
 from functools import lru_cache
-from typing import AsyncGenerator
 
-import httpx
-from fastapi import Request
+from fastapi import HTTPException, Request
 
+from app.configs.settings import get_settings
 from app.src.api.rabbitmq.constants import RMQ_PASS, RMQ_USER
 
+config = get_settings()
+
 
 @lru_cache
 def get_rabbitmq_settings():
     return {
-        "base_url": "http://rabbitmq-local:15672/api",
+        "base_url": config.RMQ_MANAGEMENT_URL,
         "auth": (RMQ_USER, RMQ_PASS)
     }
 
 
-async def get_rabbitmq_http_client() -> AsyncGenerator[httpx.AsyncClient, None]:
-    settings = get_rabbitmq_settings()
-    async with httpx.AsyncClient(base_url=settings["base_url"]) as client:
-        client.auth = settings["auth"]
-        yield client
+async def get_rabbitmq_management_client(request: Request):
+    return request.app.state.rabbitmq_management_client
 
 
 async def get_rabbitmq_client(request: Request):
     return request.app.state.rabbitmq_client
+
+
+async def get_ready_rabbitmq_client(request: Request):
+    """Клиент, у которого применена инфраструктура. Пока идёт фоновая настройка - 503."""
+    client = request.app.state.rabbitmq_client
+    if not client.is_ready:
+        raise HTTPException(
+            status_code=503,
+            detail="RabbitMQ infrastructure is not ready",
+            headers={"Retry-After": "1"}
+        )
+    return client
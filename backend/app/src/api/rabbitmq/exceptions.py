@@ -0,0 +1,14 @@
+class RabbitMQClientError(Exception):
+    """Базовая ошибка клиента RabbitMQ."""
+
+
+class ChannelPoolError(RabbitMQClientError):
+    """Ошибка пула каналов."""
+
+
+class ChannelPoolClosedError(ChannelPoolError):
+    """Пул каналов закрыт."""
+
+
+class ChannelAcquireTimeoutError(ChannelPoolError):
+    """Не удалось получить канал из пула за отведённое время."""
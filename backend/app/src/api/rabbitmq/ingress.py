@@ -0,0 +1,235 @@
+import asyncio
+import math
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING
+
+from app.src.api.rabbitmq.connection import VhostConnection
+from app.src.api.rabbitmq.metrics import INGRESS_EVENTS, INGRESS_SHED
+from app.src.api.rabbitmq.publisher import PublishResult
+from app.src.api.rabbitmq.schemas import PublishEventsRequest
+from app.src.core.logging import logger
+
+if TYPE_CHECKING:
+    from app.src.api.rabbitmq.client import RabbitMQClient
+
+MAX_RETRY_AFTER = 60
+DRAIN_RATE_WINDOW = 10.0
+
+
+class IngressSaturatedError(Exception):
+    """Буфер публикации заполнен до high_water_mark - запрос отклонён (429)."""
+
+    def __init__(self, message: str, retry_after: int, reason: str):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class IngressClosedError(Exception):
+    """Приём остановлен: приложение завершается."""
+
+
+@dataclass
+class IngressStats:
+    """Снимок состояния буфера публикации."""
+    queued_events: int
+    queued_requests: int
+    high_water_mark: int
+    workers: int
+    paused_vhosts: list[str]
+    accepted: int
+    shed: int
+    published: int
+    failed: int
+    drain_rate: float
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class _Batch:
+    request: PublishEventsRequest
+    future: asyncio.Future
+
+
+class PublishIngress:
+    """
+    Приём событий по HTTP через ограниченный буфер в памяти.
+
+    Запросы ставятся в очередь и публикуются фоновыми воркерами через
+    publish_many. В буфере (вместе с публикуемыми) не больше high_water_mark
+    событий: запрос, с которым порог был бы превышен, сразу отклоняется с
+    Retry-After вместо ожидания - при замедлении брокера растёт число отказов,
+    а не память и задержка. Пока соединение vhost заблокировано брокером
+    (connection.blocked), воркеры не берут каналы пула и ждут unblocked.
+    """
+
+    def __init__(
+        self,
+        client: "RabbitMQClient",
+        high_water_mark: int = 10000,
+        workers: int = 4,
+        retry_after: int = 5
+    ):
+        self.high_water_mark = max(1, high_water_mark)
+        self.retry_after = max(1, retry_after)
+        self._client = client
+        self._worker_count = max(1, workers)
+        self._queue: asyncio.Queue[_Batch] = asyncio.Queue()
+        self._workers: list[asyncio.Task] = []
+        self._queued_events = 0
+        self._paused_vhosts: set[str] = set()
+        self._drained: deque[tuple[float, int]] = deque()
+        self._closed = False
+
+        self._accepted = 0
+        self._shed = 0
+        self._published = 0
+        self._failed = 0
+
+    @property
+    def queued_events(self) -> int:
+        return self._queued_events
+
+    def submit(self, request: PublishEventsRequest) -> asyncio.Future:
+        """
+        Ставит пачку событий в очередь публикации без ожидания.
+        :return: future с PublishResult (ошибка публикации - исключение future)
+        :raises IngressSaturatedError: буфер заполнен
+        :raises IngressClosedError: приём остановлен
+        :raises ValueError: пачка больше high_water_mark и не поместится никогда
+        """
+        size = len(request.events)
+        if self._closed:
+            raise IngressClosedError("Publish ingress is closed")
+        if size > self.high_water_mark:
+            raise ValueError(f"Batch of {size} events exceeds ingress capacity {self.high_water_mark}")
+        if self._queued_events + size > self.high_water_mark:
+            reason = "blocked" if self._paused_vhosts else "saturated"
+            self._shed += 1
+            INGRESS_SHED.labels(reason=reason).inc()
+            raise IngressSaturatedError(
+                f"Publish ingress is {reason}: {self._queued_events}/{self.high_water_mark} events queued",
+                retry_after=self._estimate_retry_after(size),
+                reason=reason
+            )
+
+        self._ensure_workers()
+        future = asyncio.get_running_loop().create_future()
+        # Без ожидания результата ошибка не должна всплывать как «never retrieved»
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._queue.put_nowait(_Batch(request, future))
+        self._queued_events += size
+        self._accepted += size
+        INGRESS_EVENTS.labels(outcome="accepted").inc(size)
+        return future
+
+    def stats(self) -> IngressStats:
+        return IngressStats(
+            queued_events=self._queued_events,
+            queued_requests=self._queue.qsize(),
+            high_water_mark=self.high_water_mark,
+            workers=len(self._workers),
+            paused_vhosts=sorted(self._paused_vhosts),
+            accepted=self._accepted,
+            shed=self._shed,
+            published=self._published,
+            failed=self._failed,
+            drain_rate=round(self._drain_rate(), 1),
+        )
+
+    async def close(self, drain_timeout: float = 30.0) -> None:
+        """Прекращает приём и дожидается публикации буфера не дольше drain_timeout."""
+        self._closed = True
+        if self._workers:
+            try:
+                async with asyncio.timeout(drain_timeout):
+                    await self._queue.join()
+            except TimeoutError:
+                logger.warning(
+                    f"Буфер публикации не опустел за {drain_timeout} с: {self._queued_events} событий потеряно"
+                )
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+        while not self._queue.empty():
+            batch = self._queue.get_nowait()
+            if not batch.future.done():
+                batch.future.set_exception(IngressClosedError("Publish ingress closed before publishing"))
+
+    # ==== Приватные методы / помощники ====
+    def _ensure_workers(self) -> None:
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._work()) for _ in range(self._worker_count)]
+
+    async def _work(self) -> None:
+        while True:
+            batch = await self._queue.get()
+            size = len(batch.request.events)
+            try:
+                result = await self._publish(batch.request)
+            except Exception as e:
+                self._failed += size
+                INGRESS_EVENTS.labels(outcome="failed").inc(size)
+                if not batch.future.done():
+                    batch.future.set_exception(e)
+            else:
+                self._published += result.confirmed
+                self._failed += result.failed
+                INGRESS_EVENTS.labels(outcome="published").inc(result.confirmed)
+                if result.failed:
+                    INGRESS_EVENTS.labels(outcome="failed").inc(result.failed)
+                if not batch.future.done():
+                    batch.future.set_result(result)
+            finally:
+                self._queued_events -= size
+                now = time.monotonic()
+                self._drained.append((now, size))
+                self._trim_drained(now)
+                self._queue.task_done()
+
+    async def _publish(self, request: PublishEventsRequest) -> PublishResult:
+        vhost_connection = await self._client.vhost(request.vhost)
+        if vhost_connection.is_blocked:
+            await self._wait_unblocked(vhost_connection)
+        return await self._client.publish_many(
+            exchange=request.exchange,
+            routing_key=request.routing_key,
+            events=request.events,
+            vhost=request.vhost
+        )
+
+    async def _wait_unblocked(self, vhost_connection: VhostConnection) -> None:
+        vhost = vhost_connection.vhost
+        if vhost not in self._paused_vhosts:
+            self._paused_vhosts.add(vhost)
+            logger.warning(f"Брокер заблокировал соединение vhost '{vhost}': публикация из буфера приостановлена")
+        try:
+            await vhost_connection.wait_unblocked()
+        finally:
+            if vhost in self._paused_vhosts and not vhost_connection.is_blocked:
+                self._paused_vhosts.discard(vhost)
+                logger.info(f"Соединение vhost '{vhost}' разблокировано: публикация из буфера возобновлена")
+
+    def _trim_drained(self, now: float) -> None:
+        """Отбрасывает записи старше окна: без запросов к stats() история не растёт."""
+        horizon = now - DRAIN_RATE_WINDOW
+        while self._drained and self._drained[0][0] < horizon:
+            self._drained.popleft()
+
+    def _drain_rate(self) -> float:
+        """Событий в секунду, опубликованных за последние DRAIN_RATE_WINDOW секунд."""
+        self._trim_drained(time.monotonic())
+        return sum(size for _, size in self._drained) / DRAIN_RATE_WINDOW
+
+    def _estimate_retry_after(self, size: int) -> int:
+        """Через сколько секунд в буфере освободится место для size событий при текущей скорости."""
+        rate = self._drain_rate()
+        if self._paused_vhosts or not rate:
+            return self.retry_after
+        excess = self._queued_events + size - self.high_water_mark
+        return min(MAX_RETRY_AFTER, max(1, math.ceil(excess / rate)))
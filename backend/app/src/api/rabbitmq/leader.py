@@ -0,0 +1,137 @@
+import fcntl
+import os
+import socket
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable
+
+from aio_pika.abc import AbstractChannel
+from aiormq.exceptions import ChannelLockedResource
+
+from app.configs.settings import get_settings
+from app.src.core.logging import logger
+
+config = get_settings()
+
+ChannelOpener = Callable[[], Awaitable[AbstractChannel]]
+
+
+class LeaderElection(ABC):
+    """
+    Выбор ведущего процесса среди воркеров.
+
+    Ведущий владеет настройкой топологии и публикацией CONFIG_READY и
+    принимает команды остальных процессов через управляющую очередь
+    control_queue (exclusive - потребляет её только ведущий).
+    """
+    kind: str
+
+    def __init__(self, control_queue: str):
+        self.control_queue = control_queue
+        self.is_leader = False
+
+    @abstractmethod
+    async def try_acquire(self, open_channel: ChannelOpener) -> bool:
+        """Пытается стать ведущим без ожидания. True - процесс ведущий."""
+
+    async def confirm(self, open_channel: ChannelOpener) -> bool:
+        """Проверяет после переподключения, что процесс всё ещё ведущий."""
+        return self.is_leader
+
+    @abstractmethod
+    async def release(self) -> None:
+        ...
+
+
+class FileLockElection(LeaderElection):
+    """
+    Ведущий - процесс, удерживающий flock на файле. Подходит для воркеров
+    одного хоста (gunicorn -w N): блокировка снимается ОС при завершении
+    процесса, поэтому зависший замок после падения невозможен. У каждого
+    хоста свой ведущий, поэтому управляющая очередь именуется по хосту.
+    """
+    kind = "lock"
+
+    def __init__(self, path: str, control_queue: str):
+        super().__init__(control_queue=control_queue)
+        self.path = path
+        self._fd: int | None = None
+
+    async def try_acquire(self, open_channel: ChannelOpener) -> bool:
+        if self._fd is not None:
+            return True
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode())
+        self._fd = fd
+        self.is_leader = True
+        return True
+
+    async def release(self) -> None:
+        if self._fd is None:
+            return
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
+        self.is_leader = False
+
+
+class QueueElection(LeaderElection):
+    """
+    Ведущий - соединение, объявившее exclusive-очередь. Работает между
+    хостами и репликами: брокер удаляет очередь при закрытии соединения
+    владельца, и её может объявить следующий процесс. Эта же очередь
+    служит управляющей.
+    """
+    kind = "queue"
+
+    def __init__(self, queue_name: str):
+        super().__init__(control_queue=queue_name)
+        self._channel: AbstractChannel | None = None
+
+    async def try_acquire(self, open_channel: ChannelOpener) -> bool:
+        if self.is_leader and self._channel is not None and not self._channel.is_closed:
+            return True
+        channel = await open_channel()
+        try:
+            await channel.declare_queue(self.control_queue, exclusive=True)
+        except ChannelLockedResource:
+            # Брокер закрыл канал: очередь принадлежит другому соединению
+            self.is_leader = False
+            return False
+        self._channel = channel
+        self.is_leader = True
+        return True
+
+    async def confirm(self, open_channel: ChannelOpener) -> bool:
+        # Exclusive-очередь пропадает вместе с соединением: пока нас не было, её мог занять другой процесс
+        await self.release()
+        return await self.try_acquire(open_channel)
+
+    async def release(self) -> None:
+        channel, self._channel = self._channel, None
+        self.is_leader = False
+        if channel is not None and not channel.is_closed:
+            try:
+                await channel.close()
+            except Exception as e:
+                logger.warning(f"Не удалось закрыть канал выбора ведущего: {e}")
+
+
+def create_leader_election(mode: str = config.RMQ_LEADER_ELECTION) -> LeaderElection | None:
+    """lock | queue | none (каждый процесс ведущий - режим одного воркера)."""
+    if mode == "lock":
+        return FileLockElection(
+            path=config.RMQ_LEADER_LOCK_FILE,
+            control_queue=f"{config.RMQ_LEADER_QUEUE}.{socket.gethostname()}"
+        )
+    if mode == "queue":
+        return QueueElection(queue_name=config.RMQ_LEADER_QUEUE)
+    if mode == "none":
+        return None
+    raise ValueError(f"Unknown leader election mode: {mode}")
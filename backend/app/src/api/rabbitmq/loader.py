@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Sequence
+
+import pydantic
+
+from app.src.api.rabbitmq.retry import with_retry_topology
+from app.src.api.rabbitmq.schemas import InfrastructureConfig
+from app.src.api.rabbitmq.topology import EntityKey, TopologySnapshot
+from app.src.core.logging import logger
+
+CACHE_FORMAT_VERSION = 2
+
+
+@lru_cache()
+def schema_fingerprint() -> str:
+    """Отпечаток схемы InfrastructureConfig: кеш, собранный старой версией кода, не подхватывается."""
+    schema = json.dumps(InfrastructureConfig.model_json_schema(), sort_keys=True)
+    return hashlib.sha256(f"{CACHE_FORMAT_VERSION}:{pydantic.VERSION}:{schema}".encode()).hexdigest()[:16]
+
+
+@dataclass
+class CompiledInfrastructure:
+    """Провалидированный конфиг с очередями повторов и готовым снимком топологии."""
+    key: str
+    config: InfrastructureConfig
+    snapshot: TopologySnapshot
+
+
+class InfrastructureLoader:
+    """
+    Загрузка InfrastructureConfig с кешем скомпилированного конфига.
+
+    Ключ кеша - sha256 содержимого файла. Последние memory_size скомпилированных
+    конфигов хранятся в памяти загрузчика, все - в cache_dir в виде JSON:
+    провалидированный конфиг с очередями повторов и отпечатки сущностей.
+    Повторный старт с тем же файлом не считает отпечатки и не достраивает
+    топологию повторов. Кеш - только данные (не pickle): запись в cache_dir не
+    даёт выполнить код, а повреждённый или подменённый кеш лишь проходит
+    валидацию pydantic или игнорируется.
+    """
+
+    def __init__(self, cache_dir: str | Path | None = None, memory_size: int = 2):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        # Текущий и предыдущий конфиг: откат правки файла не требует повторной компиляции
+        self._memory_size = memory_size
+        self._memory: OrderedDict[str, CompiledInfrastructure] = OrderedDict()
+
+    @staticmethod
+    def compile(raw: bytes, key: str = "") -> CompiledInfrastructure:
+        """Валидирует конфиг, дополняет очередями повторов и строит снимок топологии."""
+        infrastructure_config = with_retry_topology(InfrastructureConfig.model_validate_json(raw))
+        return CompiledInfrastructure(
+            key=key,
+            config=infrastructure_config,
+            snapshot=TopologySnapshot.from_config(infrastructure_config)
+        )
+
+    def load_compiled(self, path: Path) -> CompiledInfrastructure:
+        """Загружает конфигурацию, используя кеш по хешу содержимого файла."""
+        if not path.exists():
+            raise FileNotFoundError(f"Config file {path} not found")
+        return self.load_compiled_bytes(path.read_bytes(), source=path)
+
+    def load_compiled_bytes(self, raw: bytes, source: str | Path = "") -> CompiledInfrastructure:
+        """Компилирует уже прочитанное содержимое файла конфигурации, используя кеш."""
+        started = time.perf_counter()
+        key = f"{hashlib.sha256(raw).hexdigest()}-{schema_fingerprint()}"
+
+        compiled = self._memory.get(key)
+        if compiled is not None:
+            self._memory.move_to_end(key)
+            return compiled
+
+        compiled = self._read_cache(key)
+        origin = "кеша"
+        if compiled is None:
+            compiled = self.compile(raw, key)
+            self._write_cache(compiled)
+            origin = "файла"
+
+        self._memory[key] = compiled
+        while len(self._memory) > self._memory_size:
+            self._memory.popitem(last=False)
+        logger.info(f"Конфиг {source} загружен из {origin} за {(time.perf_counter() - started) * 1000:.1f} мс")
+        return compiled
+
+    # ==== Приватные методы / помощники ====
+    def _cache_path(self, key: str) -> Path | None:
+        return self.cache_dir / f"infrastructure-{key}.json" if self.cache_dir else None
+
+    def _read_cache(self, key: str) -> CompiledInfrastructure | None:
+        cache_path = self._cache_path(key)
+        if cache_path is None or not cache_path.exists():
+            return None
+        try:
+            data = json.loads(cache_path.read_bytes())
+            if data.get("key") != key:
+                return None
+            return _from_cache(key, data)
+        except Exception as e:
+            logger.warning(f"Кеш конфига {cache_path} повреждён и будет пересобран: {e}")
+            return None
+
+    def _write_cache(self, compiled: CompiledInfrastructure) -> None:
+        cache_path = self._cache_path(compiled.key)
+        if cache_path is None:
+            return
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # Запись через временный файл: параллельно стартующие воркеры не прочитают недописанный кеш
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(_to_cache(compiled), separators=(",", ":")))
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Не удалось сохранить кеш конфига в {cache_path}: {e}")
+
+
+# ==== Формат кеша на диске ====
+def _to_cache(compiled: CompiledInfrastructure) -> dict[str, Any]:
+    """Конфиг и записи снимка: ключ сущности, отпечаток и позиция её конфигурации в списке."""
+    infrastructure_config = compiled.config
+    return {
+        "key": compiled.key,
+        "config": infrastructure_config.model_dump(mode="json"),
+        "snapshot": {
+            "exchanges": _entries(compiled.snapshot.exchanges, infrastructure_config.exchanges),
+            "queues": _entries(compiled.snapshot.queues, infrastructure_config.queues),
+            "bindings": _entries(compiled.snapshot.bindings, infrastructure_config.bindings),
+        },
+    }
+
+
+def _from_cache(key: str, data: dict[str, Any]) -> CompiledInfrastructure:
+    infrastructure_config = InfrastructureConfig.model_validate(data["config"])
+    snapshot = data["snapshot"]
+    return CompiledInfrastructure(
+        key=key,
+        config=infrastructure_config,
+        snapshot=TopologySnapshot(
+            exchanges=_restore(snapshot["exchanges"], infrastructure_config.exchanges),
+            queues=_restore(snapshot["queues"], infrastructure_config.queues),
+            bindings=_restore(snapshot["bindings"], infrastructure_config.bindings),
+        )
+    )
+
+
+def _entries(entities: dict[EntityKey, tuple[str, Any]], configs: Sequence[Any]) -> list[list]:
+    positions = {id(cfg): i for i, cfg in enumerate(configs)}
+    return [[list(key), fp, positions[id(cfg)]] for key, (fp, cfg) in entities.items()]
+
+
+def _restore(entries: list[list], configs: Sequence[Any]) -> dict[EntityKey, tuple[str, Any]]:
+    return {tuple(key): (fp, configs[position]) for key, fp, position in entries}
@@ -0,0 +1,141 @@
+import asyncio
+from typing import Any
+from urllib.parse import quote
+
+import httpx
+
+from app.src.core.cache import TTLCache
+
+CacheKey = tuple[str, tuple[tuple[str, str], ...]]
+
+DEFAULT_QUEUE_COLUMNS = (
+    "name",
+    "vhost",
+    "state",
+    "messages",
+    "messages_ready",
+    "messages_unacknowledged",
+    "consumers",
+    "message_stats.publish_details.rate",
+    "message_stats.deliver_get_details.rate",
+)
+
+
+class RabbitMQManagementClient:
+    """
+    Клиент HTTP API управления RabbitMQ.
+
+    Использует один пул keep-alive соединений на всё приложение. Ответы
+    кешируются на cache_ttl секунд, одновременные одинаковые запросы
+    объединяются в один (single-flight), поэтому частый опрос дашбордами
+    почти не доходит до брокера.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        auth: tuple[str, str],
+        cache_ttl: float = 1.0,
+        timeout: float = 5.0,
+        max_connections: int = 10,
+        transport: httpx.AsyncBaseTransport | None = None
+    ):
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            auth=auth,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport
+        )
+        self._cache = TTLCache(ttl=cache_ttl)
+        self._in_flight: dict[CacheKey, asyncio.Task] = {}
+
+        self.requests_total = 0
+        self.cache_hits_total = 0
+        self.coalesced_total = 0
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    async def get_json(self, path: str, params: dict[str, Any] | None = None) -> Any:
+        """GET с кешем и объединением одинаковых одновременных запросов."""
+        key: CacheKey = (path, tuple(sorted((k, str(v)) for k, v in (params or {}).items() if v is not None)))
+
+        found, value = self._cache.get(key)
+        if found:
+            self.cache_hits_total += 1
+            return value
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced_total += 1
+        else:
+            # Запрос выполняется отдельной задачей: отмена того, кто его начал, не отменяет
+            # запрос для остальных ожидающих и не передаёт им чужой CancelledError
+            task = asyncio.create_task(self._fetch(key))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    async def list_queues(
+        self,
+        vhost: str | None = None,
+        columns: list[str] | tuple[str, ...] | None = DEFAULT_QUEUE_COLUMNS,
+        page: int | None = None,
+        page_size: int | None = None,
+        name: str | None = None,
+        use_regex: bool = False
+    ) -> Any:
+        """
+        Список очередей (всех или одного vhost) с выборкой колонок.
+        С page возвращает страницу: {"items": [...], "page", "page_count", "total_count", ...}.
+        """
+        params: dict[str, Any] = {"columns": ",".join(columns) if columns else None}
+        if page is not None:
+            params.update(page=page, page_size=page_size or 100, name=name, use_regex=str(use_regex).lower())
+        elif name:
+            params.update(name=name, use_regex=str(use_regex).lower())
+        return await self.get_json(self._vhost_path("/queues", vhost), params)
+
+    async def get_queue(
+        self,
+        name: str,
+        vhost: str = "/",
+        columns: list[str] | tuple[str, ...] | None = DEFAULT_QUEUE_COLUMNS
+    ) -> dict:
+        """Статистика одной очереди."""
+        params = {"columns": ",".join(columns) if columns else None}
+        return await self.get_json(f"{self._vhost_path('/queues', vhost)}/{quote(name, safe='')}", params)
+
+    async def list_vhosts(self, columns: list[str] | tuple[str, ...] | None = ("name",)) -> list[dict]:
+        """Список vhost брокера."""
+        return await self.get_json("/vhosts", {"columns": ",".join(columns) if columns else None})
+
+    def stats(self) -> dict:
+        return {
+            "requests_total": self.requests_total,
+            "cache_hits_total": self.cache_hits_total,
+            "coalesced_total": self.coalesced_total,
+        }
+
+    # ==== Приватные методы / помощники ====
+    async def _fetch(self, key: CacheKey) -> Any:
+        self.requests_total += 1
+        response = await self._client.get(key[0], params=dict(key[1]))
+        response.raise_for_status()
+        value = response.json()
+        self._cache.set(key, value)
+        return value
+
+    def _forget(self, key: CacheKey, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Ошибка считается полученной, даже если все ожидающие уже ушли
+        if not task.cancelled():
+            task.exception()
+
+    @staticmethod
+    def _vhost_path(prefix: str, vhost: str | None) -> str:
+        if vhost is None:
+            return prefix
+        return f"{prefix}/{quote(vhost, safe='')}"
@@ -0,0 +1,171 @@
+from typing import TYPE_CHECKING, Iterable
+
+from app.src.api.rabbitmq.management import RabbitMQManagementClient
+from app.src.core.metrics import REGISTRY, MetricsRegistry, Sample
+
+if TYPE_CHECKING:
+    from app.src.api.rabbitmq.client import RabbitMQClient
+
+AMQP_OPERATION_DURATION = REGISTRY.histogram(
+    "rabbitmq_operation_duration_seconds",
+    "Длительность операций AMQP",
+    ("operation",),
+)
+MESSAGES_PUBLISHED = REGISTRY.counter(
+    "rabbitmq_messages_published",
+    "Сообщения, подтверждённые брокером при публикации",
+    ("exchange",),
+)
+PUBLISH_FAILURES = REGISTRY.counter(
+    "rabbitmq_publish_failures",
+    "Сообщения, не подтверждённые брокером при публикации",
+    ("exchange",),
+)
+MESSAGES_ACKED = REGISTRY.counter(
+    "rabbitmq_messages_acked",
+    "Успешно обработанные и подтверждённые сообщения",
+    ("queue",),
+)
+MESSAGES_NACKED = REGISTRY.counter(
+    "rabbitmq_messages_nacked",
+    "Отклонённые сообщения (ушли в DLX)",
+    ("queue",),
+)
+MESSAGES_RETRIED = REGISTRY.counter(
+    "rabbitmq_messages_retried",
+    "Сообщения, отложенные на повтор",
+    ("queue",),
+)
+RECONNECTS = REGISTRY.counter(
+    "rabbitmq_reconnects",
+    "Переподключения к брокеру",
+)
+RECONNECT_DURATION = REGISTRY.histogram(
+    "rabbitmq_reconnect_duration_seconds",
+    "Время от потери соединения до его восстановления",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+RECOVERY_DURATION = REGISTRY.histogram(
+    "rabbitmq_recovery_duration_seconds",
+    "Время восстановления топологии и потребителей после переподключения",
+)
+MESSAGES_REDRIVEN = REGISTRY.counter(
+    "rabbitmq_messages_redriven",
+    "Сообщения, перенесённые из DLQ задачами redrive",
+    ("queue", "outcome"),
+)
+CONFIG_RELOADS = REGISTRY.counter(
+    "rabbitmq_config_reloads",
+    "Изменения файла конфигурации, обнаруженные при отслеживании",
+    ("outcome",),
+)
+RPC_CALLS = REGISTRY.counter(
+    "rabbitmq_rpc_calls",
+    "RPC-вызовы по результату",
+    ("outcome",),
+)
+RPC_DURATION = REGISTRY.histogram(
+    "rabbitmq_rpc_duration_seconds",
+    "Время от публикации RPC-запроса до получения ответа",
+)
+EVENTS_ROUTED = REGISTRY.counter(
+    "rabbitmq_events_routed",
+    "События MinIO, обработанные правилами маршрутизации, по результату",
+    ("outcome",),
+)
+CONFIG_READY_SKIPPED = REGISTRY.counter(
+    "rabbitmq_config_ready_skipped",
+    "CONFIG_READY не отправлен: конфигурация сервиса не менялась с прошлого уведомления",
+)
+DUPLICATES_SKIPPED = REGISTRY.counter(
+    "rabbitmq_duplicates_skipped",
+    "Повторно доставленные сообщения, пропущенные по message_id",
+    ("name",),
+)
+INGRESS_EVENTS = REGISTRY.counter(
+    "rabbitmq_ingress_events",
+    "События HTTP-буфера публикации по результату",
+    ("outcome",),
+)
+INGRESS_SHED = REGISTRY.counter(
+    "rabbitmq_ingress_shed",
+    "Запросы публикации, отклонённые с 429 из-за заполненного буфера",
+    ("reason",),
+)
+CONNECTION_ATTEMPTS = REGISTRY.counter(
+    "rabbitmq_connection_attempts",
+    "Попытки установить соединение при подключении",
+    ("outcome",),
+)
+
+
+def register_rabbitmq_collectors(
+    rabbitmq_client: "RabbitMQClient",
+    management_client: RabbitMQManagementClient | None = None,
+    registry: MetricsRegistry = REGISTRY
+) -> None:
+    """
+    Регистрирует gauge-метрики, снимаемые в момент запроса /metrics:
+    состояние пула каналов, потребителей и глубину очередей.
+    Глубина очередей берётся из кеша клиента Management API и не нагружает брокер.
+    """
+
+    async def channel_pool() -> Iterable[Sample]:
+        samples: list[Sample] = []
+        for vhost_connection in rabbitmq_client.vhost_connections():
+            stats = vhost_connection.channel_pool.stats()
+            vhost = vhost_connection.vhost
+            samples.append(("rabbitmq_channel_pool_channels", {"vhost": vhost, "state": "idle"}, stats.idle))
+            samples.append(("rabbitmq_channel_pool_channels", {"vhost": vhost, "state": "in_use"}, stats.in_use))
+            samples.append(("rabbitmq_channel_pool_channels", {"vhost": vhost, "state": "waiting"}, stats.waiting))
+        return samples
+
+    async def consumers() -> Iterable[Sample]:
+        samples: list[Sample] = []
+        for stats in rabbitmq_client.consumers_stats():
+            labels = {"queue": stats["queue"], "vhost": stats["vhost"], "consumer_tag": stats["consumer_tag"] or ""}
+            samples.append(("rabbitmq_consumer_messages", {**labels, "state": "in_flight"}, stats["in_flight"]))
+            samples.append(("rabbitmq_consumer_messages", {**labels, "state": "pending_ack"}, stats["pending_acks"]))
+        return samples
+
+    async def rpc_in_flight() -> Iterable[Sample]:
+        return [
+            ("rabbitmq_rpc_in_flight", {"vhost": stats["vhost"]}, stats["in_flight"])
+            for stats in rabbitmq_client.rpc_stats()
+        ]
+
+    registry.add_collector("rabbitmq_channel_pool_channels", "Каналы пула по состоянию", "gauge", channel_pool)
+    registry.add_collector("rabbitmq_consumer_messages", "Сообщения потребителей в обработке", "gauge", consumers)
+    registry.add_collector("rabbitmq_rpc_in_flight", "RPC-вызовы, ожидающие ответа", "gauge", rpc_in_flight)
+
+    async def ingress() -> Iterable[Sample]:
+        stats = rabbitmq_client.ingress.stats()
+        return [
+            ("rabbitmq_ingress_buffer_events", {"state": "queued"}, stats.queued_events),
+            ("rabbitmq_ingress_buffer_events", {"state": "high_water_mark"}, stats.high_water_mark),
+        ]
+
+    async def ingress_paused() -> Iterable[Sample]:
+        return [
+            ("rabbitmq_ingress_paused", {"vhost": vhost_connection.vhost}, int(vhost_connection.is_blocked))
+            for vhost_connection in rabbitmq_client.vhost_connections()
+        ]
+
+    registry.add_collector("rabbitmq_ingress_buffer_events", "Заполненность HTTP-буфера публикации", "gauge", ingress)
+    registry.add_collector(
+        "rabbitmq_ingress_paused", "Соединение заблокировано брокером (connection.blocked)", "gauge", ingress_paused
+    )
+
+    if management_client is None:
+        return
+
+    async def queue_depth() -> Iterable[Sample]:
+        queues = await management_client.list_queues(columns=("name", "vhost", "messages_ready", "messages_unacknowledged"))
+        samples: list[Sample] = []
+        for queue in queues:
+            labels = {"queue": queue["name"], "vhost": queue["vhost"]}
+            samples.append(("rabbitmq_queue_messages", {**labels, "state": "ready"}, queue.get("messages_ready", 0)))
+            samples.append(("rabbitmq_queue_messages", {**labels, "state": "unacked"}, queue.get("messages_unacknowledged", 0)))
+        return samples
+
+    registry.add_collector("rabbitmq_queue_messages", "Глубина очередей по данным Management API", "gauge", queue_depth)
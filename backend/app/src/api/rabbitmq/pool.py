@@ -0,0 +1,173 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator
+
+from aio_pika.abc import AbstractChannel, AbstractRobustConnection
+
+from app.src.api.rabbitmq.base import AMQPChannelFactory
+from app.src.api.rabbitmq.exceptions import ChannelAcquireTimeoutError, ChannelPoolClosedError
+from app.src.core.logging import logger
+
+
+@dataclass
+class ChannelPoolStats:
+    """Снимок метрик пула каналов."""
+    max_size: int
+    size: int
+    idle: int
+    in_use: int
+    waiting: int
+    created_total: int
+    replaced_total: int
+    acquired_total: int
+    wait_time_total_ms: float
+    wait_time_max_ms: float
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        data["wait_time_total_ms"] = round(self.wait_time_total_ms, 3)
+        data["wait_time_max_ms"] = round(self.wait_time_max_ms, 3)
+        return data
+
+
+class ChannelPool:
+    """
+    Ограниченный пул каналов AMQP поверх AMQPChannelFactory.
+
+    Каналы создаются лениво, до max_size штук. Закрытые каналы (например,
+    после пассивного объявления несуществующей очереди) отбрасываются при
+    возврате и выдаче, вместо них открываются новые.
+    """
+
+    def __init__(
+        self,
+        connection: AbstractRobustConnection,
+        channel_factory: AMQPChannelFactory,
+        max_size: int = 16,
+        acquire_timeout: float | None = None
+    ):
+        self._connection = connection
+        self._channel_factory = channel_factory
+        self._max_size = max(1, max_size)
+        self._acquire_timeout = acquire_timeout
+
+        self._idle: deque[AbstractChannel] = deque()
+        self._semaphore = asyncio.Semaphore(self._max_size)
+        self._closed = False
+
+        # Метрики
+        self._size = 0
+        self._waiting = 0
+        self._created_total = 0
+        self._replaced_total = 0
+        self._acquired_total = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @property
+    def is_closed(self) -> bool:
+        return self._closed
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[AbstractChannel]:
+        """Выдаёт канал на время блока и возвращает его в пул по выходу."""
+        channel = await self.get()
+        try:
+            yield channel
+        finally:
+            await self.release(channel)
+
+    async def get(self) -> AbstractChannel:
+        """Берёт исправный канал из пула, ожидая освобождения при исчерпании лимита."""
+        if self._closed:
+            raise ChannelPoolClosedError("Пул каналов закрыт")
+
+        started = time.perf_counter()
+        self._waiting += 1
+        try:
+            async with asyncio.timeout(self._acquire_timeout):
+                await self._semaphore.acquire()
+        except TimeoutError:
+            raise ChannelAcquireTimeoutError(
+                f"Нет свободного канала за {self._acquire_timeout} с (размер пула {self._max_size})"
+            )
+        finally:
+            self._waiting -= 1
+
+        waited = time.perf_counter() - started
+        self._wait_time_total += waited
+        self._wait_time_max = max(self._wait_time_max, waited)
+
+        try:
+            channel = await self._take_healthy()
+        except BaseException:
+            self._semaphore.release()
+            raise
+        self._acquired_total += 1
+        return channel
+
+    async def release(self, channel: AbstractChannel) -> None:
+        """Возвращает канал в пул; закрытый канал отбрасывается."""
+        if channel.is_closed or self._closed:
+            self._discard(channel)
+            if not channel.is_closed:
+                await self._close_channel(channel)
+        else:
+            self._idle.append(channel)
+        self._semaphore.release()
+
+    async def close(self) -> None:
+        """Закрывает пул и все свободные каналы. Выданные каналы закроются при возврате."""
+        self._closed = True
+        while self._idle:
+            channel = self._idle.popleft()
+            self._size -= 1
+            await self._close_channel(channel)
+
+    def stats(self) -> ChannelPoolStats:
+        return ChannelPoolStats(
+            max_size=self._max_size,
+            size=self._size,
+            idle=len(self._idle),
+            in_use=self._size - len(self._idle),
+            waiting=self._waiting,
+            created_total=self._created_total,
+            replaced_total=self._replaced_total,
+            acquired_total=self._acquired_total,
+            wait_time_total_ms=self._wait_time_total * 1000,
+            wait_time_max_ms=self._wait_time_max * 1000,
+        )
+
+    # ==== Приватные методы / помощники ====
+    async def _take_healthy(self) -> AbstractChannel:
+        # LIFO: чаще используем недавно возвращённые («тёплые») каналы
+        while self._idle:
+            channel = self._idle.pop()
+            if not channel.is_closed:
+                return channel
+            self._discard(channel)
+
+        channel = await self._channel_factory(self._connection)
+        self._size += 1
+        self._created_total += 1
+        return channel
+
+    def _discard(self, channel: AbstractChannel) -> None:
+        self._size -= 1
+        if not self._closed:
+            self._replaced_total += 1
+            logger.info("Канал {channel} закрыт и будет заменён новым", channel=channel)
+
+    @staticmethod
+    async def _close_channel(channel: AbstractChannel) -> None:
+        try:
+            await channel.close()
+        except Exception as e:
+            logger.warning(f"Не удалось закрыть канал: {e}")
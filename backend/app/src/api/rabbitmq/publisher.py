@@ -0,0 +1,230 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Sequence
+from weakref import WeakKeyDictionary
+
+from aio_pika import DeliveryMode, ExchangeType, Message
+from aio_pika.abc import AbstractChannel, AbstractExchange
+from pamqp.commands import Basic
+
+from app.src.api.rabbitmq.codecs import JSON_CONTENT_TYPE, EncodedBody, MessageCodec, create_message_codec
+from app.src.api.rabbitmq.metrics import MESSAGES_PUBLISHED, PUBLISH_FAILURES
+from app.src.api.rabbitmq.pool import ChannelPool
+from app.src.api.rabbitmq.schemas import Event
+from app.src.core.logging import logger
+
+
+@dataclass
+class OutgoingMessage:
+    """Подготовленное к публикации сообщение."""
+    routing_key: str
+    body: bytes
+    headers: dict | None = None
+    message_id: str | None = None
+    content_type: str = JSON_CONTENT_TYPE
+    persistent: bool = True
+    correlation_id: str | None = None
+    content_encoding: str | None = None
+
+    @classmethod
+    def encoded(cls, routing_key: str, encoded: EncodedBody, **kwargs) -> "OutgoingMessage":
+        return cls(
+            routing_key=routing_key,
+            body=encoded.body,
+            content_type=encoded.content_type,
+            content_encoding=encoded.content_encoding,
+            **kwargs
+        )
+
+    def to_amqp(self) -> Message:
+        return Message(
+            body=self.body,
+            headers=self.headers,
+            message_id=self.message_id,
+            correlation_id=self.correlation_id,
+            content_type=self.content_type,
+            content_encoding=self.content_encoding,
+            delivery_mode=DeliveryMode.PERSISTENT if self.persistent else DeliveryMode.NOT_PERSISTENT
+        )
+
+
+@dataclass
+class PublishResult:
+    """Итог публикации пачки сообщений."""
+    exchange: str
+    published: int = 0
+    confirmed: int = 0
+    failed: int = 0
+    duration_ms: float = 0.0
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def rate(self) -> float:
+        """Сообщений в секунду."""
+        return self.published / (self.duration_ms / 1000) if self.duration_ms else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "exchange": self.exchange,
+            "published": self.published,
+            "confirmed": self.confirmed,
+            "failed": self.failed,
+            "duration_ms": round(self.duration_ms, 3),
+            "rate": round(self.rate, 1),
+            "errors": self.errors[:10],
+        }
+
+
+class EventPublisher:
+    """
+    Публикация сообщений с подтверждениями брокера (publisher confirms).
+
+    Сообщения пачки отправляются конвейером: одновременно ожидается не более
+    confirm_window неподтверждённых публикаций. Хэндлы обменников кешируются
+    для каждого канала, объявленные обменники - на всё время жизни соединения.
+    События кодируются codec (content_type и сжатие из настроек), готовые
+    bytes публикуются как есть с content_type JSON.
+    """
+
+    def __init__(self, channel_pool: ChannelPool, confirm_window: int = 1024, codec: MessageCodec | None = None):
+        self._channel_pool = channel_pool
+        self._confirm_window = max(1, confirm_window)
+        self.codec = codec or create_message_codec()
+        self._exchanges: WeakKeyDictionary[AbstractChannel, dict[str, AbstractExchange]] = WeakKeyDictionary()
+        self._declared_exchanges: set[str] = set()
+
+    async def ensure_exchange(
+        self,
+        name: str,
+        type: ExchangeType | str = ExchangeType.TOPIC,
+        durable: bool = True
+    ) -> None:
+        """Объявляет обменник один раз за жизнь соединения."""
+        if name in self._declared_exchanges:
+            return
+        async with self._channel_pool.acquire() as channel:
+            exchange = await channel.declare_exchange(name=name, type=type, durable=durable)
+            self._exchanges.setdefault(channel, {})[name] = exchange
+        self._declared_exchanges.add(name)
+
+    def reset(self) -> None:
+        """Сбрасывает кеши (после переподключения брокер мог потерять сущности)."""
+        self._exchanges.clear()
+        self._declared_exchanges.clear()
+
+    async def publish(
+        self,
+        exchange: str,
+        routing_key: str,
+        event: Event | bytes,
+        headers: dict | None = None,
+        message_id: str | None = None,
+        persistent: bool = True
+    ) -> PublishResult:
+        """Публикует одно событие и дожидается подтверждения брокера."""
+        if isinstance(event, bytes):
+            encoded = EncodedBody(event, JSON_CONTENT_TYPE)
+        else:
+            encoded = self.codec.encode_events([event])[0]
+        message = OutgoingMessage.encoded(
+            routing_key,
+            encoded,
+            headers=headers,
+            message_id=message_id,
+            persistent=persistent
+        )
+        return await self.publish_messages(exchange, [message])
+
+    async def publish_many(
+        self,
+        exchange: str,
+        routing_key: str,
+        events: Sequence[Event],
+        headers: dict | None = None,
+        persistent: bool = True
+    ) -> PublishResult:
+        """Публикует пачку событий с одним ключом маршрутизации."""
+        messages = [
+            OutgoingMessage.encoded(routing_key, encoded, headers=headers, persistent=persistent)
+            for encoded in self.codec.encode_events(events)
+        ]
+        return await self.publish_messages(exchange, messages)
+
+    async def publish_messages(
+        self,
+        exchange: str,
+        messages: Sequence[OutgoingMessage],
+        mandatory: bool = True
+    ) -> PublishResult:
+        """
+        Публикует подготовленные сообщения конвейером с окном подтверждений.
+        С mandatory сообщение, которое брокер вернул (basic.return) как немаршрутизируемое,
+        считается неудачным. Возврат отслеживается по message_id: без него брокер молча отбросит сообщение.
+        """
+        result = PublishResult(exchange=exchange)
+        if not messages:
+            return result
+
+        started = time.perf_counter()
+        async with self._channel_pool.acquire() as channel:
+            exchange_handle = await self._get_exchange(channel, exchange)
+            window = asyncio.Semaphore(self._confirm_window)
+
+            async def send(message: OutgoingMessage) -> None:
+                try:
+                    confirmation = await exchange_handle.publish(
+                        message.to_amqp(),
+                        routing_key=message.routing_key,
+                        mandatory=mandatory
+                    )
+                finally:
+                    window.release()
+                # Без publisher confirms канал возвращает None - считаем сообщение отправленным
+                if confirmation is None or isinstance(confirmation, Basic.Ack):
+                    return
+                if isinstance(confirmation, (Basic.Nack, Basic.Reject)):
+                    raise RuntimeError(f"Брокер не подтвердил сообщение: {confirmation!r}")
+                # Вместо подтверждения канал вернул само сообщение - basic.return
+                raise RuntimeError(f"Нет очереди для сообщения с ключом '{message.routing_key}' в '{exchange}'")
+
+            tasks: list[asyncio.Task] = []
+            for message in messages:
+                await window.acquire()
+                tasks.append(asyncio.create_task(send(message)))
+            outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+
+        result.published = len(messages)
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                result.failed += 1
+                result.errors.append(str(outcome))
+            else:
+                result.confirmed += 1
+        result.duration_ms = (time.perf_counter() - started) * 1000
+
+        MESSAGES_PUBLISHED.labels(exchange=exchange).inc(result.confirmed)
+        if result.failed:
+            PUBLISH_FAILURES.labels(exchange=exchange).inc(result.failed)
+            logger.error(
+                "Публикация в '{exchange}': не подтверждено {failed} из {published}",
+                exchange=exchange, failed=result.failed, published=result.published
+            )
+        else:
+            logger.debug(
+                "Публикация в '{exchange}': {published} сообщений за {duration_ms:.1f} мс",
+                exchange=exchange, published=result.published, duration_ms=result.duration_ms
+            )
+        return result
+
+    # ==== Приватные методы / помощники ====
+    async def _get_exchange(self, channel: AbstractChannel, name: str) -> AbstractExchange:
+        channel_exchanges = self._exchanges.setdefault(channel, {})
+        exchange = channel_exchanges.get(name)
+        if exchange is None:
+            if name:
+                exchange = await channel.get_exchange(name, ensure=False)
+            else:
+                exchange = channel.default_exchange
+            channel_exchanges[name] = exchange
+        return exchange
@@ -0,0 +1,334 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from enum import Enum
+from typing import TYPE_CHECKING, Any
+
+from aio_pika.abc import AbstractChannel, AbstractIncomingMessage, AbstractQueue
+
+from app.src.api.rabbitmq.constants import DEFAULT_VHOST, RETRY_ATTEMPT_HEADER
+from app.src.api.rabbitmq.metrics import MESSAGES_REDRIVEN
+from app.src.api.rabbitmq.publisher import EventPublisher, OutgoingMessage
+from app.src.core.logging import logger
+
+if TYPE_CHECKING:
+    from app.src.api.rabbitmq.client import RabbitMQClient
+
+REDRIVE_SOURCE_HEADER = "x-redriven-from"
+# Заголовки, которые брокер выставляет при dead-lettering; при повторной публикации их не переносим
+DEATH_HEADERS = (
+    "x-death",
+    "x-first-death-exchange",
+    "x-first-death-queue",
+    "x-first-death-reason",
+    "x-last-death-exchange",
+    "x-last-death-queue",
+    "x-last-death-reason",
+    RETRY_ATTEMPT_HEADER,
+)
+
+
+class RedriveStatus(str, Enum):
+    RUNNING = "running"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+
+class RedriveConflictError(Exception):
+    """Для очереди уже выполняется задача redrive."""
+
+
+class RateLimiter:
+    """Token bucket без запаса: операции равномерно распределяются, не больше rate в секунду."""
+
+    def __init__(self, rate: float | None):
+        self.rate = rate if rate and rate > 0 else None
+        self._tokens = 1.0
+        self._updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        if self.rate is None:
+            return
+        now = time.monotonic()
+        self._tokens = min(1.0, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+
+def death_origin(message: AbstractIncomingMessage) -> tuple[str, str] | None:
+    """Исходные обменник и ключ маршрутизации из последней записи x-death."""
+    deaths = (message.headers or {}).get("x-death")
+    if not deaths:
+        return None
+    death = deaths[0]
+    routing_keys = death.get("routing-keys") or []
+    exchange = death.get("exchange")
+    if exchange is None or not routing_keys:
+        return None
+    return _text(exchange), _text(routing_keys[0])
+
+
+@dataclass
+class RedriveJob:
+    """Состояние задачи переноса сообщений из DLQ. position - сколько сообщений с начала очереди уже обработано."""
+    id: str
+    queue: str
+    vhost: str
+    rate_limit: float | None
+    batch_size: int
+    max_messages: int
+    status: RedriveStatus = RedriveStatus.RUNNING
+    position: int = 0
+    moved: int = 0
+    skipped: int = 0
+    failed: int = 0
+    resumed_from: str | None = None
+    error: str | None = None
+    started_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    cancel_requested: bool = False
+
+    @property
+    def rate(self) -> float:
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        return self.moved / elapsed if elapsed > 0 else 0.0
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        del data["cancel_requested"]
+        data["status"] = self.status.value
+        data["remaining"] = max(0, self.max_messages - self.position)
+        data["rate"] = round(self.rate, 1)
+        return data
+
+
+class RedriveRunner:
+    """
+    Переносит сообщения из DLQ в исходный обменник с исходным ключом (из x-death).
+
+    Сообщения забираются через basic.get пачками по batch_size и публикуются
+    с подтверждениями брокера; оригинал подтверждается только после
+    подтверждения копии. В памяти одновременно не больше одной пачки.
+    Сообщения без x-death перекладываются в конец той же очереди. Задача
+    обрабатывает не больше max_messages сообщений (по умолчанию - глубину
+    очереди на старте), поэтому переложенные в конец сообщения повторно не
+    просматриваются.
+    """
+
+    def __init__(self, job: RedriveJob, channel: AbstractChannel, publisher: EventPublisher):
+        self.job = job
+        self._channel = channel
+        self._publisher = publisher
+        self._limiter = RateLimiter(job.rate_limit)
+        self._moved_metric = MESSAGES_REDRIVEN.labels(queue=job.queue, outcome="moved")
+        self._skipped_metric = MESSAGES_REDRIVEN.labels(queue=job.queue, outcome="skipped")
+
+    async def run(self) -> None:
+        job = self.job
+        try:
+            queue = await self._channel.get_queue(job.queue, ensure=False)
+            while job.position < job.max_messages and not job.cancel_requested:
+                batch = await self._fetch(queue, min(job.batch_size, job.max_messages - job.position))
+                if not batch:
+                    break
+                await self._process(batch)
+            job.status = RedriveStatus.CANCELLED if job.cancel_requested else RedriveStatus.COMPLETED
+        except asyncio.CancelledError:
+            job.status = RedriveStatus.CANCELLED
+            raise
+        except Exception as e:
+            job.status = RedriveStatus.FAILED
+            job.error = str(e)
+            logger.error(f"Redrive {job.id} очереди '{job.queue}' прерван: {e}")
+        finally:
+            job.finished_at = time.time()
+            # Неподтверждённые сообщения вернутся в очередь при закрытии канала
+            if not self._channel.is_closed:
+                try:
+                    await self._channel.close()
+                except Exception as e:
+                    logger.warning(f"Redrive {job.id}: не удалось закрыть канал: {e}")
+        logger.info(
+            f"Redrive {job.id} очереди '{job.queue}': {job.status.value}, перенесено {job.moved}, "
+            f"пропущено {job.skipped}, ошибок {job.failed}, позиция {job.position}/{job.max_messages}"
+        )
+
+    # ==== Приватные методы / помощники ====
+    async def _fetch(self, queue: AbstractQueue, count: int) -> list[AbstractIncomingMessage]:
+        batch: list[AbstractIncomingMessage] = []
+        while len(batch) < count:
+            await self._limiter.acquire()
+            message = await queue.get(no_ack=False, fail=False)
+            if message is None:
+                break
+            batch.append(message)
+        return batch
+
+    async def _process(self, batch: list[AbstractIncomingMessage]) -> None:
+        """Публикует пачку с подтверждениями и подтверждает оригиналы успешно перенесённых сообщений."""
+        groups: dict[str, list[tuple[AbstractIncomingMessage, OutgoingMessage]]] = {}
+        skipped: set[int] = set()
+        for message in batch:
+            origin = death_origin(message)
+            if origin is None:
+                # Исходный адрес неизвестен - в конец этой же очереди через обменник по умолчанию
+                origin = ("", self.job.queue)
+                skipped.add(message.delivery_tag)
+            exchange, routing_key = origin
+            groups.setdefault(exchange, []).append((message, self._copy(message, routing_key)))
+
+        results = await asyncio.gather(*(
+            self._publisher.publish_messages(exchange, [outgoing for _, outgoing in pairs])
+            for exchange, pairs in groups.items()
+        ))
+
+        failed = [result for result in results if result.failed]
+        if not failed:
+            await batch[-1].ack(multiple=True)
+        for pairs, result in zip(groups.values(), results):
+            if result.failed:
+                # Какие сообщения группы не подтверждены, неизвестно: вся группа вернётся в очередь
+                self.job.failed += result.failed
+                continue
+            if failed:
+                for message, _ in pairs:
+                    await message.ack()
+            group_skipped = sum(1 for message, _ in pairs if message.delivery_tag in skipped)
+            self.job.position += len(pairs)
+            self.job.skipped += group_skipped
+            self.job.moved += len(pairs) - group_skipped
+            self._skipped_metric.inc(group_skipped)
+            self._moved_metric.inc(len(pairs) - group_skipped)
+
+        if failed:
+            raise RuntimeError(f"Брокер не подтвердил публикацию: {failed[0].errors[0]}")
+
+    def _copy(self, message: AbstractIncomingMessage, routing_key: str) -> OutgoingMessage:
+        headers = {k: v for k, v in (message.headers or {}).items() if k not in DEATH_HEADERS}
+        headers[REDRIVE_SOURCE_HEADER] = self.job.queue
+        return OutgoingMessage(
+            routing_key=routing_key,
+            body=message.body,
+            headers=headers,
+            message_id=message.message_id,
+            content_type=message.content_type or OutgoingMessage.content_type,
+            content_encoding=message.content_encoding
+        )
+
+
+class RedriveManager:
+    """
+    Фоновые задачи redrive: запуск, прогресс, отмена и продолжение с места остановки.
+    Хранит последние history_size задач; на одну очередь - одна выполняющаяся задача.
+    """
+
+    def __init__(
+        self,
+        client: "RabbitMQClient",
+        default_rate_limit: float | None = None,
+        default_batch_size: int = 100,
+        history_size: int = 100
+    ):
+        self._client = client
+        self._default_rate_limit = default_rate_limit
+        self._default_batch_size = default_batch_size
+        self._history_size = history_size
+        self._jobs: OrderedDict[str, RedriveJob] = OrderedDict()
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    async def start(
+        self,
+        queue_name: str,
+        vhost: str = DEFAULT_VHOST,
+        rate_limit: float | None = None,
+        batch_size: int | None = None,
+        max_messages: int | None = None,
+        resumed_from: RedriveJob | None = None
+    ) -> RedriveJob:
+        """Запускает перенос сообщений очереди. Без max_messages обрабатывается текущая глубина очереди."""
+        for job in self._jobs.values():
+            if job.queue == queue_name and job.vhost == vhost and job.status == RedriveStatus.RUNNING:
+                raise RedriveConflictError(f"Redrive for queue {queue_name} is already running: {job.id}")
+
+        vhost_connection = await self._client.vhost(vhost)
+        channel = await self._client.open_channel(vhost)
+        try:
+            queue = await channel.declare_queue(queue_name, passive=True)
+        except BaseException:
+            if not channel.is_closed:
+                await channel.close()
+            raise
+        depth = queue.declaration_result.message_count
+
+        job = RedriveJob(
+            id=uuid.uuid4().hex[:12],
+            queue=queue_name,
+            vhost=vhost,
+            rate_limit=rate_limit if rate_limit is not None else self._default_rate_limit,
+            batch_size=max(1, batch_size or self._default_batch_size),
+            max_messages=min(max_messages, depth) if max_messages is not None else depth,
+            resumed_from=resumed_from.id if resumed_from else None
+        )
+        runner = RedriveRunner(job, channel, vhost_connection.publisher)
+        self._remember(job)
+        task = asyncio.create_task(runner.run())
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+        logger.info(f"Redrive {job.id} очереди '{queue_name}' запущен: {job.max_messages} сообщений")
+        return job
+
+    async def resume(self, job_id: str) -> RedriveJob:
+        """Продолжает остановленную задачу: обрабатывает оставшиеся max_messages - position сообщений."""
+        job = self.get(job_id)
+        if job.status == RedriveStatus.RUNNING:
+            raise RedriveConflictError(f"Redrive {job_id} is still running")
+        remaining = max(0, job.max_messages - job.position)
+        if not remaining:
+            raise RedriveConflictError(f"Redrive {job_id} has nothing left to resume")
+        return await self.start(
+            job.queue,
+            vhost=job.vhost,
+            rate_limit=job.rate_limit,
+            batch_size=job.batch_size,
+            max_messages=remaining,
+            resumed_from=job
+        )
+
+    def cancel(self, job_id: str) -> RedriveJob:
+        """Останавливает задачу после текущей пачки (без дублей уже опубликованных сообщений)."""
+        job = self.get(job_id)
+        job.cancel_requested = True
+        return job
+
+    def get(self, job_id: str) -> RedriveJob:
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        return job
+
+    def list(self) -> list[RedriveJob]:
+        return list(self._jobs.values())
+
+    async def close(self) -> None:
+        for job in self._jobs.values():
+            job.cancel_requested = True
+        if self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    # ==== Приватные методы / помощники ====
+    def _remember(self, job: RedriveJob) -> None:
+        self._jobs[job.id] = job
+        while len(self._jobs) > self._history_size:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if oldest.status == RedriveStatus.RUNNING:
+                break
+            del self._jobs[oldest_id]
+
+
+def _text(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
@@ -0,0 +1,115 @@
+import uuid
+
+from aio_pika.abc import AbstractIncomingMessage
+
+from app.src.api.rabbitmq.constants import DEFAULT_VHOST, RETRY_ATTEMPT_HEADER, RETRY_QUEUE_SUFFIX
+from app.src.api.rabbitmq.publisher import EventPublisher, OutgoingMessage
+from app.src.api.rabbitmq.schemas import InfrastructureConfig, QueueConfig, RetryPolicyConfig
+from app.src.core.logging import logger
+
+
+def retry_queue_name(queue_name: str, delay_ms: int) -> str:
+    """
+    Имя очереди задержки содержит её TTL: x-message-ttl нельзя изменить у
+    существующей очереди, поэтому новая задержка - это новая очередь.
+    """
+    return f"{queue_name}{RETRY_QUEUE_SUFFIX}.{delay_ms}"
+
+
+def retry_delay_ms(policy: RetryPolicyConfig, tier: int) -> int:
+    """Задержка уровня tier (с 1): delay_ms * backoff_multiplier ** (tier - 1), не больше max_delay_ms."""
+    delay = int(policy.delay_ms * policy.backoff_multiplier ** (tier - 1))
+    if policy.max_delay_ms is not None:
+        delay = min(delay, policy.max_delay_ms)
+    return delay
+
+
+def build_retry_queues(queue_name: str, policy: RetryPolicyConfig, vhost: str = DEFAULT_VHOST) -> list[QueueConfig]:
+    """
+    Очереди задержки для повторов: по одной на каждую различную задержку
+    попыток после первой (уровни, упёршиеся в max_delay_ms, делят очередь).
+
+    У каждой очереди свой x-message-ttl, поэтому сообщения в ней истекают по
+    порядку и не блокируют друг друга. Истёкшее сообщение возвращается через
+    обменник по умолчанию в исходную очередь. После изменения политики
+    очереди прежних задержек остаются у брокера и просто опустевают.
+    """
+    delays = dict.fromkeys(retry_delay_ms(policy, tier) for tier in range(1, policy.max_attempts))
+    return [
+        QueueConfig(
+            name=retry_queue_name(queue_name, delay),
+            vhost=vhost,
+            durable=True,
+            arguments={
+                "x-message-ttl": delay,
+                "x-dead-letter-exchange": "",
+                "x-dead-letter-routing-key": queue_name,
+                "x-queue-type": "classic",
+            }
+        )
+        for delay in delays
+    ]
+
+
+def with_retry_topology(infrastructure_config: InfrastructureConfig) -> InfrastructureConfig:
+    """Дополняет конфиг очередями задержки для всех привязок сервисов с retry_policy."""
+    declared = {(queue_cfg.vhost, queue_cfg.name) for queue_cfg in infrastructure_config.queues if queue_cfg}
+    retry_queues: list[QueueConfig] = []
+    for service in infrastructure_config.services_config or []:
+        for binding in service.service_binding_conf:
+            if not binding.retry_policy or not binding.queue:
+                continue
+            for queue_cfg in build_retry_queues(binding.queue, binding.retry_policy, binding.vhost):
+                if (queue_cfg.vhost, queue_cfg.name) not in declared:
+                    declared.add((queue_cfg.vhost, queue_cfg.name))
+                    retry_queues.append(queue_cfg)
+
+    if not retry_queues:
+        return infrastructure_config
+    return infrastructure_config.model_copy(update={"queues": [*infrastructure_config.queues, *retry_queues]})
+
+
+class RetryScheduler:
+    """
+    Откладывает повтор неудачно обработанного сообщения.
+
+    Номер попытки хранится в заголовке x-retry-attempt. Пока попытки не
+    исчерпаны, копия сообщения публикуется в очередь задержки нужного уровня,
+    а оригинал подтверждается - потребитель не ждёт и не крутит цикл.
+    Копия публикуется с mandatory: если очереди задержки нет (её создаёт только
+    топология привязок сервисов), повтор не удаётся и сообщение уходит в DLX.
+    """
+
+    def __init__(self, publisher: EventPublisher, queue_name: str, policy: RetryPolicyConfig):
+        self._publisher = publisher
+        self._queue_name = queue_name
+        self._policy = policy
+
+    @staticmethod
+    def attempt_of(message: AbstractIncomingMessage) -> int:
+        """Номер попытки, на которой было получено сообщение (с 1)."""
+        return int((message.headers or {}).get(RETRY_ATTEMPT_HEADER, 0)) + 1
+
+    async def schedule(self, message: AbstractIncomingMessage) -> bool:
+        """Публикует повтор. Возвращает False, если попытки исчерпаны и сообщение пора отправить в DLQ."""
+        attempt = self.attempt_of(message)
+        if attempt >= self._policy.max_attempts:
+            logger.warning(f"Сообщение из '{self._queue_name}' исчерпало {self._policy.max_attempts} попыток")
+            return False
+
+        headers = dict(message.headers or {})
+        headers[RETRY_ATTEMPT_HEADER] = attempt
+        retry = OutgoingMessage(
+            routing_key=retry_queue_name(self._queue_name, retry_delay_ms(self._policy, attempt)),
+            body=message.body,
+            headers=headers,
+            # По message_id брокер сообщает о возврате немаршрутизируемой копии
+            message_id=message.message_id or uuid.uuid4().hex,
+            content_type=message.content_type or OutgoingMessage.content_type,
+            content_encoding=message.content_encoding
+        )
+        result = await self._publisher.publish_messages("", [retry], mandatory=True)
+        if result.failed:
+            logger.error(f"Не удалось отложить повтор сообщения из '{self._queue_name}': {result.errors[0]}")
+            return False
+        return True
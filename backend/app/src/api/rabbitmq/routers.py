@@ -1,32 +1,68 @@
+import asyncio
+import base64
+import time
+
 import httpx
-from fastapi import APIRouter, Depends, HTTPException
+from aio_pika.exceptions import ChannelNotFoundEntity
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 
 from app.configs.settings import get_settings
+from app.src.api.rabbitmq.browse import BrowseMode, MessageFilter
 from app.src.api.rabbitmq.client import RabbitMQClient
-from app.src.api.rabbitmq.constants import RMQ_QUEUE_NAME
-from app.src.api.rabbitmq.deps import get_rabbitmq_client, get_rabbitmq_http_client
+from app.src.api.rabbitmq.codecs import CodecError, decode_body, get_codec
+from app.src.api.rabbitmq.connection import VhostConnection
+from app.src.api.rabbitmq.deps import get_rabbitmq_client, get_rabbitmq_management_client, get_ready_rabbitmq_client
+from app.src.api.rabbitmq.ingress import IngressClosedError, IngressSaturatedError
+from app.src.api.rabbitmq.management import DEFAULT_QUEUE_COLUMNS, RabbitMQManagementClient
+from app.src.api.rabbitmq.redrive import RedriveConflictError
+from app.src.api.rabbitmq.rpc import RpcConnectionError, RpcTimeoutError, RpcUnroutableError
+from app.src.api.rabbitmq.schemas import PublishEventsRequest, RedriveRequest, RpcCallRequest
 
 rabbitmq_router = APIRouter()
 config = get_settings()
 
 
 @rabbitmq_router.get(path="/queue_info", tags=["rabbitmq"])
-async def queue_info(queue_name: str, client: RabbitMQClient = Depends(get_rabbitmq_client)):
-    """Возвращает список объектов относящихся к переданной сущности"""
+async def queue_info(
+    queue_name: str,
+    vhost: str = "/",
+    client: RabbitMQManagementClient = Depends(get_rabbitmq_management_client)
+):
+    """Возвращает статистику очереди из HTTP API управления (с кешированием)"""
     try:
-        return await client.get_queue_info(RMQ_QUEUE_NAME)  # TODO Переделать, передавать queue_name
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        return await client.get_queue(name=queue_name, vhost=vhost)
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            raise HTTPException(status_code=404, detail="Queue or vhost not found")
+        raise HTTPException(status_code=e.response.status_code, detail=e.response.text)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=503, detail=str(e))
 
 
 @rabbitmq_router.get(path="/list_queues", tags=["rabbitmq"])
-async def list_queues(client: httpx.AsyncClient = Depends(get_rabbitmq_http_client)):
-    """Возвращает список объектов относящихся к переданной сущности"""
-    vhost = ""
+async def list_queues(
+    vhost: str | None = None,
+    page: int | None = Query(default=None, ge=1),
+    page_size: int = Query(default=100, ge=1, le=500),
+    name: str | None = None,
+    use_regex: bool = False,
+    columns: str | None = None,
+    client: RabbitMQManagementClient = Depends(get_rabbitmq_management_client)
+):
+    """
+    Возвращает список очередей с выборкой колонок (columns через запятую),
+    постраничной выдачей (page, page_size) и фильтром по vhost и имени
+    """
     try:
-        response = await client.get(f"/queues/{vhost}")    # TODO Переделать, например сделать отдельный клиент RabbitMQManagementClient
-        response.raise_for_status()
-        return response.json()
+        return await client.list_queues(
+            vhost=vhost,
+            columns=columns.split(",") if columns else DEFAULT_QUEUE_COLUMNS,
+            page=page,
+            page_size=page_size,
+            name=name,
+            use_regex=use_regex
+        )
     except httpx.HTTPStatusError as e:
         if e.response.status_code == 404:
             raise HTTPException(status_code=404, detail="Vhost not found")
@@ -34,11 +70,323 @@ async def list_queues(client: httpx.AsyncClient = Depends(get_rabbitmq_http_clie
             status_code=e.response.status_code,
             detail=e.response.text
         )
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@rabbitmq_router.get(path="/list_vhosts", tags=["rabbitmq"])
+async def list_vhosts(client: RabbitMQManagementClient = Depends(get_rabbitmq_management_client)):
+    """Возвращает список vhost брокера из HTTP API управления"""
+    try:
+        return await client.list_vhosts()
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=e.response.status_code, detail=e.response.text)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@rabbitmq_router.get(path="/vhost_connections", tags=["rabbitmq"])
+async def vhost_connections(client: RabbitMQClient = Depends(get_rabbitmq_client)):
+    """Возвращает открытые оркестратором соединения по vhost: состояние соединения и пула каналов"""
+    return [vhost_connection.as_dict() for vhost_connection in client.vhost_connections()]
+
+
+@rabbitmq_router.get(path="/channel_pool_stats", tags=["rabbitmq"])
+async def channel_pool_stats(vhost: str = "/", client: RabbitMQClient = Depends(get_rabbitmq_client)):
+    """Возвращает метрики пула каналов vhost: размер, занятость и время ожидания канала"""
+    vhost_connection = _get_vhost_connection(client, vhost)
+    return vhost_connection.channel_pool.stats().as_dict()
+
+
+@rabbitmq_router.get(path="/connection_stats", tags=["rabbitmq"])
+async def connection_stats(vhost: str = "/", client: RabbitMQClient = Depends(get_rabbitmq_client)):
+    """Возвращает состояние соединения с vhost: узел, попытки подключения, переподключения и их длительность"""
+    vhost_connection = _get_vhost_connection(client, vhost)
+    return vhost_connection.stats.as_dict()
+
+
+@rabbitmq_router.get(path="/consumers", tags=["rabbitmq"])
+async def consumers(client: RabbitMQClient = Depends(get_rabbitmq_client)):
+    """Возвращает метрики активных потребителей"""
+    return client.consumers_stats()
+
+
+@rabbitmq_router.get(path="/peek_messages", tags=["rabbitmq"])
+async def peek_messages(
+    queue_name: str,
+    vhost: str = "/",
+    limit: int = Query(default=100, ge=1, le=config.RMQ_BROWSE_MAX_LIMIT),
+    max_scan: int | None = Query(default=None, ge=1, le=config.RMQ_BROWSE_MAX_SCAN),
+    routing_key: str | None = None,
+    header: list[str] = Query(default=[]),
+    client: RabbitMQClient = Depends(get_rabbitmq_client)
+):
+    """
+    Потоково (NDJSON) отдаёт сообщения очереди, не удаляя их: после просмотра они возвращаются в очередь.
+    Фильтры: routing_key (topic-шаблон) и header=name:value (можно несколько). Последняя строка - сводка.
+    """
+    return await _browse(client, BrowseMode.PEEK, queue_name, vhost, limit, max_scan, routing_key, header)
+
+
+@rabbitmq_router.post(path="/drain_messages", tags=["rabbitmq"])
+async def drain_messages(
+    queue_name: str,
+    vhost: str = "/",
+    limit: int = Query(default=100, ge=1, le=config.RMQ_BROWSE_MAX_LIMIT),
+    max_scan: int | None = Query(default=None, ge=1, le=config.RMQ_BROWSE_MAX_SCAN),
+    routing_key: str | None = None,
+    header: list[str] = Query(default=[]),
+    client: RabbitMQClient = Depends(get_rabbitmq_client)
+):
+    """
+    Потоково (NDJSON) забирает сообщения из очереди: выданные сообщения удаляются,
+    не прошедшие фильтр остаются в очереди. Параметры как у /peek_messages.
+    """
+    return await _browse(client, BrowseMode.DRAIN, queue_name, vhost, limit, max_scan, routing_key, header)
+
+
+@rabbitmq_router.post(path="/publish_events", tags=["rabbitmq"])
+async def publish_events(request: PublishEventsRequest, client: RabbitMQClient = Depends(get_ready_rabbitmq_client)):
+    """Публикует пачку событий одним запросом с подтверждениями брокера"""
+    try:
+        result = await client.publish_many(
+            exchange=request.exchange,
+            routing_key=request.routing_key,
+            events=request.events,
+            vhost=request.vhost
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if result.failed:
+        raise HTTPException(status_code=502, detail=result.as_dict())
+    return result.as_dict()
+
+
+@rabbitmq_router.post(path="/enqueue_events", status_code=202, tags=["rabbitmq"])
+async def enqueue_events(
+    request: PublishEventsRequest,
+    response: Response,
+    wait: bool = False,
+    client: RabbitMQClient = Depends(get_ready_rabbitmq_client)
+):
+    """
+    Принимает пачку событий в буфер публикации. 202 - события в буфере, с wait=true - 200 после подтверждения
+    брокером. 429 с Retry-After - буфер заполнен (брокер не успевает или заблокировал соединение)
+    """
+    try:
+        future = client.ingress.submit(request)
+    except IngressSaturatedError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except IngressClosedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    if not wait:
+        return {"accepted": len(request.events)}
+
+    try:
+        # Отключение клиента не отменяет публикацию уже принятых событий
+        result = await asyncio.shield(future)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    if result.failed:
+        raise HTTPException(status_code=502, detail=result.as_dict())
+    response.status_code = 200
+    return result.as_dict()
+
+
+@rabbitmq_router.get(path="/ingress_stats", tags=["rabbitmq"])
+async def ingress_stats(client: RabbitMQClient = Depends(get_rabbitmq_client)):
+    """Заполненность буфера публикации, заблокированные vhost и скорость отправки"""
+    return client.ingress.stats().as_dict()
+
+
+@rabbitmq_router.post(path="/rpc_call", tags=["rabbitmq"])
+async def rpc_call(request: RpcCallRequest, client: RabbitMQClient = Depends(get_ready_rabbitmq_client)):
+    """
+    Отправляет запрос сервису и возвращает его ответ (direct reply-to, сопоставление по correlation_id).
+    504 - ответ не получен за timeout, 502 - запрос не маршрутизирован или соединение потеряно
+    """
+    started = time.perf_counter()
+    try:
+        reply = await client.rpc_call(
+            exchange=request.exchange,
+            routing_key=request.routing_key,
+            event=request.event,
+            headers=request.headers,
+            timeout=request.timeout,
+            vhost=request.vhost
+        )
+    except RpcTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except (RpcUnroutableError, RpcConnectionError) as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "correlation_id": reply.correlation_id,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 3),
+        "content_type": reply.content_type,
+        "headers": reply.headers or {},
+        **_reply_body(reply.body, reply.content_type, reply.content_encoding),
+    }
+
+
+@rabbitmq_router.get(path="/rpc_stats", tags=["rabbitmq"])
+async def rpc_stats(client: RabbitMQClient = Depends(get_rabbitmq_client)):
+    """Возвращает метрики RPC-клиентов по vhost: вызовы, таймауты, ожидающие ответа и перцентили задержки"""
+    return client.rpc_stats()
+
+
+@rabbitmq_router.get(path="/match_routing_rules", tags=["rabbitmq"])
+async def match_routing_rules(
+    bucket: str,
+    key: str,
+    event_name: str = "s3:ObjectCreated:Put",
+    client: RabbitMQClient = Depends(get_rabbitmq_client)
+):
+    """Показывает, какие правила маршрутизации и цели подходят событию MinIO (без публикации)"""
+    index = client.event_router.index
+    rules = index.match(bucket, key, event_name)
+    return {
+        "rules_total": len(index),
+        "matched": [rule.model_dump() for rule in rules],
+    }
+
+
+@rabbitmq_router.post(path="/redrive_jobs", status_code=202, tags=["rabbitmq"])
+async def start_redrive(request: RedriveRequest, client: RabbitMQClient = Depends(get_rabbitmq_client)):
+    """
+    Запускает фоновый перенос сообщений из DLQ в исходные обменники (по заголовку x-death)
+    с подтверждениями брокера и ограничением скорости
+    """
+    try:
+        job = await client.redrive.start(
+            request.queue_name,
+            vhost=request.vhost,
+            rate_limit=request.rate_limit,
+            batch_size=request.batch_size,
+            max_messages=request.max_messages
+        )
+    except RedriveConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ChannelNotFoundEntity:
+        raise HTTPException(status_code=404, detail="Queue not found")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return job.as_dict()
+
+
+@rabbitmq_router.get(path="/redrive_jobs", tags=["rabbitmq"])
+async def list_redrive_jobs(client: RabbitMQClient = Depends(get_rabbitmq_client)):
+    """Возвращает последние задачи redrive с прогрессом"""
+    return [job.as_dict() for job in client.redrive.list()]
+
+
+@rabbitmq_router.get(path="/redrive_jobs/{job_id}", tags=["rabbitmq"])
+async def get_redrive_job(job_id: str, client: RabbitMQClient = Depends(get_rabbitmq_client)):
+    """Возвращает прогресс задачи redrive"""
+    try:
+        return client.redrive.get(job_id).as_dict()
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Redrive job not found")
+
+
+@rabbitmq_router.post(path="/redrive_jobs/{job_id}/cancel", tags=["rabbitmq"])
+async def cancel_redrive_job(job_id: str, client: RabbitMQClient = Depends(get_rabbitmq_client)):
+    """Останавливает задачу redrive после текущей пачки"""
+    try:
+        return client.redrive.cancel(job_id).as_dict()
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Redrive job not found")
+
+
+@rabbitmq_router.post(path="/redrive_jobs/{job_id}/resume", status_code=202, tags=["rabbitmq"])
+async def resume_redrive_job(job_id: str, client: RabbitMQClient = Depends(get_rabbitmq_client)):
+    """Продолжает остановленную задачу redrive с сохранённой позиции"""
+    try:
+        return (await client.redrive.resume(job_id)).as_dict()
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Redrive job not found")
+    except RedriveConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @rabbitmq_router.put(path="/set_rabbitmq_config", tags=["rabbitmq"])
-async def set_rabbitmq_config(client: RabbitMQClient = Depends(get_rabbitmq_client)):
+async def set_rabbitmq_config(
+    dry_run: bool = False,
+    force: bool = False,
+    recreate: bool | None = None,
+    client: RabbitMQClient = Depends(get_rabbitmq_client)
+):
+    """
+    Применяет изменения конфигурации топологии. С dry_run возвращает только план.
+    Обменники и очереди с изменёнными параметрами возвращаются в conflicts; recreate=true удаляет
+    и объявляет их заново (сообщения очередей теряются).
+    Доступен и до готовности клиента: так исправляют конфигурацию, на которой упала настройка.
+    В режиме нескольких воркеров запрос выполняет ведущий процесс (503 - ведущий недоступен)
+    """
+    if not client.channel_pool:
+        raise HTTPException(status_code=503, detail="RabbitMQ client is not connected")
     try:
-        return await client.setup_infrastructure()
+        return await client.apply_configuration(dry_run=dry_run, force=force, recreate=recreate)
+    except (RpcUnroutableError, RpcTimeoutError, RpcConnectionError) as e:
+        raise HTTPException(status_code=503, detail=f"Leader worker is not available: {e}")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _get_vhost_connection(client: RabbitMQClient, vhost: str) -> VhostConnection:
+    for vhost_connection in client.vhost_connections():
+        if vhost_connection.vhost == vhost:
+            return vhost_connection
+    if not client.channel_pool:
+        raise HTTPException(status_code=503, detail="RabbitMQ client is not connected")
+    raise HTTPException(status_code=404, detail=f"No connection to vhost {vhost}")
+
+
+def _reply_body(body: bytes, content_type: str | None, content_encoding: str | None = None) -> dict:
+    """Тело ответа: известные кодеки (JSON, MessagePack, сжатие) разбираются, текст как есть, остальное - base64."""
+    if content_type or content_encoding:
+        try:
+            data = decode_body(body, content_type, content_encoding)
+            return {"body": data, "body_encoding": get_codec(content_type).name}
+        except CodecError:
+            pass
+    try:
+        text = body.decode("utf-8")
+    except UnicodeDecodeError:
+        return {"body": base64.b64encode(body).decode(), "body_encoding": "base64"}
+    return {"body": text, "body_encoding": "utf-8"}
+
+
+async def _browse(
+    client: RabbitMQClient,
+    mode: BrowseMode,
+    queue_name: str,
+    vhost: str,
+    limit: int,
+    max_scan: int | None,
+    routing_key: str | None,
+    headers: list[str]
+) -> StreamingResponse:
+    try:
+        message_filter = MessageFilter.from_query(routing_key, headers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        browser = await client.browse_queue(
+            queue_name=queue_name,
+            vhost=vhost,
+            mode=mode,
+            message_filter=message_filter,
+            limit=limit,
+            max_scan=max_scan
+        )
+    except ChannelNotFoundEntity:
+        raise HTTPException(status_code=404, detail="Queue not found")
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(browser.ndjson(), media_type="application/x-ndjson")
@@ -0,0 +1,170 @@
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Iterable
+from urllib.parse import unquote_plus
+
+from aio_pika.abc import AbstractIncomingMessage
+
+from app.src.api.rabbitmq.codecs import decode_body
+from app.src.api.rabbitmq.connection import VhostConnection
+from app.src.api.rabbitmq.metrics import EVENTS_ROUTED
+from app.src.api.rabbitmq.publisher import OutgoingMessage
+from app.src.api.rabbitmq.schemas import RoutingRuleConfig, RoutingTargetConfig
+from app.src.core.logging import logger
+
+ROUTING_RULES_HEADER = "x-routing-rules"
+ANY = "*"
+
+
+@dataclass(frozen=True)
+class ObjectEvent:
+    """Запись события MinIO (формат уведомлений S3)."""
+    bucket: str
+    key: str
+    event_name: str
+
+
+def parse_minio_event(
+    body: bytes,
+    content_type: str | None = None,
+    content_encoding: str | None = None
+) -> list[ObjectEvent]:
+    """Записи из уведомления MinIO: {"EventName": ..., "Key": ..., "Records": [{"eventName", "s3": {...}}]}."""
+    data = decode_body(body, content_type, content_encoding)
+    events = []
+    for record in data.get("Records") or []:
+        s3 = record["s3"]
+        # Ключ объекта в уведомлении закодирован как в URL
+        events.append(ObjectEvent(
+            bucket=s3["bucket"]["name"],
+            key=unquote_plus(s3["object"]["key"]),
+            event_name=record["eventName"]
+        ))
+    return events
+
+
+def event_keys(event_name: str) -> tuple[str, str, str]:
+    """Ключи, под которыми правило может ждать событие: точное имя, категория (s3:ObjectCreated:*) и любое."""
+    category, sep, _ = event_name.rpartition(":")
+    return event_name, f"{category}:{ANY}" if sep else event_name, ANY
+
+
+@dataclass
+class _AffixIndex:
+    """Словарь значение -> вложенный уровень и длины значений: поиск за число различных длин, а не правил."""
+    entries: dict[str, "_AffixIndex | dict[str, list[RoutingRuleConfig]]"] = field(default_factory=dict)
+    lengths: tuple[int, ...] = ()
+
+    def freeze(self) -> None:
+        self.lengths = tuple(sorted({len(value) for value in self.entries}))
+
+
+class RoutingIndex:
+    """
+    Скомпилированные правила маршрутизации.
+
+    Правила раскладываются по вложенным словарям: bucket -> prefix -> suffix ->
+    событие. Префикс ключа объекта ищется только по различным длинам
+    префиксов правил (key[:n] в словаре), суффикс - так же, а событие - по
+    точному имени, категории и '*'. Стоимость поиска определяется длиной
+    ключа и числом различных длин, а не количеством правил.
+    """
+
+    def __init__(self, rules: Iterable[RoutingRuleConfig] = ()):
+        self.rules: list[RoutingRuleConfig] = list(rules)
+        self._buckets: dict[str, _AffixIndex] = {}
+        for rule in self.rules:
+            prefixes = self._buckets.setdefault(rule.bucket or ANY, _AffixIndex())
+            suffixes = prefixes.entries.setdefault(rule.prefix, _AffixIndex())
+            events = suffixes.entries.setdefault(rule.suffix, {})
+            for event_name in rule.events or [ANY]:
+                events.setdefault(event_name, []).append(rule)
+        for prefixes in self._buckets.values():
+            prefixes.freeze()
+            for suffixes in prefixes.entries.values():
+                suffixes.freeze()
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def match(self, bucket: str, key: str, event_name: str) -> list[RoutingRuleConfig]:
+        """Правила, подходящие событию, в порядке объявления."""
+        matched: list[RoutingRuleConfig] = []
+        keys = event_keys(event_name)
+        size = len(key)
+        for prefixes in (self._buckets.get(bucket), self._buckets.get(ANY)):
+            if prefixes is None:
+                continue
+            for prefix_length in prefixes.lengths:
+                if prefix_length > size:
+                    break
+                suffixes = prefixes.entries.get(key[:prefix_length])
+                if suffixes is None:
+                    continue
+                for suffix_length in suffixes.lengths:
+                    if suffix_length > size:
+                        break
+                    events = suffixes.entries.get(key[size - suffix_length:])
+                    if events is None:
+                        continue
+                    for event_key in dict.fromkeys(keys):
+                        matched.extend(events.get(event_key, ()))
+        if len(matched) > 1:
+            order = {id(rule): position for position, rule in enumerate(self.rules)}
+            matched = sorted(dict((id(rule), rule) for rule in matched).values(), key=lambda rule: order[id(rule)])
+        return matched
+
+
+class EventRouter:
+    """
+    Маршрутизация событий MinIO по правилам: каждое сообщение очереди
+    событий копируется во все обменники целей подошедших правил (одна
+    копия на цель, даже если её указали несколько правил). Сообщение
+    подтверждается после подтверждения брокером всех копий; без подошедших
+    правил - сразу.
+    """
+
+    def __init__(self, vhost: Callable[[str], Awaitable[VhostConnection]]):
+        self._vhost = vhost
+        self.index = RoutingIndex()
+
+    def update(self, rules: Iterable[RoutingRuleConfig]) -> None:
+        """Перекомпилирует индекс (атомарная замена - поиск не видит промежуточного состояния)."""
+        self.index = RoutingIndex(rules)
+
+    async def handle(self, message: AbstractIncomingMessage) -> None:
+        try:
+            events = parse_minio_event(message.body, message.content_type, message.content_encoding)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            EVENTS_ROUTED.labels(outcome="invalid").inc()
+            raise ValueError(f"Сообщение не является событием MinIO: {e}")
+
+        index = self.index
+        targets: dict[tuple[str, str, str], list[str]] = {}
+        for event in events:
+            for rule in index.match(event.bucket, event.key, event.event_name):
+                for target in rule.targets:
+                    key = (target.vhost, target.exchange, self._routing_key(target, message))
+                    targets.setdefault(key, []).append(rule.name)
+        if not targets:
+            EVENTS_ROUTED.labels(outcome="unmatched").inc()
+            return
+
+        for (vhost, exchange, routing_key), rule_names in targets.items():
+            vhost_connection = await self._vhost(vhost)
+            result = await vhost_connection.publisher.publish_messages(exchange, [OutgoingMessage(
+                routing_key=routing_key,
+                body=message.body,
+                headers={**(message.headers or {}), ROUTING_RULES_HEADER: ",".join(dict.fromkeys(rule_names))},
+                message_id=message.message_id,
+                content_type=message.content_type or OutgoingMessage.content_type,
+                content_encoding=message.content_encoding
+            )])
+            if result.failed:
+                # Исключение - повтор или DLX по политике потребителя; уже отправленные копии могут продублироваться
+                raise RuntimeError(f"Не удалось доставить событие в '{exchange}': {result.errors[0]}")
+        EVENTS_ROUTED.labels(outcome="routed").inc()
+        logger.debug("Событие {message_id} отправлено в {targets}", message_id=message.message_id, targets=[*targets])
+
+    @staticmethod
+    def _routing_key(target: RoutingTargetConfig, message: AbstractIncomingMessage) -> str:
+        return target.routing_key if target.routing_key is not None else message.routing_key or ""
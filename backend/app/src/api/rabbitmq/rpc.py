@@ -0,0 +1,244 @@
+import asyncio
+import time
+import uuid
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from aio_pika import DeliveryMode, Message
+from aio_pika.abc import AbstractChannel, AbstractIncomingMessage, AbstractQueue, AbstractRobustConnection
+
+from app.src.api.rabbitmq.base import AMQPChannelFactory
+from app.src.api.rabbitmq.codecs import JSON_CONTENT_TYPE
+from app.src.api.rabbitmq.constants import DEFAULT_VHOST, REPLY_TO_QUEUE
+from app.src.api.rabbitmq.metrics import RPC_CALLS, RPC_DURATION
+from app.src.core.logging import logger
+
+
+class RpcTimeoutError(TimeoutError):
+    """Ответ на RPC-запрос не получен за отведённое время."""
+
+
+class RpcConnectionError(ConnectionError):
+    """Канал ответов закрыт до получения ответа (разрыв соединения)."""
+
+
+class RpcUnroutableError(Exception):
+    """Брокер вернул запрос (basic.return): нет очереди для routing_key."""
+
+
+@dataclass
+class RpcStats:
+    """Снимок метрик RPC-клиента vhost. Перцентили - по последним latency_window ответам."""
+    vhost: str
+    calls: int
+    replies: int
+    timeouts: int
+    failed: int
+    late_replies: int
+    in_flight: int
+    p50_ms: float | None
+    p90_ms: float | None
+    p99_ms: float | None
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class LatencyWindow:
+    """Скользящее окно последних задержек для перцентилей."""
+
+    def __init__(self, size: int = 1024):
+        self._samples: deque[float] = deque(maxlen=max(1, size))
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentiles(self, *ps: int) -> list[float | None]:
+        if not self._samples:
+            return [None for _ in ps]
+        ordered = sorted(self._samples)
+        last = len(ordered) - 1
+        return [round(ordered[min(last, int(last * p / 100 + 0.5))] * 1000, 3) for p in ps]
+
+
+class RpcClient:
+    """
+    Запрос-ответ поверх AMQP через direct reply-to (amq.rabbitmq.reply-to).
+
+    Все вызовы vhost используют один выделенный канал: на нём работает
+    единственный потребитель псевдо-очереди ответов (no_ack), и с него же
+    публикуются запросы - брокер доставляет ответ в канал, отправивший
+    запрос. Ответ сопоставляется с вызовом по correlation_id, ожидающие
+    вызовы хранятся в словаре correlation_id -> future, поэтому очередь на
+    каждый вызов не нужна. У запроса выставляется expiration, равный
+    таймауту: брокер не доставит запрос, ответ на который уже никто не ждёт.
+    """
+
+    def __init__(
+        self,
+        connection: AbstractRobustConnection,
+        channel_factory: AMQPChannelFactory,
+        vhost: str = DEFAULT_VHOST,
+        default_timeout: float = 30.0,
+        max_in_flight: int = 10000,
+        latency_window: int = 1024
+    ):
+        self.vhost = vhost
+        self.default_timeout = default_timeout
+        self._connection = connection
+        self._channel_factory = channel_factory
+        self._channel: AbstractChannel | None = None
+        self._queue: AbstractQueue | None = None
+        self._consumer_tag: str | None = None
+        self._futures: dict[str, asyncio.Future] = {}
+        self._slots = asyncio.Semaphore(max(1, max_in_flight))
+        self._latency = LatencyWindow(latency_window)
+
+        self._calls = 0
+        self._replies = 0
+        self._timeouts = 0
+        self._failed = 0
+        self._late_replies = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._futures)
+
+    async def start(self) -> None:
+        """Открывает канал и подписывается на псевдо-очередь ответов (до первой публикации)."""
+        self._channel = await self._channel_factory(self._connection)
+        self._channel.close_callbacks.add(self._on_channel_close)
+        self._channel.return_callbacks.add(self._on_return)
+        self._queue = await self._channel.get_queue(REPLY_TO_QUEUE, ensure=False)
+        self._consumer_tag = await self._queue.consume(self._on_reply, no_ack=True)
+        logger.info(f"RPC-клиент vhost '{self.vhost}' запущен")
+
+    async def restart(self) -> None:
+        """Новый канал после переподключения: ответы на запросы старого канала уже не придут."""
+        self._fail_pending(RpcConnectionError("Соединение с брокером восстановлено, ответ потерян"))
+        await self.close()
+        await self.start()
+
+    async def close(self) -> None:
+        self._fail_pending(RpcConnectionError("RPC-клиент закрыт"))
+        channel, self._channel = self._channel, None
+        if channel and not channel.is_closed:
+            try:
+                await channel.close()
+            except Exception as e:
+                logger.warning(f"RPC-клиент vhost '{self.vhost}': ошибка при закрытии канала: {e}")
+
+    async def call(
+        self,
+        exchange: str,
+        routing_key: str,
+        body: bytes,
+        headers: dict | None = None,
+        timeout: float | None = None,
+        content_type: str = JSON_CONTENT_TYPE,
+        content_encoding: str | None = None
+    ) -> AbstractIncomingMessage:
+        """
+        Публикует запрос и ждёт ответ не дольше timeout.
+        :raises RpcTimeoutError: ответ не получен вовремя
+        :raises RpcConnectionError: канал ответов закрылся
+        :raises RpcUnroutableError: запрос не маршрутизирован (mandatory)
+        """
+        timeout = timeout or self.default_timeout
+        started = time.perf_counter()
+        self._calls += 1
+        try:
+            async with asyncio.timeout(timeout):
+                async with self._slots:
+                    reply = await self._call(
+                        exchange, routing_key, body, headers, timeout, content_type, content_encoding
+                    )
+        except TimeoutError:
+            self._timeouts += 1
+            RPC_CALLS.labels(outcome="timeout").inc()
+            raise RpcTimeoutError(f"Нет ответа на RPC-запрос '{routing_key}' за {timeout} с")
+        except Exception:
+            self._failed += 1
+            RPC_CALLS.labels(outcome="error").inc()
+            raise
+
+        duration = time.perf_counter() - started
+        self._replies += 1
+        self._latency.add(duration)
+        RPC_CALLS.labels(outcome="ok").inc()
+        RPC_DURATION.observe(duration)
+        return reply
+
+    def stats(self) -> RpcStats:
+        p50, p90, p99 = self._latency.percentiles(50, 90, 99)
+        return RpcStats(
+            vhost=self.vhost,
+            calls=self._calls,
+            replies=self._replies,
+            timeouts=self._timeouts,
+            failed=self._failed,
+            late_replies=self._late_replies,
+            in_flight=self.in_flight,
+            p50_ms=p50,
+            p90_ms=p90,
+            p99_ms=p99,
+        )
+
+    # ==== Приватные методы / помощники ====
+    async def _call(
+        self,
+        exchange: str,
+        routing_key: str,
+        body: bytes,
+        headers: dict | None,
+        timeout: float,
+        content_type: str,
+        content_encoding: str | None
+    ) -> AbstractIncomingMessage:
+        if self._channel is None or self._channel.is_closed:
+            raise RpcConnectionError("Канал ответов RPC закрыт")
+        correlation_id = uuid.uuid4().hex
+        future = asyncio.get_running_loop().create_future()
+        self._futures[correlation_id] = future
+        try:
+            message = Message(
+                body=body,
+                headers=headers,
+                content_type=content_type,
+                content_encoding=content_encoding,
+                correlation_id=correlation_id,
+                reply_to=REPLY_TO_QUEUE,
+                expiration=timeout,
+                delivery_mode=DeliveryMode.NOT_PERSISTENT
+            )
+            if exchange:
+                target = await self._channel.get_exchange(exchange, ensure=False)
+            else:
+                target = self._channel.default_exchange
+            await target.publish(message, routing_key=routing_key, mandatory=True)
+            return await future
+        finally:
+            self._futures.pop(correlation_id, None)
+
+    async def _on_reply(self, message: AbstractIncomingMessage) -> None:
+        future = self._futures.get(message.correlation_id or "")
+        if future is None or future.done():
+            # Ответ пришёл после таймаута или не относится к нашим запросам
+            self._late_replies += 1
+            return
+        future.set_result(message)
+
+    def _on_return(self, sender: Any, message: AbstractIncomingMessage) -> None:
+        future = self._futures.get(message.correlation_id or "")
+        if future is not None and not future.done():
+            future.set_exception(RpcUnroutableError(f"Нет получателя RPC-запроса '{message.routing_key}'"))
+
+    def _fail_pending(self, error: Exception) -> None:
+        for future in self._futures.values():
+            if not future.done():
+                future.set_exception(error)
+
+    def _on_channel_close(self, sender: Any = None, *args: Any) -> None:
+        if sender is None or sender is self._channel:
+            self._fail_pending(RpcConnectionError("Канал ответов RPC закрыт"))
@@ -1,7 +1,7 @@
 from typing import Any
 
-from app.src.api.rabbitmq.constants import RMQDestinationType
-from pydantic import BaseModel
+from app.src.api.rabbitmq.constants import DLX_QUEUE_NAME, RMQDestinationType
+from pydantic import BaseModel, Field
 
 from app.configs.settings import get_settings
 
@@ -38,8 +38,10 @@ class BindingConfig(BaseModel):
 
 # === Схемы настройки конфигурации потребителей (динамическая подписка) ===
 class RetryPolicyConfig(BaseModel):
-    max_attempts: int = 3
-    delay_ms: int = 1000
+    max_attempts: int = Field(default=3, ge=1)
+    delay_ms: int = Field(default=1000, ge=0)
+    backoff_multiplier: float = Field(default=2.0, ge=1.0)
+    max_delay_ms: int | None = None
 
 
 class ServiceBindingConfig(BaseModel):
@@ -60,11 +62,28 @@ class ServiceConfig(BaseModel):
     service_binding_conf: list[ServiceBindingConfig]
 
 
+# === Схемы правил маршрутизации событий MinIO ===
+class RoutingTargetConfig(BaseModel):
+    exchange: str
+    routing_key: str | None = None  # None - routing_key исходного сообщения
+    vhost: str = "/"
+
+
+class RoutingRuleConfig(BaseModel):
+    name: str
+    bucket: str | None = None  # None или "*" - любой бакет
+    prefix: str = ""
+    suffix: str = ""
+    events: list[str] = []  # s3:ObjectCreated:Put, s3:ObjectCreated:*; пусто - любое событие
+    targets: list[RoutingTargetConfig] = Field(min_length=1)
+
+
 class InfrastructureConfig(BaseModel):
     queues: list[QueueConfig | None] = []
     exchanges: list[ExchangeConfig | None] = []
     bindings: list[BindingConfig | None] = []
     services_config: list[ServiceConfig] | None = None
+    routing_rules: list[RoutingRuleConfig] = []
 
 
 # === События RMQ ===
@@ -75,4 +94,32 @@ class Event(BaseModel):
 
 
 class ConfigReadyEvent(Event):
-    ...
+    # Типизированный payload сериализуется по схеме, а не выводом типа каждого значения (как Any)
+    payload: list[ServiceBindingConfig]
+
+
+# === Схемы HTTP API публикации ===
+class PublishEventsRequest(BaseModel):
+    exchange: str
+    routing_key: str
+    vhost: str = "/"
+    events: list[Event] = Field(min_length=1)
+
+
+# === Схемы HTTP API redrive ===
+class RedriveRequest(BaseModel):
+    queue_name: str = DLX_QUEUE_NAME
+    vhost: str = "/"
+    rate_limit: float | None = Field(default=None, gt=0, description="Сообщений в секунду; по умолчанию из настроек")
+    batch_size: int | None = Field(default=None, ge=1, le=10000)
+    max_messages: int | None = Field(default=None, ge=1, description="По умолчанию - глубина очереди на старте")
+
+
+# === Схемы HTTP API RPC ===
+class RpcCallRequest(BaseModel):
+    exchange: str = ""
+    routing_key: str
+    vhost: str = "/"
+    event: Event
+    headers: dict[str, str] | None = None
+    timeout: float | None = Field(default=None, gt=0, le=300, description="Секунды; по умолчанию из настроек")
@@ -0,0 +1,467 @@
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Generic, TypeVar
+
+from aio_pika.abc import AbstractChannel
+from aio_pika.exceptions import ChannelPreconditionFailed
+from pydantic import BaseModel
+
+from app.src.api.rabbitmq.constants import RMQDestinationType
+from app.src.api.rabbitmq.metrics import AMQP_OPERATION_DURATION
+from app.src.api.rabbitmq.pool import ChannelPool
+from app.src.api.rabbitmq.schemas import BindingConfig, ExchangeConfig, InfrastructureConfig, QueueConfig
+from app.src.core.logging import logger
+
+# Операция может вернуть продолжение - его выполняют на новом канале (старый закрыт ошибкой брокера)
+DeclareOperation = Callable[[AbstractChannel], Awaitable["DeclareOperation | None"]]
+EntityKey = tuple[str, ...]
+EntityConfig = TypeVar("EntityConfig", ExchangeConfig, QueueConfig, BindingConfig)
+DeclarableConfig = ExchangeConfig | QueueConfig
+
+
+def fingerprint(model: BaseModel) -> str:
+    """Стабильный отпечаток сущности (не зависит от порядка ключей в arguments)."""
+    data = json.dumps(model.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(data.encode()).hexdigest()
+
+
+def exchange_key(exchange_cfg: ExchangeConfig) -> EntityKey:
+    return exchange_cfg.vhost, exchange_cfg.name
+
+
+def queue_key(queue_cfg: QueueConfig) -> EntityKey:
+    return queue_cfg.vhost, queue_cfg.name
+
+
+def binding_key(binding: BindingConfig) -> EntityKey:
+    # Привязка идентифицируется всеми своими полями: «изменённая» привязка - это удаление старой и создание новой
+    return (
+        binding.vhost,
+        binding.source,
+        binding.destination_type.value,
+        binding.destination,
+        binding.routing_key,
+        fingerprint(binding),
+    )
+
+
+@dataclass
+class EntityDiff(Generic[EntityConfig]):
+    """
+    Разница между применённым и новым набором сущностей одного типа.
+
+    changed - обменники и очереди с теми же именами, но другими параметрами.
+    RabbitMQ не меняет их на месте (повторное объявление - PRECONDITION_FAILED),
+    поэтому они либо пропускаются как конфликты, либо пересоздаются (recreate).
+    """
+    added: list[EntityConfig] = field(default_factory=list)
+    changed: list[EntityConfig] = field(default_factory=list)
+    removed: list[EntityConfig] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def to_declare(self) -> list[EntityConfig]:
+        return self.added + self.changed
+
+    def as_dict(self) -> dict:
+        return {
+            "added": [_entity_label(cfg) for cfg in self.added],
+            "changed": [_entity_label(cfg) for cfg in self.changed],
+            "removed": [_entity_label(cfg) for cfg in self.removed],
+            "unchanged": self.unchanged,
+        }
+
+
+def _entity_label(cfg: BaseModel) -> str:
+    if isinstance(cfg, BindingConfig):
+        return f"{cfg.source} -> {cfg.destination} [{cfg.routing_key}]"
+    return cfg.name
+
+
+def conflict_label(cfg: DeclarableConfig) -> str:
+    kind = "queue" if isinstance(cfg, QueueConfig) else "exchange"
+    return f"{kind} '{cfg.name}' (vhost '{cfg.vhost}')"
+
+
+def _binds_to(binding: BindingConfig, cfg: DeclarableConfig) -> bool:
+    if binding.vhost != cfg.vhost:
+        return False
+    if isinstance(cfg, QueueConfig):
+        return binding.destination_type == RMQDestinationType.QUEUE and binding.destination == cfg.name
+    return binding.source == cfg.name or (
+        binding.destination_type == RMQDestinationType.EXCHANGE and binding.destination == cfg.name
+    )
+
+
+@dataclass
+class TopologyPlan:
+    """
+    План применения топологии: что объявить и какие привязки снять.
+    rebind - неизменившиеся привязки пересоздаваемых сущностей: удаление
+    обменника или очереди снимает их вместе с ней.
+    """
+    exchanges: EntityDiff[ExchangeConfig] = field(default_factory=EntityDiff)
+    queues: EntityDiff[QueueConfig] = field(default_factory=EntityDiff)
+    bindings: EntityDiff[BindingConfig] = field(default_factory=EntityDiff)
+    rebind: list[BindingConfig] = field(default_factory=list)
+
+    @property
+    def changed_entities(self) -> list[DeclarableConfig]:
+        return [*self.exchanges.changed, *self.queues.changed]
+
+    @property
+    def is_empty(self) -> bool:
+        return not (
+            self.exchanges.to_declare
+            or self.queues.to_declare
+            or self.bindings.to_declare
+            or self.bindings.removed
+        )
+
+    def by_vhost(self) -> dict[str, "TopologyPlan"]:
+        """Разбивает план по vhost: сущности разных vhost объявляются через разные соединения."""
+        plans: dict[str, TopologyPlan] = {}
+        for kind in ("exchanges", "queues", "bindings"):
+            entity_diff: EntityDiff = getattr(self, kind)
+            for bucket in ("added", "changed", "removed"):
+                for cfg in getattr(entity_diff, bucket):
+                    plan = plans.setdefault(cfg.vhost, TopologyPlan())
+                    getattr(getattr(plan, kind), bucket).append(cfg)
+        for cfg in self.rebind:
+            plans.setdefault(cfg.vhost, TopologyPlan()).rebind.append(cfg)
+        return plans
+
+    def as_dict(self) -> dict:
+        return {
+            "exchanges": self.exchanges.as_dict(),
+            "queues": self.queues.as_dict(),
+            "bindings": self.bindings.as_dict(),
+        }
+
+
+@dataclass
+class TopologySnapshot:
+    """Отпечатки применённой топологии по каждой сущности."""
+    exchanges: dict[EntityKey, tuple[str, ExchangeConfig]] = field(default_factory=dict)
+    queues: dict[EntityKey, tuple[str, QueueConfig]] = field(default_factory=dict)
+    bindings: dict[EntityKey, tuple[str, BindingConfig]] = field(default_factory=dict)
+
+    @classmethod
+    def from_config(cls, infrastructure_config: InfrastructureConfig) -> "TopologySnapshot":
+        return cls(
+            exchanges={exchange_key(c): (fingerprint(c), c) for c in infrastructure_config.exchanges if c},
+            queues={queue_key(c): (fingerprint(c), c) for c in infrastructure_config.queues if c},
+            bindings={binding_key(c): ("", c) for c in infrastructure_config.bindings if c},
+        )
+
+    def diff(self, applied: "TopologySnapshot | None") -> TopologyPlan:
+        """Строит план перехода от применённой топологии (applied) к текущей."""
+        applied = applied or TopologySnapshot()
+        plan = TopologyPlan(
+            exchanges=self._diff_entities(applied.exchanges, self.exchanges),
+            queues=self._diff_entities(applied.queues, self.queues),
+            bindings=self._diff_entities(applied.bindings, self.bindings),
+        )
+        changed = plan.changed_entities
+        if changed:
+            new_bindings = {binding_key(cfg) for cfg in plan.bindings.added}
+            plan.rebind = [
+                cfg for key, (_, cfg) in self.bindings.items()
+                if key not in new_bindings and any(_binds_to(cfg, entity) for entity in changed)
+            ]
+        return plan
+
+    def with_conflicts(
+        self,
+        conflicts: list[DeclarableConfig],
+        applied: "TopologySnapshot | None"
+    ) -> "TopologySnapshot":
+        """
+        Снимок того, что на самом деле применено. Для сущности-конфликта
+        остаётся прежняя запись, и следующий diff снова покажет её в changed.
+        Конфликт без прежней записи (сущность у брокера объявлена не нами)
+        из снимка убирается: следующий diff покажет его в added, и объявление
+        будет повторено - снова конфликтом, если брокер не изменился.
+        """
+        if not conflicts:
+            return self
+        applied = applied or TopologySnapshot()
+        snapshot = TopologySnapshot(exchanges=dict(self.exchanges), queues=dict(self.queues), bindings=self.bindings)
+        for cfg in conflicts:
+            entities, old_entities, key = (
+                (snapshot.queues, applied.queues, queue_key(cfg)) if isinstance(cfg, QueueConfig)
+                else (snapshot.exchanges, applied.exchanges, exchange_key(cfg))
+            )
+            if key in old_entities:
+                entities[key] = old_entities[key]
+            else:
+                entities.pop(key, None)
+        return snapshot
+
+    @staticmethod
+    def _diff_entities(
+        old: dict[EntityKey, tuple[str, EntityConfig]],
+        new: dict[EntityKey, tuple[str, EntityConfig]]
+    ) -> EntityDiff[EntityConfig]:
+        entity_diff: EntityDiff[EntityConfig] = EntityDiff()
+        for key, (new_fingerprint, cfg) in new.items():
+            if key not in old:
+                entity_diff.added.append(cfg)
+            elif old[key][0] != new_fingerprint:
+                entity_diff.changed.append(cfg)
+            else:
+                entity_diff.unchanged += 1
+        entity_diff.removed = [cfg for key, (_, cfg) in old.items() if key not in new]
+        return entity_diff
+
+
+@dataclass
+class PhaseReport:
+    """Результат одной фазы объявления топологии."""
+    name: str
+    count: int = 0
+    duration_ms: float = 0.0
+
+
+@dataclass
+class DeclarationReport:
+    """Сводка по объявлению топологии с таймингами фаз."""
+    concurrency: int = 1
+    dry_run: bool = False
+    plan: TopologyPlan | None = None
+    phases: list[PhaseReport] = field(default_factory=list)
+    vhosts: dict[str, "DeclarationReport"] = field(default_factory=dict)
+    notified_services: list[str] = field(default_factory=list)  # получили CONFIG_READY
+    conflicts: list[DeclarableConfig] = field(default_factory=list)  # параметры расходятся с брокером, пропущены
+    recreated: list[DeclarableConfig] = field(default_factory=list)  # удалены и объявлены заново
+
+    @classmethod
+    def merge(cls, plan: TopologyPlan, reports: dict[str, "DeclarationReport"]) -> "DeclarationReport":
+        """
+        Сводный отчёт по vhost, объявленным параллельно.
+        Длительность фазы - максимум по vhost, количество операций - сумма.
+        """
+        phases: dict[str, PhaseReport] = {}
+        for report in reports.values():
+            for phase in report.phases:
+                merged = phases.setdefault(phase.name, PhaseReport(name=phase.name))
+                merged.count += phase.count
+                merged.duration_ms = max(merged.duration_ms, phase.duration_ms)
+        return cls(
+            concurrency=sum(report.concurrency for report in reports.values()),
+            plan=plan,
+            phases=list(phases.values()),
+            vhosts=reports,
+            conflicts=[cfg for report in reports.values() for cfg in report.conflicts],
+            recreated=[cfg for report in reports.values() for cfg in report.recreated]
+        )
+
+    @property
+    def total_ms(self) -> float:
+        return sum(phase.duration_ms for phase in self.phases)
+
+    def as_dict(self) -> dict:
+        data = {
+            "concurrency": self.concurrency,
+            "dry_run": self.dry_run,
+            "total_ms": round(self.total_ms, 3),
+            "phases": {
+                phase.name: {"count": phase.count, "duration_ms": round(phase.duration_ms, 3)}
+                for phase in self.phases
+            },
+            "plan": self.plan.as_dict() if self.plan else None,
+            "notified_services": self.notified_services,
+            "conflicts": [conflict_label(cfg) for cfg in self.conflicts],
+            "recreated": [conflict_label(cfg) for cfg in self.recreated],
+        }
+        if self.vhosts:
+            data["vhosts"] = {vhost: {**report.as_dict(), "plan": None} for vhost, report in self.vhosts.items()}
+        return data
+
+
+class TopologyDeclarer:
+    """
+    Применяет план топологии по фазам: обменники -> очереди -> привязки -> снятие удалённых привязок.
+
+    Внутри фазы операции выполняются параллельно. На одном канале AMQP
+    синхронные методы выполняются строго по очереди, поэтому параллелизм
+    ограничивается количеством каналов: не больше concurrency и размера пула.
+
+    Обменник или очередь, параметры которых расходятся с уже существующими у
+    брокера (changed в плане или PRECONDITION_FAILED при объявлении), по
+    умолчанию пропускается и попадает в report.conflicts. С recreate=True
+    сущность удаляется и объявляется заново, её привязки восстанавливаются;
+    сообщения удалённой очереди теряются, поэтому режим включается явно.
+    """
+
+    def __init__(self, channel_pool: ChannelPool, concurrency: int = 1, recreate: bool = False):
+        self._channel_pool = channel_pool
+        self._concurrency = max(1, min(concurrency, channel_pool.max_size))
+        self._recreate = recreate
+
+    async def declare(self, infrastructure_config: InfrastructureConfig) -> DeclarationReport:
+        """Объявляет все сущности из конфига и возвращает отчёт по фазам."""
+        return await self.apply(TopologySnapshot.from_config(infrastructure_config).diff(None))
+
+    async def apply(self, plan: TopologyPlan) -> DeclarationReport:
+        """Применяет план и возвращает отчёт по фазам."""
+        report = DeclarationReport(plan=plan)
+        if self._recreate:
+            exchanges, queues = plan.exchanges.to_declare, plan.queues.to_declare
+            bindings = plan.bindings.to_declare + plan.rebind
+        else:
+            # Изменённые сущности не объявляются повторно: брокер закрыл бы канал с PRECONDITION_FAILED
+            exchanges, queues, bindings = plan.exchanges.added, plan.queues.added, plan.bindings.to_declare
+            report.conflicts.extend(plan.changed_entities)
+        changed = {id(cfg) for cfg in plan.changed_entities}
+
+        phases: list[tuple[str, list[DeclareOperation]]] = [
+            ("exchanges", [self._declare_op(cfg, id(cfg) in changed, report) for cfg in exchanges]),
+            ("queues", [self._declare_op(cfg, id(cfg) in changed, report) for cfg in queues]),
+            ("bindings", [self._bind_op(cfg) for cfg in bindings]),
+            ("unbindings", [self._unbind_op(cfg) for cfg in plan.bindings.removed]),
+        ]
+
+        width = min(self._concurrency, max(len(ops) for _, ops in phases)) or 1
+        report.concurrency = width
+        if plan.is_empty:
+            logger.info("Топология не изменилась, объявление пропущено")
+            return report
+
+        limiter = asyncio.Semaphore(width)
+        for name, operations in phases:
+            if not operations:
+                continue
+            report.phases.append(await self._run_phase(name, operations, limiter))
+
+        if report.conflicts:
+            logger.warning(
+                f"Параметры {len(report.conflicts)} сущностей расходятся с брокером, они не изменены "
+                f"(пересоздание - recreate): {', '.join(conflict_label(cfg) for cfg in report.conflicts)}"
+            )
+        logger.info(
+            f"Топология объявлена за {report.total_ms:.1f} мс "
+            f"(каналов: {width}, {', '.join(f'{p.name}={p.count}' for p in report.phases)})"
+        )
+        return report
+
+    # ==== Фазы ====
+    async def _run_phase(
+        self,
+        name: str,
+        operations: list[DeclareOperation],
+        limiter: asyncio.Semaphore
+    ) -> PhaseReport:
+        """Выполняет операции фазы параллельно, каждая на свободном канале пула."""
+
+        latency = AMQP_OPERATION_DURATION.labels(operation=f"declare_{name}")
+
+        async def run(operation: DeclareOperation | None) -> None:
+            async with limiter:
+                while operation is not None:
+                    async with self._channel_pool.acquire() as channel:
+                        op_started = time.perf_counter()
+                        operation = await operation(channel)
+                        latency.observe(time.perf_counter() - op_started)
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(run(op) for op in operations), return_exceptions=True)
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            logger.error(
+                "Фаза '{phase}': ошибок {errors} из {operations}",
+                phase=name, errors=len(errors), operations=len(operations)
+            )
+            raise errors[0]
+
+        logger.debug(
+            "Фаза '{phase}': {operations} операций за {duration_ms:.1f} мс",
+            phase=name, operations=len(operations), duration_ms=duration_ms
+        )
+        return PhaseReport(name=name, count=len(operations), duration_ms=duration_ms)
+
+    # ==== Операции ====
+    def _declare_op(self, cfg: DeclarableConfig, changed: bool, report: DeclarationReport) -> DeclareOperation:
+        """
+        Объявление обменника или очереди. Изменённая сущность (только с recreate)
+        сначала удаляется. PRECONDITION_FAILED у сущности, которой нет в
+        применённом снимке (старт при существующей топологии), - конфликт:
+        с recreate она пересоздаётся на новом канале, иначе пропускается.
+        """
+        async def recreate(channel: AbstractChannel) -> None:
+            if isinstance(cfg, QueueConfig):
+                await channel.queue_delete(cfg.name)
+            else:
+                await channel.exchange_delete(cfg.name)
+            await _declare_entity(channel, cfg)
+            report.recreated.append(cfg)
+            logger.warning(f"{conflict_label(cfg)} пересоздан с новыми параметрами")
+
+        async def operation(channel: AbstractChannel) -> DeclareOperation | None:
+            if changed:
+                await recreate(channel)
+                return None
+            try:
+                await _declare_entity(channel, cfg)
+            except ChannelPreconditionFailed as e:
+                if not self._recreate:
+                    logger.warning(f"Конфликт параметров {conflict_label(cfg)}: {e}")
+                    report.conflicts.append(cfg)
+                    return None
+                # Брокер закрыл канал - пул заменит его, пересоздаём на новом
+                return recreate
+            return None
+        return operation
+
+    @staticmethod
+    def _bind_op(binding: BindingConfig) -> DeclareOperation:
+        async def operation(channel: AbstractChannel) -> None:
+            # Сущности уже объявлены в предыдущих фазах, пассивная проверка не нужна
+            if binding.destination_type == RMQDestinationType.QUEUE:
+                destination = await channel.get_queue(binding.destination, ensure=False)
+            else:
+                destination = await channel.get_exchange(binding.destination, ensure=False)
+            await destination.bind(
+                exchange=binding.source,
+                routing_key=binding.routing_key,
+                arguments=binding.arguments
+            )
+        return operation
+
+    @staticmethod
+    def _unbind_op(binding: BindingConfig) -> DeclareOperation:
+        async def operation(channel: AbstractChannel) -> None:
+            if binding.destination_type == RMQDestinationType.QUEUE:
+                destination = await channel.get_queue(binding.destination, ensure=False)
+            else:
+                destination = await channel.get_exchange(binding.destination, ensure=False)
+            await destination.unbind(
+                exchange=binding.source,
+                routing_key=binding.routing_key,
+                arguments=binding.arguments
+            )
+        return operation
+
+
+async def _declare_entity(channel: AbstractChannel, cfg: DeclarableConfig) -> None:
+    if isinstance(cfg, QueueConfig):
+        await channel.declare_queue(
+            name=cfg.name,
+            durable=cfg.durable,
+            auto_delete=cfg.auto_delete,
+            arguments=cfg.arguments
+        )
+    else:
+        await channel.declare_exchange(
+            name=cfg.name,
+            type=cfg.type,
+            durable=cfg.durable,
+            auto_delete=cfg.auto_delete,
+            internal=cfg.internal,
+            arguments=cfg.arguments
+        )
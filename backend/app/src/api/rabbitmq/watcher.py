@@ -0,0 +1,100 @@
+import asyncio
+import hashlib
+import os
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from app.src.core.logging import logger
+
+ChangeHandler = Callable[[bytes], Awaitable[None]]
+
+
+class ConfigWatcher:
+    """
+    Следит за файлом конфигурации и вызывает on_change с новым содержимым.
+
+    Файл опрашивается через stat() (mtime и размер) - без зависимостей и
+    почти без ввода-вывода. При изменении ждём, пока файл не перестанет
+    меняться debounce секунд: редактор или деплой может записать его в
+    несколько приёмов. Содержимое с тем же sha256, что и в прошлый раз
+    (touch, повторное сохранение), не передаётся. Если on_change завершился
+    ошибкой, та же версия передаётся снова на следующем опросе.
+    """
+
+    def __init__(self, path: str | Path, on_change: ChangeHandler, interval: float = 1.0, debounce: float = 0.5):
+        self.path = Path(path)
+        self._on_change = on_change
+        self._interval = interval
+        self._debounce = debounce
+        self._task: asyncio.Task | None = None
+        self._stat: tuple[int, int] | None = None
+        self._digest: str | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Запоминает текущее состояние файла - уже применённая версия повторно не передаётся."""
+        if self.is_running:
+            return
+        self._stat = self._read_stat()
+        raw = self._read()
+        self._digest = hashlib.sha256(raw).hexdigest() if raw is not None else None
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Отслеживание изменений {self.path} запущено (интервал {self._interval} с)")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    # ==== Приватные методы / помощники ====
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            stat = self._read_stat()
+            if stat == self._stat or stat is None:
+                continue
+            # Дебаунс: ждём, пока файл перестанет меняться
+            while True:
+                await asyncio.sleep(self._debounce)
+                settled = self._read_stat()
+                if settled == stat:
+                    break
+                stat = settled
+            self._stat = stat
+
+            raw = self._read()
+            if raw is None:
+                continue
+            digest = hashlib.sha256(raw).hexdigest()
+            if digest == self._digest:
+                continue
+            try:
+                await self._on_change(raw)
+            except Exception as e:
+                # Версия не считается обработанной: повтор через interval, даже если файл больше не изменится
+                self._stat = None
+                logger.error(f"Ошибка применения изменённого конфига {self.path}: {e}. Повтор через {self._interval} с")
+                continue
+            self._digest = digest
+
+    def _read_stat(self) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read(self) -> bytes | None:
+        try:
+            return self.path.read_bytes()
+        except OSError as e:
+            logger.warning(f"Не удалось прочитать конфиг {self.path}: {e}")
+            return None
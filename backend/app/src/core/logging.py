@@ -1,5 +1,11 @@
+import asyncio
+import json
 import os
+import queue
 import sys
+import threading
+import time
+from typing import TextIO
 
 from app.configs.settings import settings
 from loguru import logger as loguru_logger
@@ -7,16 +13,158 @@ from loguru import logger as loguru_logger
 LOG_PATH = os.path.join(
     settings.LOG_PATH, f"log_{settings.FILES_PROJECT_NAME.lower()}.log"
 )
+LOG_FORMAT = "{time} {level} {name}:{line} {message}"
 
 loguru_logger.remove()
 logger = loguru_logger.bind(name="general_logger")
 
-logger.add(
-    sink=LOG_PATH,
-    format="{time} {level} {message}",
-    level="DEBUG",  # settings.LOG_LEVEL,
-    rotation="50 MB",
-)  # retention="5 days")  #, compression="zip")  # , rotation="500 KB)"
-logger.add(sys.stderr, level=settings.LOG_LEVEL)
 
-logger.debug(f"Service {settings.FILES_PROJECT_NAME} start logging to {LOG_PATH}")
+class BackgroundSink:
+    """
+    Приёмник loguru с записью в отдельном потоке.
+
+    write() только кладёт готовую строку в queue.SimpleQueue - без блокировок
+    и ввода-вывода в потоке event loop. Поток-писатель забирает всё, что
+    накопилось, пишет одной операцией и ротирует файл по размеру.
+    """
+
+    def __init__(self, path: str | None = None, stream: TextIO | None = None, rotation_bytes: int | None = None):
+        self.path = path
+        self._stream = stream
+        self._rotation_bytes = rotation_bytes
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, message: str) -> None:
+        self._queue.put(message)
+
+    def stop(self) -> None:
+        """Вызывается loguru при удалении приёмника: дописывает очередь и закрывает файл."""
+        self._queue.put(None)
+        self._thread.join()
+
+    async def complete(self) -> None:
+        """Дожидается записи всего, что было в очереди на момент вызова (logger.complete())."""
+        written = threading.Event()
+        self._queue.put(written)
+        await asyncio.to_thread(written.wait)
+
+    # ==== Поток-писатель ====
+    def _run(self) -> None:
+        stream = self._open()
+        stopped = False
+        while not stopped:
+            batch: list[str] = []
+            markers: list[threading.Event] = []
+            item = self._queue.get()
+            while True:
+                if item is None:
+                    stopped = True
+                    break
+                if isinstance(item, threading.Event):
+                    markers.append(item)
+                else:
+                    batch.append(item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                if batch:
+                    stream.write("".join(batch))
+                    stream.flush()
+                    if self._rotation_bytes and stream.tell() >= self._rotation_bytes:
+                        stream = self._rotate(stream)
+            except Exception as e:
+                sys.__stderr__.write(f"Ошибка записи лога: {e}\n")
+            for marker in markers:
+                marker.set()
+        if self.path:
+            stream.close()
+
+    def _open(self) -> TextIO:
+        if not self.path:
+            return self._stream
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        return open(self.path, "a", encoding="utf-8")
+
+    def _rotate(self, stream: TextIO) -> TextIO:
+        # Как у loguru: старый файл получает метку времени в имени
+        stream.close()
+        root, ext = os.path.splitext(self.path)
+        os.replace(self.path, f"{root}.{time.strftime('%Y-%m-%d_%H-%M-%S')}_{time.time_ns() % 1_000_000:06d}{ext}")
+        return self._open()
+
+
+def module_filter(level: str, module_levels: dict[str, str]) -> dict[str, str]:
+    """
+    Фильтр loguru по модулям: уровень берётся по самому длинному совпавшему
+    префиксу имени модуля (например, "app.src.api.rabbitmq.publisher"), иначе level.
+    """
+    return {"": level, **module_levels}
+
+
+def json_format(record: dict) -> str:
+    """Компактная JSON-строка: время, уровень, модуль, сообщение и поля из extra (аргументы-ключевые слова)."""
+    data = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "module": record["name"],
+        "line": record["line"],
+        "message": record["message"],
+        **{key: value for key, value in record["extra"].items() if key not in ("name", "json")},
+    }
+    if record["exception"]:
+        data["exception"] = repr(record["exception"].value)
+    record["extra"]["json"] = json.dumps(data, ensure_ascii=False, default=str)
+    return "{extra[json]}\n"
+
+
+def min_level(*levels: str) -> int:
+    return min(loguru_logger.level(level.upper()).no for level in levels)
+
+
+def configure_logging(
+    log_path: str | None = LOG_PATH,
+    level: str = settings.LOG_LEVEL,
+    file_level: str = settings.LOG_FILE_LEVEL,
+    module_levels: dict[str, str] | None = None,
+    serialize: bool = settings.LOG_JSON,
+    enqueue: bool = settings.LOG_ENQUEUE
+) -> None:
+    """
+    Настраивает приёмники логов: файл с ротацией и stderr.
+
+    С enqueue запись в приёмники выполняет отдельный поток (BackgroundSink), а вызов
+    логгера только кладёт строку в очередь - ввод-вывод не блокирует event loop.
+    Уровень вызова ниже минимального уровня всех приёмников отсекается до
+    форматирования, поэтому в горячих местах сообщения передаются шаблоном
+    с аргументами, а не f-строкой. С serialize каждая запись пишется одной
+    строкой JSON, аргументы-ключевые слова становятся её полями.
+    """
+    loguru_logger.remove()
+    module_levels = {name: value.upper() for name, value in (module_levels or settings.LOG_MODULE_LEVELS).items()}
+
+    rotation_bytes = settings.LOG_ROTATION_MB * 1024 * 1024
+    if log_path:
+        loguru_logger.add(
+            sink=BackgroundSink(path=log_path, rotation_bytes=rotation_bytes) if enqueue else log_path,
+            format=json_format if serialize else LOG_FORMAT,
+            level=min_level(file_level, *module_levels.values()),
+            filter=module_filter(file_level.upper(), module_levels),
+            **({} if enqueue else {"rotation": rotation_bytes}),
+        )
+    stderr_options = {"format": json_format} if serialize else {}
+    loguru_logger.add(
+        BackgroundSink(stream=sys.stderr) if enqueue else sys.stderr,
+        level=min_level(level, *module_levels.values()),
+        filter=module_filter(level.upper(), module_levels),
+        colorize=sys.stderr.isatty() and not serialize,
+        **stderr_options,
+    )
+
+
+configure_logging()
+
+logger.debug("Service {} start logging to {}", settings.FILES_PROJECT_NAME, LOG_PATH)
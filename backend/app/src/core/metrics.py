@@ -0,0 +1,274 @@
+import functools
+import time
+from bisect import bisect_left
+from typing import Any, Awaitable, Callable, Iterable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.src.core.logging import logger
+
+LabelValues = tuple[str, ...]
+Sample = tuple[str, dict[str, str], float]
+Collector = Callable[[], Awaitable[Iterable[Sample]]]
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# ==== Примитивы метрик в формате Prometheus ====
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._children: dict[LabelValues, Any] = {}
+
+    def labels(self, **labels: Any):
+        """Возвращает дочернюю метрику. Её стоит сохранить заранее - тогда на горячем пути нет поиска по словарю."""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _default(self):
+        return self.labels() if not self.labelnames else None
+
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+    def _labels_dict(self, key: LabelValues) -> dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def samples(self) -> Iterable[Sample]:
+        for key, child in self._children.items():
+            yield f"{self.name}_total", self._labels_dict(key), child.value
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+    def samples(self) -> Iterable[Sample]:
+        for key, child in self._children.items():
+            yield self.name, self._labels_dict(key), child.value
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def samples(self) -> Iterable[Sample]:
+        for key, child in self._children.items():
+            labels = self._labels_dict(key)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), child.counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", labels, child.sum
+            yield f"{self.name}_count", labels, child.count
+
+
+class MetricsRegistry:
+    """Реестр метрик процесса и сборщиков, вычисляемых в момент запроса /metrics."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[tuple[str, str, str, Collector]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, name: str, documentation: str, type_name: str, collector: Collector) -> None:
+        """Регистрирует асинхронный сборщик семейства метрик (например, снимок пула каналов)."""
+        self.remove_collector(name)
+        self._collectors.append((name, documentation, type_name, collector))
+
+    def remove_collector(self, name: str) -> None:
+        self._collectors = [entry for entry in self._collectors if entry[0] != name]
+
+    async def render(self) -> str:
+        """Текстовый формат экспозиции Prometheus 0.0.4."""
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            _render_family(lines, metric.name, metric.documentation, metric.type_name, metric.samples())
+        for name, documentation, type_name, collector in self._collectors:
+            try:
+                samples = list(await collector())
+            except Exception as e:
+                logger.warning(f"Сборщик метрик {name} завершился с ошибкой: {e}")
+                continue
+            _render_family(lines, name, documentation, type_name, samples)
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: _Metric):
+        if metric.name in self._metrics:
+            return self._metrics[metric.name]
+        self._metrics[metric.name] = metric
+        return metric
+
+
+def _render_family(lines: list[str], name: str, documentation: str, type_name: str, samples: Iterable[Sample]) -> None:
+    lines.append(f"# HELP {name} {documentation}")
+    lines.append(f"# TYPE {name} {type_name}")
+    for sample_name, labels, value in samples:
+        if labels:
+            label_str = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            lines.append(f"{sample_name}{{{label_str}}} {_format_value(value)}")
+        else:
+            lines.append(f"{sample_name} {_format_value(value)}")
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+REGISTRY = MetricsRegistry()
+
+
+# ==== Инструментирование ====
+def timed(histogram: Histogram, **labels: Any):
+    """Декоратор асинхронной функции: записывает время выполнения в гистограмму."""
+    child = histogram.labels(**labels)
+
+    def decorator(func: Callable[..., Awaitable[Any]]):
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - started)
+        return wrapper
+
+    return decorator
+
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "Длительность обработки HTTP-запросов",
+    ("method", "route", "status"),
+)
+
+
+class MetricsMiddleware:
+    """
+    ASGI-middleware с замером длительности HTTP-запросов.
+    В метку route попадает шаблон пути, а не сам путь - число рядов не растёт от параметров.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=status_code
+            ).observe(time.perf_counter() - started)
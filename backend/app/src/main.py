@@ -1,12 +1,22 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.configs.settings import get_settings
+from app.src.api.auth.service import token_verifier
+from app.src.api.health_check.monitor import HealthMonitor
+from app.src.api.health_check.routers import health_check_router
+from app.src.api.metrics.routers import metrics_router
 from app.src.api.rabbitmq.client import RabbitMQClient
+from app.src.api.rabbitmq.deps import get_rabbitmq_settings
+from app.src.api.rabbitmq.leader import create_leader_election
+from app.src.api.rabbitmq.management import RabbitMQManagementClient
+from app.src.api.rabbitmq.metrics import register_rabbitmq_collectors
 from app.src.api.rabbitmq.routers import rabbitmq_router
 from app.src.core.logging import logger
+from app.src.core.metrics import MetricsMiddleware
 
 config = get_settings()
 
@@ -14,21 +24,47 @@ config = get_settings()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
 
-    rabbitmq_client = RabbitMQClient()
-    try:
-        await rabbitmq_client.connect()
-        await rabbitmq_client.setup_infrastructure()
-    except Exception as e:
-        logger.error(f"Не удалось подключиться к RabbitMQ: {e}")
-        raise  # Останавливаем запуск при неудачном подключении
+    rabbitmq_settings = get_rabbitmq_settings()
+    app.state.rabbitmq_management_client = RabbitMQManagementClient(
+        base_url=rabbitmq_settings["base_url"],
+        auth=rabbitmq_settings["auth"],
+        cache_ttl=config.RMQ_MANAGEMENT_CACHE_TTL,
+        timeout=config.RMQ_MANAGEMENT_TIMEOUT
+    )
 
-    # Сохраняем клиент в app.state
+    # Сохраняем клиент в app.state. При нескольких воркерах топологию настраивает только ведущий
+    rabbitmq_client = RabbitMQClient(leader_election=create_leader_election())
     app.state.rabbitmq_client = rabbitmq_client
-    logger.info("Клиент RabbitMQ успешно инициализирован")
+    register_rabbitmq_collectors(rabbitmq_client, app.state.rabbitmq_management_client)
+    # Пробы /health/* читают состояние, которое монитор обновляет в фоне
+    app.state.health_monitor = HealthMonitor(rabbitmq_client)
+    app.state.health_monitor.start()
+
+    startup_task: asyncio.Task | None = None
+    if config.RMQ_BACKGROUND_SETUP:
+        # HTTP начинает обслуживаться сразу, готовность отдаёт /health/ready; до успеха - повторы
+        startup_task = asyncio.create_task(rabbitmq_client.start_with_retry())
+        logger.info("Настройка инфраструктуры RabbitMQ запущена в фоне")
+    else:
+        try:
+            await rabbitmq_client.start()
+        except Exception as e:
+            logger.error(f"Не удалось подключиться к RabbitMQ: {e}")
+            raise  # Останавливаем запуск при неудачном подключении
+        logger.info("Клиент RabbitMQ успешно инициализирован")
 
     yield
 
-    rabbitmq_client.close()
+    if startup_task:
+        startup_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await startup_task
+    await app.state.health_monitor.stop()
+    await rabbitmq_client.close()
+    await app.state.rabbitmq_management_client.close()
+    await token_verifier.close()
+    # Дожидаемся записи логов из очереди приёмников
+    await logger.complete()
 
 
 if config.ENVIRONMENT_NAME in ("prod",):
@@ -62,5 +98,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(rabbitmq_router, prefix=config.FILES_API_PREFIX)
+app.include_router(metrics_router)
+app.include_router(health_check_router)
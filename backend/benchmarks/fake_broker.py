@@ -0,0 +1,640 @@
+"""
+Брокер RabbitMQ в памяти процесса.
+
+Реализует подмножество API aio_pika, которым пользуется RabbitMQClient:
+обменники (direct/topic/fanout/headers), очереди, привязки, публикацию с
+подтверждениями, потребление с prefetch, ack/nack, TTL и dead-lettering.
+Подключается через connection_factory/channel_factory клиента. Задержки
+rpc_latency/publish_latency имитируют сетевой round-trip до брокера.
+"""
+import asyncio
+import itertools
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Callable
+
+from aiormq.exceptions import ChannelLockedResource, ChannelPreconditionFailed
+from pamqp.commands import Basic
+
+REPLY_TO_QUEUE = "amq.rabbitmq.reply-to"
+
+
+class FakeChannelClosed(Exception):
+    """Аналог aio_pika.exceptions.ChannelClosed."""
+
+
+# ==== Состояние брокера ====
+@dataclass
+class _Binding:
+    destination: str
+    destination_type: str  # queue | exchange
+    routing_key: str
+    arguments: dict
+
+
+@dataclass
+class _ExchangeState:
+    name: str
+    type: str
+    durable: bool
+    arguments: dict
+    bindings: list[_Binding] = field(default_factory=list)
+
+
+@dataclass
+class _StoredMessage:
+    body: bytes
+    exchange: str
+    routing_key: str
+    properties: dict
+    redelivered: bool = False
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class _QueueState:
+    name: str
+    durable: bool
+    arguments: dict
+    messages: deque = field(default_factory=deque)
+    consumers: list = field(default_factory=list)
+    owner: Any = None  # соединение-владелец exclusive-очереди
+
+
+def topic_matches(pattern: str, routing_key: str) -> bool:
+    """Сопоставление topic-ключа: '*' - ровно одно слово, '#' - ноль или больше слов."""
+    p_words = pattern.split(".") if pattern else []
+    k_words = routing_key.split(".") if routing_key else []
+
+    def match(pi: int, ki: int) -> bool:
+        if pi == len(p_words):
+            return ki == len(k_words)
+        word = p_words[pi]
+        if word == "#":
+            return any(match(pi + 1, k) for k in range(ki, len(k_words) + 1))
+        if ki == len(k_words):
+            return False
+        return (word == "*" or word == k_words[ki]) and match(pi + 1, ki + 1)
+
+    return match(0, 0)
+
+
+class FakeBroker:
+    """Общее состояние «брокера»: обменники, очереди, привязки и сообщения."""
+
+    def __init__(self, rpc_latency: float = 0.0, publish_latency: float = 0.0):
+        self.rpc_latency = rpc_latency
+        self.publish_latency = publish_latency
+        self.exchanges: dict[str, _ExchangeState] = {}
+        self.queues: dict[str, _QueueState] = {}
+        self.connections: list["FakeConnection"] = []
+        self.rpc_count = 0
+        self.published_count = 0
+        self.blocked = False
+
+    # ==== Фабрики, совместимые с AMQPConnectionFactory / AMQPChannelFactory ====
+    async def connection_factory(self, *args, **kwargs) -> "FakeConnection":
+        connection = FakeConnection(self)
+        self.connections.append(connection)
+        return connection
+
+    async def channel_factory(self, connection: "FakeConnection") -> "FakeChannel":
+        return await connection.channel()
+
+    def set_blocked(self, blocked: bool) -> None:
+        """connection.blocked / connection.unblocked всем соединениям (memory или disk alarm брокера)."""
+        self.blocked = blocked
+        for connection in self.connections:
+            connection._set_blocked(blocked)
+
+    def drop_bindings(self, destination: str, destination_type: str) -> None:
+        """Удаление очереди или обменника снимает все привязки к нему, как в RabbitMQ."""
+        for state in self.exchanges.values():
+            state.bindings = [
+                b for b in state.bindings
+                if not (b.destination == destination and b.destination_type == destination_type)
+            ]
+
+    # ==== Маршрутизация ====
+    def route(self, exchange: str, routing_key: str, headers: dict | None = None, _seen: set | None = None) -> list[str]:
+        if exchange == "":
+            return [routing_key] if routing_key in self.queues else []
+        state = self.exchanges.get(exchange)
+        if state is None:
+            raise FakeChannelClosed(f"NOT_FOUND - no exchange '{exchange}'")
+        _seen = _seen or set()
+        if exchange in _seen:
+            return []
+        _seen.add(exchange)
+
+        targets: list[str] = []
+        for binding in state.bindings:
+            if not self._binding_matches(state, binding, routing_key, headers or {}):
+                continue
+            if binding.destination_type == "queue":
+                targets.append(binding.destination)
+            else:
+                targets.extend(self.route(binding.destination, routing_key, headers, _seen))
+        return list(dict.fromkeys(targets))
+
+    @staticmethod
+    def _binding_matches(state: _ExchangeState, binding: _Binding, routing_key: str, headers: dict) -> bool:
+        if state.type == "fanout":
+            return True
+        if state.type == "topic":
+            return topic_matches(binding.routing_key, routing_key)
+        if state.type == "headers":
+            args = {k: v for k, v in binding.arguments.items() if not k.startswith("x-")}
+            if binding.arguments.get("x-match", "all") == "any":
+                return any(headers.get(k) == v for k, v in args.items())
+            return all(headers.get(k) == v for k, v in args.items())
+        return binding.routing_key == routing_key
+
+    def enqueue(self, queue_name: str, message: _StoredMessage) -> None:
+        queue = self.queues[queue_name]
+        queue.messages.append(message)
+        ttl = queue.arguments.get("x-message-ttl")
+        expiration = message.properties.get("expiration")
+        if expiration is not None:
+            ttl = int(expiration) if ttl is None else min(ttl, int(expiration))
+        if ttl is not None:
+            asyncio.get_running_loop().call_later(ttl / 1000, self._expire, queue_name, message)
+        self.dispatch(queue_name)
+
+    def _expire(self, queue_name: str, message: _StoredMessage) -> None:
+        queue = self.queues.get(queue_name)
+        if queue is None or message not in queue.messages:
+            return
+        queue.messages.remove(message)
+        self.dead_letter(queue_name, message, reason="expired")
+
+    def dead_letter(self, queue_name: str, message: _StoredMessage, reason: str) -> None:
+        queue = self.queues.get(queue_name)
+        if queue is None:
+            return
+        dlx = queue.arguments.get("x-dead-letter-exchange")
+        if dlx is None:
+            return
+        routing_key = queue.arguments.get("x-dead-letter-routing-key", message.routing_key)
+        headers = dict(message.properties.get("headers") or {})
+        deaths = list(headers.get("x-death") or [])
+        for death in deaths:
+            if death.get("queue") == queue_name and death.get("reason") == reason:
+                death["count"] = death.get("count", 1) + 1
+                break
+        else:
+            deaths.insert(0, {
+                "queue": queue_name,
+                "reason": reason,
+                "exchange": message.exchange,
+                "routing-keys": [message.routing_key],
+                "count": 1,
+            })
+        headers["x-death"] = deaths
+        properties = dict(message.properties, headers=headers)
+        properties.pop("expiration", None)
+        dead = _StoredMessage(body=message.body, exchange=dlx, routing_key=routing_key, properties=properties)
+        for target in self.route(dlx, routing_key, headers):
+            self.enqueue(target, dead)
+
+    def dispatch(self, queue_name: str) -> None:
+        queue = self.queues.get(queue_name)
+        if queue is None:
+            return
+        while queue.messages and queue.consumers:
+            ready = [c for c in queue.consumers if c.has_capacity()]
+            if not ready:
+                return
+            consumer = min(ready, key=lambda c: c.deliveries)
+            consumer.deliver(queue.messages.popleft())
+
+
+# ==== Клиентская часть (aio_pika-совместимая) ====
+class CallbackCollection(list):
+    """Подмножество aio_pika.tools.CallbackCollection."""
+
+    def add(self, callback: Callable, weak: bool = False) -> None:
+        self.append(callback)
+
+    def discard(self, callback: Callable) -> None:
+        if callback in self:
+            self.remove(callback)
+
+
+class FakeIncomingMessage:
+    """Аналог aio_pika.IncomingMessage."""
+
+    def __init__(self, channel: "FakeChannel", queue_name: str, delivery_tag: int, stored: _StoredMessage):
+        self.channel = channel
+        self.queue_name = queue_name
+        self.delivery_tag = delivery_tag
+        self.stored = stored
+        self.body = stored.body
+        self.exchange = stored.exchange
+        self.routing_key = stored.routing_key
+        self.redelivered = stored.redelivered
+        props = stored.properties
+        self.headers = props.get("headers") or {}
+        self.message_id = props.get("message_id")
+        self.correlation_id = props.get("correlation_id")
+        self.reply_to = props.get("reply_to")
+        self.content_type = props.get("content_type")
+        self.content_encoding = props.get("content_encoding")
+        self.delivery_mode = props.get("delivery_mode")
+        self.expiration = props.get("expiration")
+        self.type = props.get("type")
+        self.timestamp = props.get("timestamp")
+        self.processed = False
+
+    async def ack(self, multiple: bool = False) -> None:
+        self.channel._settle(self.delivery_tag, multiple, ack=True, requeue=False)
+        self.processed = True
+
+    async def nack(self, multiple: bool = False, requeue: bool = True) -> None:
+        self.channel._settle(self.delivery_tag, multiple, ack=False, requeue=requeue)
+        self.processed = True
+
+    async def reject(self, requeue: bool = False) -> None:
+        await self.nack(requeue=requeue)
+
+
+class _Consumer:
+    def __init__(self, channel: "FakeChannel", queue_name: str, callback, no_ack: bool, tag: str):
+        self.channel = channel
+        self.queue_name = queue_name
+        self.callback = callback
+        self.no_ack = no_ack
+        self.tag = tag
+        self.deliveries = 0
+
+    def has_capacity(self) -> bool:
+        if self.no_ack or not self.channel.prefetch_count:
+            return True
+        return len(self.channel.unacked) < self.channel.prefetch_count
+
+    def deliver(self, stored: _StoredMessage) -> None:
+        self.deliveries += 1
+        message = self.channel._new_delivery(self.queue_name, stored, self.no_ack)
+        self.channel._tasks.add(asyncio.get_running_loop().create_task(self.callback(message)))
+
+
+class FakeQueue:
+    """Аналог aio_pika.Queue."""
+
+    def __init__(self, channel: "FakeChannel", name: str):
+        self.channel = channel
+        self.name = name
+        state = channel.broker.queues.get(name)
+        self.declaration_result = type("DeclareOk", (), {
+            "message_count": len(state.messages) if state else 0,
+            "consumer_count": len(state.consumers) if state else 0,
+        })()
+
+    async def bind(self, exchange, routing_key: str = "", *, arguments: dict | None = None, timeout=None):
+        await self.channel._rpc()
+        self.channel.broker.exchanges[_name(exchange)].bindings.append(
+            _Binding(self.name, "queue", routing_key, arguments or {})
+        )
+
+    async def unbind(self, exchange, routing_key: str = "", arguments: dict | None = None, timeout=None):
+        await self.channel._rpc()
+        state = self.channel.broker.exchanges[_name(exchange)]
+        state.bindings = [
+            b for b in state.bindings
+            if not (b.destination == self.name and b.destination_type == "queue" and b.routing_key == routing_key)
+        ]
+
+    async def consume(self, callback, no_ack: bool = False, exclusive: bool = False, arguments=None,
+                      consumer_tag: str | None = None, timeout=None) -> str:
+        await self.channel._rpc()
+        tag = consumer_tag or f"ctag-{uuid.uuid4().hex[:12]}"
+        consumer = _Consumer(self.channel, self.name, callback, no_ack, tag)
+        if self.name == REPLY_TO_QUEUE:
+            # Псевдо-очередь direct reply-to: ответы доставляются напрямую в канал
+            self.channel.consumers[tag] = consumer
+            return tag
+        if self.name not in self.channel.broker.queues:
+            self.channel._fail(f"NOT_FOUND - no queue '{self.name}'")
+        self.channel.consumers[tag] = consumer
+        self.channel.broker.queues[self.name].consumers.append(consumer)
+        self.channel.broker.dispatch(self.name)
+        return tag
+
+    async def cancel(self, consumer_tag: str, timeout=None, nowait: bool = False):
+        await self.channel._rpc()
+        self.channel._remove_consumer(consumer_tag)
+
+    async def get(self, *, no_ack: bool = False, fail: bool = True, timeout=5):
+        await self.channel._rpc()
+        state = self.channel.broker.queues[self.name]
+        if not state.messages:
+            if fail:
+                raise FakeQueueEmpty()
+            return None
+        return self.channel._new_delivery(self.name, state.messages.popleft(), no_ack)
+
+    async def purge(self, no_wait: bool = False, timeout=None):
+        await self.channel._rpc()
+        self.channel.broker.queues[self.name].messages.clear()
+
+    async def delete(self, if_unused: bool = False, if_empty: bool = False, timeout=None):
+        await self.channel.queue_delete(self.name)
+
+
+class FakeQueueEmpty(Exception):
+    """Аналог aio_pika.exceptions.QueueEmpty."""
+
+
+class FakeExchange:
+    """Аналог aio_pika.Exchange. publish возвращает Basic.Ack или, при basic.return, само сообщение."""
+
+    def __init__(self, channel: "FakeChannel", name: str):
+        self.channel = channel
+        self.name = name
+
+    async def publish(self, message, routing_key: str, *, mandatory: bool = True, immediate: bool = False, timeout=None):
+        return await self.channel._publish(self.name, routing_key, message, mandatory)
+
+    async def bind(self, exchange, routing_key: str = "", *, arguments: dict | None = None, timeout=None):
+        await self.channel._rpc()
+        self.channel.broker.exchanges[_name(exchange)].bindings.append(
+            _Binding(self.name, "exchange", routing_key, arguments or {})
+        )
+
+    async def unbind(self, exchange, routing_key: str = "", arguments: dict | None = None, timeout=None):
+        await self.channel._rpc()
+        state = self.channel.broker.exchanges[_name(exchange)]
+        state.bindings = [
+            b for b in state.bindings
+            if not (b.destination == self.name and b.destination_type == "exchange" and b.routing_key == routing_key)
+        ]
+
+
+def _name(entity) -> str:
+    return entity if isinstance(entity, str) else entity.name
+
+
+class FakeChannel:
+    """
+    Аналог aio_pika.Channel. Синхронные методы сериализуются блокировкой, как в aiormq.
+    Ошибки уровня канала (NOT_FOUND, PRECONDITION_FAILED) закрывают канал.
+    """
+
+    _numbers = itertools.count(1)
+
+    def __init__(self, connection: "FakeConnection"):
+        self.connection = connection
+        self.broker = connection.broker
+        self.number = next(self._numbers)
+        self.is_closed = False
+        self.prefetch_count = 0
+        self.consumers: dict[str, _Consumer] = {}
+        self.unacked: dict[int, FakeIncomingMessage] = {}
+        self.close_callbacks = CallbackCollection()
+        self.return_callbacks = CallbackCollection()
+        self._delivery_tags = itertools.count(1)
+        self._lock = asyncio.Lock()
+        self._tasks: set[asyncio.Task] = set()
+        self.default_exchange = FakeExchange(self, "")
+
+    async def _rpc(self) -> None:
+        if self.is_closed:
+            raise FakeChannelClosed("channel is closed")
+        async with self._lock:
+            self.broker.rpc_count += 1
+            if self.broker.rpc_latency:
+                await asyncio.sleep(self.broker.rpc_latency)
+        # Ответ брокера - входящий кадр, как его учитывает aiormq
+        self.connection.transport.connection._Connection__last_frame_time = asyncio.get_running_loop().time()
+
+    def _fail(self, error: str, exc_type: type[Exception] = FakeChannelClosed) -> None:
+        self._close_now()
+        raise exc_type(error)
+
+    async def declare_exchange(self, name: str, type="direct", *, durable: bool = False, auto_delete: bool = False,
+                               internal: bool = False, passive: bool = False, arguments: dict | None = None,
+                               timeout=None) -> FakeExchange:
+        await self._rpc()
+        type = getattr(type, "value", type)
+        existing = self.broker.exchanges.get(name)
+        if passive:
+            if existing is None:
+                self._fail(f"NOT_FOUND - no exchange '{name}'")
+        elif existing is None:
+            self.broker.exchanges[name] = _ExchangeState(name, type, durable, arguments or {})
+        elif existing.type != type or (existing.arguments or {}) != (arguments or {}):
+            self._fail(f"PRECONDITION_FAILED - inequivalent arguments for exchange '{name}'", ChannelPreconditionFailed)
+        return FakeExchange(self, name)
+
+    async def get_exchange(self, name: str, *, ensure: bool = True) -> FakeExchange:
+        if ensure:
+            return await self.declare_exchange(name, passive=True)
+        return FakeExchange(self, name)
+
+    async def declare_queue(self, name: str | None = None, *, durable: bool = False, exclusive: bool = False,
+                            passive: bool = False, auto_delete: bool = False, arguments: dict | None = None,
+                            timeout=None) -> FakeQueue:
+        await self._rpc()
+        name = name or f"amq.gen-{uuid.uuid4().hex[:16]}"
+        existing = self.broker.queues.get(name)
+        if existing is not None and existing.owner not in (None, self.connection):
+            self._close_now()
+            raise ChannelLockedResource(f"RESOURCE_LOCKED - cannot obtain exclusive access to queue '{name}'")
+        if passive:
+            if existing is None:
+                self._fail(f"NOT_FOUND - no queue '{name}'")
+        elif existing is None:
+            owner = self.connection if exclusive else None
+            self.broker.queues[name] = _QueueState(name, durable, arguments or {}, owner=owner)
+        elif (existing.arguments or {}) != (arguments or {}):
+            self._fail(f"PRECONDITION_FAILED - inequivalent arguments for queue '{name}'", ChannelPreconditionFailed)
+        return FakeQueue(self, name)
+
+    async def get_queue(self, name: str, *, ensure: bool = True) -> FakeQueue:
+        if ensure:
+            return await self.declare_queue(name, passive=True)
+        return FakeQueue(self, name)
+
+    async def queue_delete(self, queue_name: str, timeout=None, if_unused: bool = False, if_empty: bool = False,
+                           nowait: bool = False) -> None:
+        await self._rpc()
+        self.broker.queues.pop(queue_name, None)
+        self.broker.drop_bindings(queue_name, "queue")
+
+    async def exchange_delete(self, exchange_name: str, timeout=None, if_unused: bool = False,
+                              nowait: bool = False) -> None:
+        await self._rpc()
+        self.broker.exchanges.pop(exchange_name, None)
+        self.broker.drop_bindings(exchange_name, "exchange")
+
+    async def set_qos(self, prefetch_count: int = 0, prefetch_size: int = 0, global_: bool = False, timeout=None):
+        await self._rpc()
+        self.prefetch_count = prefetch_count
+
+    async def close(self, exc=None) -> None:
+        self._close_now()
+
+    def _close_now(self) -> None:
+        if self.is_closed:
+            return
+        self.is_closed = True
+        for tag in list(self.consumers):
+            self._remove_consumer(tag)
+        # Неподтверждённые сообщения возвращаются в очередь
+        for message in sorted(self.unacked.values(), key=lambda m: m.delivery_tag, reverse=True):
+            message.stored.redelivered = True
+            queue = self.broker.queues.get(message.queue_name)
+            if queue is not None:
+                queue.messages.appendleft(message.stored)
+        queues = {m.queue_name for m in self.unacked.values()}
+        self.unacked.clear()
+        for queue_name in queues:
+            self.broker.dispatch(queue_name)
+        for callback in self.close_callbacks:
+            callback(self, None)
+
+    def _remove_consumer(self, tag: str) -> None:
+        consumer = self.consumers.pop(tag, None)
+        if consumer is None:
+            return
+        queue = self.broker.queues.get(consumer.queue_name)
+        if queue is not None and consumer in queue.consumers:
+            queue.consumers.remove(consumer)
+
+    async def _publish(self, exchange: str, routing_key: str, message, mandatory: bool = False) -> Any:
+        if self.is_closed:
+            raise FakeChannelClosed("channel is closed")
+        await self.connection._unblocked.wait()
+        if self.broker.publish_latency:
+            await asyncio.sleep(self.broker.publish_latency)
+        else:
+            await asyncio.sleep(0)
+        try:
+            targets = self.broker.route(exchange, routing_key, message.headers)
+        except FakeChannelClosed as e:
+            self._fail(str(e))
+        properties = {
+            "headers": dict(message.headers or {}),
+            "message_id": message.message_id,
+            "correlation_id": message.correlation_id,
+            "reply_to": message.reply_to,
+            "content_type": message.content_type,
+            "content_encoding": message.content_encoding,
+            "delivery_mode": message.delivery_mode,
+            "expiration": _expiration_ms(message.expiration),
+            "type": message.type,
+            "timestamp": message.timestamp,
+        }
+        self.broker.published_count += 1
+        if exchange == "" and routing_key.startswith(f"{REPLY_TO_QUEUE}."):
+            # Ответ можно отправить из любого соединения - ищем канал запроса по всему брокеру
+            for connection in self.broker.connections:
+                if connection._deliver_reply(routing_key, message.body, properties):
+                    break
+            return Basic.Ack()
+        if mandatory and not targets:
+            # basic.return: как в aio_pika с on_return_raises=False - сообщение уходит в return_callbacks канала
+            stored = _StoredMessage(message.body, exchange, routing_key, properties)
+            returned = FakeIncomingMessage(self, "", 0, stored)
+            for callback in list(self.return_callbacks):
+                callback(self, returned)
+            # Как aiormq: без message_id возврат не сопоставить с публикацией - приходит обычный ack
+            return returned if message.message_id else Basic.Ack()
+        if message.reply_to == REPLY_TO_QUEUE:
+            properties["reply_to"] = f"{REPLY_TO_QUEUE}.{self.number}"
+        for target in targets:
+            self.broker.enqueue(target, _StoredMessage(message.body, exchange, routing_key, dict(properties)))
+        return Basic.Ack()
+
+    def _new_delivery(self, queue_name: str, stored: _StoredMessage, no_ack: bool) -> FakeIncomingMessage:
+        message = FakeIncomingMessage(self, queue_name, next(self._delivery_tags), stored)
+        if not no_ack:
+            self.unacked[message.delivery_tag] = message
+        return message
+
+    def _settle(self, delivery_tag: int, multiple: bool, ack: bool, requeue: bool) -> None:
+        if self.is_closed:
+            raise FakeChannelClosed("channel is closed")
+        tags = [t for t in self.unacked if t <= delivery_tag] if multiple else [delivery_tag]
+        if delivery_tag not in self.unacked:
+            self._fail(f"PRECONDITION_FAILED - unknown delivery tag {delivery_tag}")
+        queues = set()
+        # Возврат в начало очереди с конца: сообщения сохраняют исходный порядок, как у RabbitMQ
+        for tag in reversed(tags):
+            message = self.unacked.pop(tag)
+            queues.add(message.queue_name)
+            if ack:
+                continue
+            if requeue:
+                message.stored.redelivered = True
+                self.broker.queues[message.queue_name].messages.appendleft(message.stored)
+            else:
+                self.broker.dead_letter(message.queue_name, message.stored, reason="rejected")
+        for queue_name in queues:
+            self.broker.dispatch(queue_name)
+
+
+def _expiration_ms(expiration) -> int | None:
+    if expiration is None:
+        return None
+    if hasattr(expiration, "total_seconds"):
+        return int(expiration.total_seconds() * 1000)
+    return int(float(expiration) * 1000) if isinstance(expiration, float) else int(expiration)
+
+
+class FakeConnection:
+    """Аналог aio_pika.RobustConnection."""
+
+    def __init__(self, broker: FakeBroker):
+        self.broker = broker
+        self.is_closed = False
+        self.channels: list[FakeChannel] = []
+        self.reconnect_callbacks = CallbackCollection()
+        self.close_callbacks = CallbackCollection()
+        # Как в aio_pika: transport.connection - соединение aiormq, которое приостанавливает запись,
+        # пока брокер держит соединение в состоянии blocked
+        unblocked = asyncio.Event()
+        self.transport = SimpleNamespace(connection=SimpleNamespace(
+            _Connection__connection_unblocked=unblocked,
+            _Connection__last_frame_time=asyncio.get_running_loop().time()
+        ))
+        self._set_blocked(broker.blocked)
+
+    @property
+    def _unblocked(self) -> asyncio.Event:
+        return self.transport.connection._Connection__connection_unblocked
+
+    def _set_blocked(self, blocked: bool) -> None:
+        if blocked:
+            self._unblocked.clear()
+        else:
+            self._unblocked.set()
+
+    async def channel(self, *args, **kwargs) -> FakeChannel:
+        if self.is_closed:
+            raise FakeChannelClosed("connection is closed")
+        channel = FakeChannel(self)
+        self.channels.append(channel)
+        return channel
+
+    async def close(self, exc=None) -> None:
+        self.is_closed = True
+        for channel in self.channels:
+            channel._close_now()
+        # Exclusive-очереди удаляются вместе с соединением-владельцем
+        for name in [name for name, queue in self.broker.queues.items() if queue.owner is self]:
+            del self.broker.queues[name]
+
+    def _deliver_reply(self, routing_key: str, body: bytes, properties: dict) -> bool:
+        number = int(routing_key.rsplit(".", 1)[-1])
+        for channel in self.channels:
+            if channel.number != number or channel.is_closed:
+                continue
+            for consumer in channel.consumers.values():
+                if consumer.queue_name == REPLY_TO_QUEUE:
+                    consumer.deliver(_StoredMessage(body, "", routing_key, properties))
+                    return True
+        return False
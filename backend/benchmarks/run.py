@@ -0,0 +1,540 @@
+"""
+Бенчмарки клиента RabbitMQ на брокере в памяти (benchmarks/fake_broker.py).
+
+Запуск из каталога backend:
+    python -m benchmarks.run                                  # все сценарии
+    python -m benchmarks.run --only publish consume           # выбранные сценарии
+    python -m benchmarks.run --save baseline.json             # сохранить результаты
+    python -m benchmarks.run --compare baseline.json          # код возврата 1 при регрессии
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Awaitable, Callable
+
+# Обязательные настройки приложения, чтобы бенчмарк запускался без .env
+for _name, _value in {
+    "FILES_PROJECT_NAME": "api-orchestrator-bench",
+    "FILES_VERSION": "bench",
+    "FILES_API_PREFIX": "/api",
+    "FILES_SERVICE_URL": "http://localhost",
+    "BACKEND_SECRET_KEY": "bench",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+    "DEBUG": "false",
+    "RMQ_CONFIG_CACHE_DIR": "",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+import httpx  # noqa: E402
+from aio_pika import Message  # noqa: E402
+
+from app.src.api.rabbitmq.client import RabbitMQClient  # noqa: E402
+from app.src.api.rabbitmq.codecs import (  # noqa: E402
+    CODECS,
+    COMPRESSIONS,
+    JSON_CONTENT_TYPE,
+    CodecError,
+    MessageCodec,
+    decode_body
+)
+from app.src.api.rabbitmq.loader import InfrastructureLoader  # noqa: E402
+from app.src.api.rabbitmq.management import RabbitMQManagementClient  # noqa: E402
+from app.src.api.rabbitmq.routing import RoutingIndex, event_keys  # noqa: E402
+from app.src.api.rabbitmq.schemas import ConfigReadyEvent, Event, RoutingRuleConfig, ServiceBindingConfig  # noqa: E402
+from app.src.core.logging import configure_logging, logger  # noqa: E402
+from benchmarks.fake_broker import FakeBroker  # noqa: E402
+
+DEFINITION_FILE = Path("app/configs/load_definition.json")
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    value: float
+    unit: str
+    higher_is_better: bool = False
+
+
+Scenario = Callable[[argparse.Namespace], Awaitable[list[BenchmarkResult]]]
+
+
+# ==== Помощники ====
+async def make_client(broker: FakeBroker) -> RabbitMQClient:
+    client = RabbitMQClient(connection_factory=broker.connection_factory, channel_factory=broker.channel_factory)
+    await client.connect()
+    return client
+
+
+def build_config(size: int) -> dict:
+    """Синтетический конфиг: size обменников, size очередей и size привязок между ними."""
+    return {
+        "exchanges": [{"name": f"bench.ex.{i}", "type": "topic", "durable": True} for i in range(size)],
+        "queues": [{"name": f"bench.q.{i}", "durable": True} for i in range(size)],
+        "bindings": [
+            {
+                "source": f"bench.ex.{i}",
+                "destination": f"bench.q.{i}",
+                "destination_type": "queue",
+                "routing_key": f"bench.{i}.#",
+            }
+            for i in range(size)
+        ],
+    }
+
+
+def build_routing_rules(size: int) -> list[RoutingRuleConfig]:
+    """Синтетические правила: 10 бакетов, префикс на арендатора, суффиксы по типу файла и разные события."""
+    suffixes = ("", ".jpg", ".png", ".pdf")
+    event_names = ([], ["s3:ObjectCreated:*"], ["s3:ObjectRemoved:Delete"])
+    return [
+        RoutingRuleConfig(
+            name=f"rule-{i}",
+            bucket=f"bucket-{i % 10}",
+            prefix=f"tenant-{i}/",
+            suffix=suffixes[i % len(suffixes)],
+            events=event_names[i % len(event_names)],
+            targets=[{"exchange": f"service.{i % 50}"}],
+        )
+        for i in range(size)
+    ]
+
+
+def minio_event(bucket: str, key: str, event_name: str = "s3:ObjectCreated:Put") -> bytes:
+    return json.dumps({
+        "EventName": event_name,
+        "Key": f"{bucket}/{key}",
+        "Records": [{"eventName": event_name, "s3": {"bucket": {"name": bucket}, "object": {"key": key}}}],
+    }).encode()
+
+
+def percentile(samples: list[float], p: int) -> float:
+    return statistics.quantiles(samples, n=100, method="inclusive")[p - 1]
+
+
+def median_ms(func: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def events(count: int) -> list[Event]:
+    return [Event(event_type="bench", payload={"i": i, "key": f"bucket/object-{i}"}) for i in range(count)]
+
+
+# ==== Сценарии ====
+async def bench_setup_infrastructure(args: argparse.Namespace) -> list[BenchmarkResult]:
+    """Время setup_infrastructure от размера конфига: холодное объявление и повтор без изменений."""
+    results: list[BenchmarkResult] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.config_sizes:
+            config_file = Path(tmp) / f"definition_{size}.json"
+            config_file.write_text(json.dumps(build_config(size)))
+
+            broker = FakeBroker(rpc_latency=args.rpc_latency)
+            client = await make_client(broker)
+            started = time.perf_counter()
+            await client.setup_infrastructure(config_file)
+            cold_ms = (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            await client.setup_infrastructure(config_file)
+            noop_ms = (time.perf_counter() - started) * 1000
+            await client.close()
+
+            raw = config_file.read_bytes()
+            compile_ms = median_ms(lambda: InfrastructureLoader.compile(raw), args.repeat)
+
+            # Кеш на диске без кеша в памяти процесса - как при рестарте реплики
+            loader = InfrastructureLoader(cache_dir=Path(tmp) / "cache")
+            loader.load_compiled(config_file)
+
+            def load_from_disk() -> None:
+                loader._memory.clear()
+                loader.load_compiled(config_file)
+
+            cached_ms = median_ms(load_from_disk, args.repeat)
+
+            results.append(BenchmarkResult(f"setup_infrastructure.cold[n={size}]", cold_ms, "ms"))
+            results.append(BenchmarkResult(f"setup_infrastructure.noop[n={size}]", noop_ms, "ms"))
+            results.append(BenchmarkResult(f"config_load.compile[n={size}]", compile_ms, "ms"))
+            results.append(BenchmarkResult(f"config_load.cached[n={size}]", cached_ms, "ms"))
+    return results
+
+
+async def bench_publish(args: argparse.Namespace) -> list[BenchmarkResult]:
+    """Пропускная способность publish_many и задержка одиночного publish."""
+    broker = FakeBroker(rpc_latency=args.rpc_latency, publish_latency=args.rpc_latency)
+    client = await make_client(broker)
+    await client.setup_infrastructure(DEFINITION_FILE)
+    batch = events(args.messages)
+
+    started = time.perf_counter()
+    result = await client.publish_many("minio_events", "minio.bucket.events", batch)
+    elapsed = time.perf_counter() - started
+    if result.failed:
+        raise RuntimeError(f"Не подтверждено {result.failed} сообщений")
+
+    latencies: list[float] = []
+    for event in batch[:args.requests]:
+        started = time.perf_counter()
+        await client.publish("minio_events", "minio.bucket.events", event)
+        latencies.append((time.perf_counter() - started) * 1000)
+    await client.close()
+
+    return [
+        BenchmarkResult("publish_many.throughput", args.messages / elapsed, "msg/s", higher_is_better=True),
+        BenchmarkResult("publish.p50", percentile(latencies, 50), "ms"),
+        BenchmarkResult("publish.p99", percentile(latencies, 99), "ms"),
+    ]
+
+
+async def bench_consume(args: argparse.Namespace) -> list[BenchmarkResult]:
+    """Пропускная способность потребителя: от подписки до подтверждения всех сообщений."""
+    broker = FakeBroker(rpc_latency=args.rpc_latency)
+    client = await make_client(broker)
+    await client.setup_infrastructure(DEFINITION_FILE)
+    await client.publish_many("minio_events", "minio.bucket.events", events(args.messages))
+
+    async def handler(message) -> None:
+        await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    consumer_tag = await client.consume_events(handler, queue_name="main.events")
+    while True:
+        stats = client.consumers_stats()[0]
+        if stats["acked"] + stats["nacked"] >= args.messages:
+            break
+        await asyncio.sleep(0.001)
+    elapsed = time.perf_counter() - started
+    await client.stop_consuming(consumer_tag)
+    await client.close()
+
+    return [BenchmarkResult("consume.throughput", args.messages / elapsed, "msg/s", higher_is_better=True)]
+
+
+async def bench_rpc(args: argparse.Namespace) -> list[BenchmarkResult]:
+    """RPC через direct reply-to: пропускная способность параллельных вызовов и задержка одиночного вызова."""
+    broker = FakeBroker(rpc_latency=args.rpc_latency, publish_latency=args.rpc_latency)
+    client = await make_client(broker)
+    await client.setup_infrastructure(DEFINITION_FILE)
+    responder = await client.open_channel()
+
+    async def echo(message) -> None:
+        reply = Message(body=message.body, correlation_id=message.correlation_id, content_type=message.content_type)
+        await responder.default_exchange.publish(reply, routing_key=message.reply_to)
+
+    consumer_tag = await client.consume_events(echo, queue_name="main.events", prefetch_count=1000)
+    batch = events(args.messages)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client.rpc_call("", "main.events", event) for event in batch))
+    elapsed = time.perf_counter() - started
+
+    latencies: list[float] = []
+    for event in batch[:args.requests]:
+        started = time.perf_counter()
+        await client.rpc_call("", "main.events", event)
+        latencies.append((time.perf_counter() - started) * 1000)
+    await client.stop_consuming(consumer_tag)
+    await client.close()
+
+    return [
+        BenchmarkResult("rpc.throughput", args.messages / elapsed, "call/s", higher_is_better=True),
+        BenchmarkResult("rpc.p50", percentile(latencies, 50), "ms"),
+        BenchmarkResult("rpc.p99", percentile(latencies, 99), "ms"),
+    ]
+
+
+async def bench_http(args: argparse.Namespace) -> list[BenchmarkResult]:
+    """Задержка HTTP-эндпоинтов через ASGI-приложение с клиентом на брокере в памяти."""
+    from app.src.main import app, config
+
+    def management_handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"name": "main.events", "vhost": "/", "messages": 0, "consumers": 1})
+
+    broker = FakeBroker(rpc_latency=args.rpc_latency)
+    client = RabbitMQClient(connection_factory=broker.connection_factory, channel_factory=broker.channel_factory)
+    await client.start()
+    app.state.rabbitmq_client = client
+    app.state.rabbitmq_management_client = RabbitMQManagementClient(
+        base_url="http://management/api",
+        auth=("bench", "bench"),
+        transport=httpx.MockTransport(management_handler)
+    )
+
+    prefix = config.FILES_API_PREFIX
+    publish_body = {
+        "exchange": "minio_events",
+        "routing_key": "minio.bucket.events",
+        "events": [{"event_type": "bench", "payload": {"i": 1}}],
+    }
+    endpoints = [
+        ("channel_pool_stats", "GET", f"{prefix}/channel_pool_stats", None),
+        ("queue_info", "GET", f"{prefix}/queue_info?queue_name=main.events", None),
+        ("publish_events", "POST", f"{prefix}/publish_events", publish_body),
+        ("metrics", "GET", "/metrics", None),
+    ]
+
+    results: list[BenchmarkResult] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        for name, method, url, body in endpoints:
+            latencies: list[float] = []
+            for _ in range(args.requests):
+                started = time.perf_counter()
+                response = await http.request(method, url, json=body)
+                latencies.append((time.perf_counter() - started) * 1000)
+                response.raise_for_status()
+            results.append(BenchmarkResult(f"http.{name}.p50", percentile(latencies, 50), "ms"))
+            results.append(BenchmarkResult(f"http.{name}.p95", percentile(latencies, 95), "ms"))
+
+    await app.state.rabbitmq_management_client.close()
+    await client.close()
+    return results
+
+
+async def bench_logging(args: argparse.Namespace) -> list[BenchmarkResult]:
+    """
+    Стоимость одного вызова логгера для event loop: отсечённый по уровню вызов
+    (f-строка и шаблон с аргументами) и запись в файл синхронно и через очередь.
+    """
+    count = args.messages
+    exchange, published, duration_ms = "minio_events", 100, 1.2345
+
+    def per_call_us(func: Callable[[], None]) -> float:
+        started = time.perf_counter()
+        for _ in range(count):
+            func()
+        return (time.perf_counter() - started) / count * 1_000_000
+
+    def disabled_fstring() -> None:
+        logger.debug(f"Публикация в '{exchange}': {published} сообщений за {duration_ms:.1f} мс")
+
+    def disabled_template() -> None:
+        logger.debug(
+            "Публикация в '{exchange}': {published} сообщений за {duration_ms:.1f} мс",
+            exchange=exchange, published=published, duration_ms=duration_ms
+        )
+
+    def enabled_template() -> None:
+        logger.info(
+            "Публикация в '{exchange}': {published} сообщений за {duration_ms:.1f} мс",
+            exchange=exchange, published=published, duration_ms=duration_ms
+        )
+
+    results: list[BenchmarkResult] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = str(Path(tmp) / "bench.log")
+        configure_logging(log_path=log_path, level="CRITICAL", file_level="INFO", enqueue=False)
+        results.append(BenchmarkResult("log.disabled.fstring", per_call_us(disabled_fstring), "us"))
+        results.append(BenchmarkResult("log.disabled.template", per_call_us(disabled_template), "us"))
+        results.append(BenchmarkResult("log.file.sync", per_call_us(enabled_template), "us"))
+
+        for serialize in (False, True):
+            configure_logging(log_path=log_path, level="CRITICAL", file_level="INFO", serialize=serialize, enqueue=True)
+            name = "log.file.enqueue.json" if serialize else "log.file.enqueue"
+            results.append(BenchmarkResult(name, per_call_us(enabled_template), "us"))
+            await logger.complete()
+
+    configure_logging()
+    return results
+
+
+async def bench_routing(args: argparse.Namespace) -> list[BenchmarkResult]:
+    """
+    Стоимость сопоставления события MinIO с правилами маршрутизации от их
+    числа: скомпилированный индекс против последовательной проверки правил,
+    и сквозная пропускная способность маршрутизатора на брокере в памяти.
+    """
+    def linear_match(rules: list[RoutingRuleConfig], bucket: str, key: str, event_name: str) -> list:
+        keys = set(event_keys(event_name))
+        return [
+            rule for rule in rules
+            if rule.bucket in (None, "*", bucket) and key.startswith(rule.prefix) and key.endswith(rule.suffix)
+            and (not rule.events or keys.intersection(rule.events))
+        ]
+
+    results: list[BenchmarkResult] = []
+    event_name = "s3:ObjectCreated:Put"
+    lookups = [(f"bucket-{i % 10}", f"tenant-{i}/2024/01/photo-{i}.jpg") for i in range(args.requests)]
+    for size in args.config_sizes:
+        rules = build_routing_rules(size)
+        index = RoutingIndex(rules)
+        for bucket, key in lookups[:10]:
+            if index.match(bucket, key, event_name) != linear_match(rules, bucket, key, event_name):
+                raise RuntimeError(f"Индекс и последовательная проверка разошлись для {bucket}/{key}")
+
+        def run(match: Callable[[str, str], object]) -> float:
+            started = time.perf_counter()
+            for bucket, key in lookups:
+                match(bucket, key)
+            return (time.perf_counter() - started) / len(lookups) * 1_000_000
+
+        indexed_us = statistics.median(
+            run(lambda bucket, key: index.match(bucket, key, event_name)) for _ in range(args.repeat)
+        )
+        linear_us = statistics.median(
+            run(lambda bucket, key: linear_match(rules, bucket, key, event_name))
+            for _ in range(args.repeat)
+        )
+        results.append(BenchmarkResult(f"routing.match.indexed[n={size}]", indexed_us, "us"))
+        results.append(BenchmarkResult(f"routing.match.linear[n={size}]", linear_us, "us"))
+
+    # Сквозной сценарий: события из main.events раскладываются по обменникам сервисов
+    size = max(args.config_sizes)
+    with tempfile.TemporaryDirectory() as tmp:
+        definition = json.loads(DEFINITION_FILE.read_text())
+        definition["services_config"] = None
+        definition["exchanges"] += [{"name": f"service.{i}", "type": "topic", "durable": True} for i in range(50)]
+        definition["routing_rules"] = [rule.model_dump() for rule in build_routing_rules(size)]
+        config_file = Path(tmp) / "definition.json"
+        config_file.write_text(json.dumps(definition))
+
+        broker = FakeBroker(rpc_latency=args.rpc_latency, publish_latency=args.rpc_latency)
+        client = await make_client(broker)
+        await client.setup_infrastructure(config_file)
+        channel = await client.open_channel()
+        exchange = await channel.get_exchange("minio_events", ensure=False)
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            exchange.publish(Message(body=minio_event(*lookups[i % len(lookups)])), routing_key="minio.bucket.events")
+            for i in range(args.messages)
+        ))
+        while True:
+            stats = next(s for s in client.consumers_stats() if s["queue"] == "main.events")
+            if stats["acked"] + stats["nacked"] >= args.messages:
+                break
+            await asyncio.sleep(0.001)
+        elapsed = time.perf_counter() - started
+        await client.close()
+    results.append(BenchmarkResult(f"routing.throughput[n={size}]", args.messages / elapsed, "msg/s", True))
+    return results
+
+
+async def bench_codecs(args: argparse.Namespace) -> list[BenchmarkResult]:
+    """
+    Кодеки тела на событии CONFIG_READY с size привязками: время кодирования,
+    ленивого разбора в примитивы и размер тела. Эталон - model_dump_json() и
+    model_validate_json() (полное построение модели). Кодеки без установленной
+    библиотеки пропускаются.
+    """
+    def per_call_us(func: Callable[[], object]) -> float:
+        return statistics.median(median_ms(func, 1) for _ in range(args.repeat)) * 1000
+
+    results: list[BenchmarkResult] = []
+    for size in args.config_sizes:
+        event = ConfigReadyEvent(event_type="CONFIG_READY", payload=[
+            ServiceBindingConfig(
+                exchange=f"bench.ex.{i}",
+                queue=f"bench.q.{i}",
+                routing_key=f"bench.{i}.#",
+                arguments={"x-dead-letter-exchange": "minio_events_dlx", "x-queue-type": "classic"},
+                retry_policy={"max_attempts": 5, "delay_ms": 1000},
+            )
+            for i in range(size)
+        ])
+        baseline = event.model_dump_json().encode()
+        results.append(BenchmarkResult(f"codec.baseline.encode[n={size}]", per_call_us(
+            lambda: event.model_dump_json().encode()
+        ), "us"))
+        results.append(BenchmarkResult(f"codec.baseline.decode_model[n={size}]", per_call_us(
+            lambda: ConfigReadyEvent.model_validate_json(baseline)
+        ), "us"))
+
+        variants = [(codec.name, codec, None) for codec in CODECS.values()]
+        variants += [
+            (f"json+{compression.name}", CODECS[JSON_CONTENT_TYPE], compression)
+            for compression in COMPRESSIONS.values()
+        ]
+        for name, codec, compression in variants:
+            try:
+                message_codec = MessageCodec(codec, compression, compress_min_bytes=0)
+            except CodecError:
+                continue
+            encoded = message_codec.encode_events([event])[0]
+            results.append(BenchmarkResult(f"codec.{name}.encode[n={size}]", per_call_us(
+                lambda: message_codec.encode_events([event])
+            ), "us"))
+            results.append(BenchmarkResult(f"codec.{name}.decode[n={size}]", per_call_us(
+                lambda: decode_body(encoded.body, encoded.content_type, encoded.content_encoding)
+            ), "us"))
+            results.append(BenchmarkResult(f"codec.{name}.size[n={size}]", len(encoded.body), "B"))
+    return results
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "setup": bench_setup_infrastructure,
+    "publish": bench_publish,
+    "consume": bench_consume,
+    "rpc": bench_rpc,
+    "http": bench_http,
+    "logging": bench_logging,
+    "routing": bench_routing,
+    "codecs": bench_codecs,
+}
+
+
+# ==== Сравнение с эталоном ====
+def find_regressions(results: list[BenchmarkResult], baseline: dict[str, dict], tolerance: float) -> list[str]:
+    regressions = []
+    for result in results:
+        reference = baseline.get(result.name)
+        if not reference or not reference["value"]:
+            continue
+        change = (result.value - reference["value"]) / reference["value"]
+        if result.higher_is_better:
+            change = -change
+        if change > tolerance:
+            regressions.append(
+                f"{result.name}: {reference['value']:.3f} -> {result.value:.3f} {result.unit} (хуже на {change:.0%})"
+            )
+    return regressions
+
+
+async def main(args: argparse.Namespace) -> int:
+    results: list[BenchmarkResult] = []
+    for name in args.only or SCENARIOS:
+        scenario_results = await SCENARIOS[name](args)
+        for result in scenario_results:
+            print(f"{result.name:<45} {result.value:>14.3f} {result.unit}")
+        results.extend(scenario_results)
+
+    if args.save:
+        Path(args.save).write_text(json.dumps({r.name: asdict(r) for r in results}, indent=2, ensure_ascii=False))
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = find_regressions(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"РЕГРЕССИЯ {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Бенчмарки клиента RabbitMQ на брокере в памяти")
+    parser.add_argument("--only", nargs="+", choices=list(SCENARIOS), help="Запустить только эти сценарии")
+    parser.add_argument("--config-sizes", nargs="+", type=int, default=[10, 100, 1000])
+    parser.add_argument("--messages", type=int, default=20000, help="Сообщений в сценариях publish/consume")
+    parser.add_argument("--requests", type=int, default=500, help="Запросов на эндпоинт / одиночных публикаций")
+    parser.add_argument("--repeat", type=int, default=5, help="Повторов для синхронных замеров (берётся медиана)")
+    parser.add_argument("--rpc-latency", type=float, default=0.0002, help="Имитация round-trip до брокера, с")
+    parser.add_argument("--save", help="Сохранить результаты в JSON")
+    parser.add_argument("--compare", help="Сравнить с сохранёнными результатами")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Допустимое ухудшение при сравнении")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
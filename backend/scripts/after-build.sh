@@ -4,4 +4,6 @@ rm -rf scripts/run-main-compile.sh
 rm -rf scripts/run-tests.sh
 rm -rf requirements.txt
 rm -rf requirements.dev.txt
-rm -rf tests
\ No newline at end of file
+rm -rf tests
+rm -rf benchmarks
+rm -rf scripts/run-benchmarks.sh
\ No newline at end of file
@@ -1,48 +1,134 @@
-from datetime import datetime
-from pathlib import Path
-import subprocess
+"""
+Компиляция исходников app/src в байткод (-OO) без исходников рядом.
+
+Модули компилируются в процессе через py_compile в пуле процессов.
+Готовый .pyc кладётся в кэш под ключом из хэша содержимого, пути модуля,
+версии байткода и уровня оптимизации: при повторной сборке неизменённые
+модули берутся из кэша. Кэш между сборками образа переживает, если
+COMPILE_CACHE_DIR смонтирован как кэш сборки (RUN --mount=type=cache).
+"""
+import argparse
+import hashlib
+import importlib.util
 import os
+import py_compile
 import shutil
+import sys
+import time
 from multiprocessing import Pool
+from pathlib import Path
 
 ROOT_DIR = "app/src"
-ROOT_COMPILE_DIR = "./compiled"
+CACHE_DIR = os.getenv("COMPILE_CACHE_DIR", ".cache/compile")
+# Модули и каталоги, которые остаются исходниками (точка входа, миграции)
+MODULES_NO_COMPILE = ("main", "alembic", "env")
+OPTIMIZE = 2  # как python -OO
+
+
+def is_excluded(module: Path) -> bool:
+    return module.stem in MODULES_NO_COMPILE or any(part in MODULES_NO_COMPILE for part in module.parent.parts)
 
-def compile_module_to_pyc(module: Path):        
+
+def cache_key(module: Path, source: bytes) -> str:
+    digest = hashlib.sha256()
+    digest.update(importlib.util.MAGIC_NUMBER)
+    digest.update(f"{OPTIMIZE}:{module.as_posix()}\0".encode())
+    digest.update(source)
+    return digest.hexdigest()
+
+
+def compile_module_to_pyc(task: tuple[Path, str, bool, bool]) -> tuple[str, str, float]:
+    """Возвращает (модуль, compiled | cached, секунды). Ошибку компиляции возвращает как статус error: ..."""
+    module, cache_dir, use_cache, keep_source = task
+    started = time.perf_counter()
     try:
-        modules_no_compile = ("main", "alembic", "env")
-        if len([module_no_compile for module_no_compile in modules_no_compile if module_no_compile in str(module)]) > 0:
-            return
-        module_path_name, module_file_name = os.path.split(module)
-        command = f"python -OO -m py_compile {module}"
-        result = subprocess.run(command, shell=True, encoding='utf-8', capture_output=True, text=False, check=True)
-        print(f".", end="")
-        compile_files = next(os.walk(Path(f"{module_path_name}/__pycache__")))[2]
-        compile_file = [compile_file for compile_file in compile_files if module.name.split(".")[0] in compile_file][0]
-        new_compile_file_name = f'{compile_file.split(".")[0]}.pyc'
-        src_path = Path.joinpath(Path(f"{module_path_name}/__pycache__"), compile_file)
-        dst_path = Path.joinpath(Path(module_path_name), new_compile_file_name)
-        # print(f"Moved compiled module: '{compile_file}' to '{dst_path}'")
-        shutil.move(src=src_path, dst=dst_path)
-        os.remove(module)
+        source = module.read_bytes()
+        cached = Path(cache_dir) / f"{cache_key(module, source)}.pyc"
+        if use_cache and cached.exists():
+            status = "cached"
+        else:
+            # dfile - путь модуля в трейсбеках; хэш вместо mtime делает байткод воспроизводимым
+            py_compile.compile(
+                str(module),
+                cfile=str(cached),
+                dfile=module.as_posix(),
+                doraise=True,
+                optimize=OPTIMIZE,
+                invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+            )
+            status = "compiled"
+        shutil.copyfile(cached, module.with_suffix(".pyc"))
+        if not keep_source:
+            module.unlink()
     except Exception as error:
-        print()
-        print(f"Compilation {module} failed - '{error}'")
-        raise Exception(f"Compilation {module} failed - '{error}'")
+        status = f"error: {error}"
+    return str(module), status, time.perf_counter() - started
+
 
-def compile_modules_to_pyc():
+def print_report(results: list[tuple[str, str, float]], excluded: int, process_time: float, top: int) -> None:
+    counts: dict[str, int] = {}
+    for _, status, _ in results:
+        counts[status.split(":")[0]] = counts.get(status.split(":")[0], 0) + 1
+    work_time = sum(seconds for _, _, seconds in results)
+    print(
+        f"Modules: {len(results)} (compiled {counts.get('compiled', 0)}, cached {counts.get('cached', 0)}, "
+        f"failed {counts.get('error', 0)}), excluded {excluded}"
+    )
+    print(f"Wall time {process_time:.2f}s, worker time {work_time:.2f}s")
+    slowest = sorted((item for item in results if item[1] == "compiled"), key=lambda item: item[2], reverse=True)
+    if slowest and top:
+        print(f"Slowest {min(top, len(slowest))} modules:")
+        for module, _, seconds in slowest[:top]:
+            print(f"  {seconds * 1000:8.1f} ms  {module}")
+
+
+def compile_modules_to_pyc(
+    root_dir: str = ROOT_DIR,
+    cache_dir: str = CACHE_DIR,
+    jobs: int | None = None,
+    use_cache: bool = True,
+    keep_source: bool = False,
+    top: int = 10
+) -> int:
     print()
     print("Compilation py to pyc started...")
-    pool = Pool()
-    result_map = pool.map(os.remove, Path(ROOT_DIR).rglob('*.pyc'))
-    
-    start_time = datetime.now()
-    paths = Path(ROOT_DIR).rglob('*.py')
-    result_map = pool.map(compile_module_to_pyc, paths)
-    process_time = (datetime.now() - start_time).total_seconds()
-    print()
-    print(f"Compilation of {len(list(result_map))} modules Completed successfully in {process_time:.2f} second.")
+    start_time = time.perf_counter()
+    for stale in Path(root_dir).rglob("*.pyc"):
+        stale.unlink()
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+
+    modules = sorted(Path(root_dir).rglob("*.py"))
+    tasks = [(module, cache_dir, use_cache, keep_source) for module in modules if not is_excluded(module)]
+    with Pool(processes=jobs) as pool:
+        results = list(pool.imap_unordered(compile_module_to_pyc, tasks, chunksize=8))
+    process_time = time.perf_counter() - start_time
+
+    failed = [(module, status) for module, status, _ in results if status.startswith("error")]
+    for module, status in failed:
+        print(f"Compilation {module} failed - '{status[len('error: '):]}'")
+    print_report(results, len(modules) - len(tasks), process_time, top)
     print()
+    return 1 if failed else 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--root", default=ROOT_DIR)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="recompile every module")
+    parser.add_argument("--keep-source", action="store_true", help="do not remove .py files")
+    parser.add_argument("--top", type=int, default=10, help="slowest modules to report")
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
-    compile_modules_to_pyc()
+    args = parse_args()
+    sys.exit(compile_modules_to_pyc(
+        root_dir=args.root,
+        cache_dir=args.cache_dir,
+        jobs=args.jobs,
+        use_cache=not args.no_cache,
+        keep_source=args.keep_source,
+        top=args.top,
+    ))
@@ -0,0 +1,4 @@
+#!/bin/bash
+
+. .venv/bin/activate
+python -m benchmarks.run "$@"
@@ -1,3 +1,4 @@
 #!/bin/bash
 
-gunicorn app.src.main:app -w 1 -k uvicorn.workers.UvicornWorker -b 0.0.0.0:80 --timeout 1000
\ No newline at end of file
+# WORKERS > 1: топологию и CONFIG_READY обслуживает один ведущий воркер (RMQ_LEADER_ELECTION)
+gunicorn app.src.main:app -w ${WORKERS:-1} -k uvicorn.workers.UvicornWorker -b 0.0.0.0:80 --timeout 1000
\ No newline at end of file
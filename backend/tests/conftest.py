@@ -0,0 +1,60 @@
+import asyncio
+import json
+import os
+import tempfile
+from pathlib import Path
+
+# Настройки читаются при импорте app - окружение задаётся до него
+os.environ.setdefault("FILES_PROJECT_NAME", "api-orchestrator-tests")
+os.environ.setdefault("FILES_VERSION", "0")
+os.environ.setdefault("FILES_API_PREFIX", "/api")
+os.environ.setdefault("FILES_SERVICE_URL", "http://main")
+os.environ.setdefault("BACKEND_SECRET_KEY", "test-secret-key-with-at-least-32-bytes")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("DEBUG", "false")
+os.environ.setdefault("LOG_PATH", tempfile.mkdtemp(prefix="orchestrator-tests-log-"))
+os.environ.setdefault("LOG_ENQUEUE", "false")
+# Без каталога кеша состояние CONFIG_READY не переживает тест
+os.environ.setdefault("RMQ_CONFIG_CACHE_DIR", "")
+
+import pytest  # noqa: E402
+
+from app.src.api.rabbitmq.client import RabbitMQClient  # noqa: E402
+from benchmarks.fake_broker import FakeBroker  # noqa: E402
+
+DEFINITION = Path(__file__).resolve().parents[1] / "app" / "configs" / "load_definition.json"
+
+
+def run(coro):
+    """Асинхронный сценарий теста в отдельном event loop."""
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def definition() -> dict:
+    """Копия load_definition.json, которую тест может менять."""
+    return json.loads(DEFINITION.read_text())
+
+
+@pytest.fixture
+def config_file(tmp_path: Path, definition: dict) -> Path:
+    path = tmp_path / "load_definition.json"
+    path.write_text(json.dumps(definition))
+    return path
+
+
+@pytest.fixture
+def make_client(config_file: Path):
+    """Фабрика клиентов, подключённых к одному брокеру в памяти."""
+
+    def factory(broker: FakeBroker, **kwargs) -> RabbitMQClient:
+        client = RabbitMQClient(
+            connection_factory=broker.connection_factory,
+            channel_factory=broker.channel_factory,
+            **kwargs
+        )
+        client.config_file = config_file
+        return client
+
+    return factory
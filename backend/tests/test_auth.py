@@ -0,0 +1,51 @@
+import time
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from app.configs.settings import get_settings
+from app.src.api.auth.models import TokenData
+from app.src.api.auth.service import TokenVerifier, create_access_token
+from tests.conftest import run
+
+config = get_settings()
+
+
+def _token_data(exp: float) -> TokenData:
+    return TokenData(user="user", user_id="1", access_roles=["admin"], exp=int(exp), start_service_id="main")
+
+
+def _verifier() -> TokenVerifier:
+    return TokenVerifier(secret_key=config.BACKEND_SECRET_KEY, algorithm=config.ALGORITHM)
+
+
+def test_created_token_is_verified_and_cached():
+    async def scenario():
+        verifier = _verifier()
+        token = create_access_token(_token_data(time.time() + 60)).access_token
+        claims = await verifier.verify(token)
+        assert claims["user_id"] == "1"
+        assert verifier._cache.get(token) == (True, claims)
+        await verifier.close()
+
+    run(scenario())
+
+
+@pytest.mark.parametrize("token", [
+    jwt.encode({"user_id": "1", "exp": int(time.time()) - 10}, config.BACKEND_SECRET_KEY, algorithm=config.ALGORITHM),
+    jwt.encode({"user_id": "1"}, "other-secret-key-with-at-least-32-bytes", algorithm=config.ALGORITHM),
+    jwt.encode({"user_id": "1"}, config.BACKEND_SECRET_KEY, algorithm="HS512"),
+    jwt.encode({"user_id": "1"}, None, algorithm="none"),
+    "not-a-token",
+], ids=["expired", "foreign-key", "other-algorithm", "unsigned", "malformed"])
+def test_invalid_token_is_rejected(token):
+    async def scenario():
+        verifier = _verifier()
+        with pytest.raises(HTTPException) as error:
+            await verifier.verify(token)
+        assert error.value.status_code == 400
+        assert verifier._cache.get(token) == (False, None)
+        await verifier.close()
+
+    run(scenario())
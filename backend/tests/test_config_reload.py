@@ -0,0 +1,51 @@
+import asyncio
+import json
+
+from app.src.api.rabbitmq.watcher import ConfigWatcher
+from benchmarks.fake_broker import FakeBroker
+from tests.conftest import run
+
+
+def test_failed_change_is_retried_without_new_edit(tmp_path):
+    async def scenario():
+        path = tmp_path / "config.json"
+        path.write_text("{}")
+        calls: list[bytes] = []
+
+        async def on_change(raw: bytes) -> None:
+            calls.append(raw)
+            if len(calls) == 1:
+                raise ConnectionError("broker blip")
+
+        watcher = ConfigWatcher(path, on_change, interval=0.01, debounce=0.01)
+        watcher.start()
+        path.write_text('{"queues": []}')
+        for _ in range(100):
+            if len(calls) >= 2:
+                break
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        await watcher.stop()
+        assert calls == [b'{"queues": []}'] * 2
+
+    run(scenario())
+
+
+def test_changed_config_applies_validated_version(make_client, definition, config_file):
+    async def scenario():
+        broker = FakeBroker()
+        client = make_client(broker)
+        await client.start()
+
+        validated = json.loads(json.dumps(definition))
+        validated["queues"].append({"name": "validated.queue", "vhost": "/", "durable": True, "arguments": {}})
+        # Файл успел измениться ещё раз между валидацией и применением
+        definition["queues"].append({"name": "later.queue", "vhost": "/", "durable": True, "arguments": {}})
+        config_file.write_text(json.dumps(definition))
+
+        await client._on_config_file_change(json.dumps(validated).encode())
+        assert "validated.queue" in broker.queues
+        assert "later.queue" not in broker.queues
+        await client.close()
+
+    run(scenario())
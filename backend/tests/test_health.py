@@ -0,0 +1,46 @@
+from app.src.api.health_check.monitor import HealthMonitor
+from app.src.api.rabbitmq.leader import FileLockElection
+from benchmarks.fake_broker import FakeBroker
+from tests.conftest import run
+
+
+def test_leader_and_follower_are_both_ready(make_client, tmp_path):
+    async def scenario():
+        broker = FakeBroker()
+        lock_file = str(tmp_path / "leader.lock")
+        leader = make_client(broker, leader_election=FileLockElection(lock_file, "orchestrator.leader.test"))
+        follower = make_client(broker, leader_election=FileLockElection(lock_file, "orchestrator.leader.test"))
+        await leader.start()
+        await follower.start()
+        assert leader.is_leader and not follower.is_leader
+
+        leader_state = await HealthMonitor(leader, lag_threshold=0).probe()
+        follower_state = await HealthMonitor(follower, lag_threshold=0).probe()
+        assert (leader_state.ready, leader_state.role, leader_state.reasons) == (True, "leader", [])
+        assert (follower_state.ready, follower_state.role, follower_state.reasons) == (True, "follower", [])
+        assert not follower_state.infrastructure_applied
+
+        await follower.close()
+        await leader.close()
+
+    run(scenario())
+
+
+def test_follower_without_config_is_not_ready(make_client, tmp_path):
+    async def scenario():
+        broker = FakeBroker()
+        lock_file = str(tmp_path / "leader.lock")
+        leader = make_client(broker, leader_election=FileLockElection(lock_file, "orchestrator.leader.test"))
+        follower = make_client(broker, leader_election=FileLockElection(lock_file, "orchestrator.leader.test"))
+        await leader.start()
+        await follower.connect()
+        await follower.election.try_acquire(follower.open_channel)
+
+        state = await HealthMonitor(follower, lag_threshold=0).probe()
+        assert not state.ready
+        assert "infrastructure config not loaded" in state.reasons
+
+        await follower.close()
+        await leader.close()
+
+    run(scenario())
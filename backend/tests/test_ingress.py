@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.src.api.rabbitmq.ingress import IngressSaturatedError, PublishIngress
+from app.src.api.rabbitmq.routers import rabbitmq_router
+from app.src.api.rabbitmq.schemas import Event, PublishEventsRequest
+from benchmarks.fake_broker import FakeBroker
+from tests.conftest import run
+
+
+def _request(size: int) -> PublishEventsRequest:
+    return PublishEventsRequest(
+        exchange="minio_events",
+        routing_key="minio.bucket.events",
+        events=[Event(event_type="test", payload=i) for i in range(size)]
+    )
+
+
+async def _started_client(make_client, broker: FakeBroker, **ingress):
+    client = make_client(broker)
+    await client.start()
+    client.ingress = PublishIngress(client, **ingress)
+    return client
+
+
+def test_blocked_broker_sheds_overflow_and_drains_after_unblock(make_client):
+    async def scenario():
+        broker = FakeBroker()
+        client = await _started_client(make_client, broker, high_water_mark=4, workers=1, retry_after=7)
+        broker.set_blocked(True)
+
+        accepted = client.ingress.submit(_request(3))
+        await asyncio.sleep(0.01)
+        assert client.ingress.stats().paused_vhosts == ["/"]
+        with pytest.raises(IngressSaturatedError) as error:
+            client.ingress.submit(_request(2))
+        assert (error.value.reason, error.value.retry_after) == ("blocked", 7)
+        with pytest.raises(ValueError):
+            client.ingress.submit(_request(5))
+
+        broker.set_blocked(False)
+        result = await asyncio.wait_for(accepted, timeout=2)
+        assert result.confirmed == 3
+        stats = client.ingress.stats()
+        assert (stats.queued_events, stats.published, stats.shed, stats.paused_vhosts) == (0, 3, 1, [])
+        assert len(broker.queues["main.events"].messages) == 3
+        await client.close()
+
+    run(scenario())
+
+
+def test_http_ingress_answers_429_with_retry_after(make_client):
+    async def scenario():
+        broker = FakeBroker()
+        client = await _started_client(make_client, broker, high_water_mark=2, workers=1, retry_after=3)
+        broker.set_blocked(True)
+
+        app = FastAPI()
+        app.include_router(rabbitmq_router)
+        app.state.rabbitmq_client = client
+        body = _request(2).model_dump(mode="json")
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+            assert (await http.post("/enqueue_events", json=body)).status_code == 202
+            response = await http.post("/enqueue_events", json=body)
+            assert response.status_code == 429
+            assert response.headers["Retry-After"] == "3"
+            body["events"] *= 2
+            assert (await http.post("/enqueue_events", json=body)).status_code == 413
+
+        broker.set_blocked(False)
+        await client.close()
+
+    run(scenario())
+
+
+def test_drain_history_is_trimmed_without_stats_calls(make_client):
+    async def scenario():
+        client = await _started_client(make_client, FakeBroker(), workers=1)
+        stale = time.monotonic() - 60
+        client.ingress._drained.extend((stale, 1) for _ in range(1000))
+
+        await client.ingress.submit(_request(1))
+        assert list(size for _, size in client.ingress._drained) == [1]
+        await client.close()
+
+    run(scenario())
@@ -0,0 +1,51 @@
+import json
+
+from app.src.api.rabbitmq.loader import InfrastructureLoader
+
+
+def _variants(definition: dict, count: int) -> list[bytes]:
+    variants = []
+    for i in range(count):
+        definition["queues"][0]["arguments"]["x-max-length"] = 1000 + i
+        variants.append(json.dumps(definition).encode())
+    return variants
+
+
+def test_memory_keeps_only_recent_configs(definition):
+    loader = InfrastructureLoader(memory_size=2)
+    first, second, third = _variants(definition, 3)
+
+    compiled = loader.load_compiled_bytes(first)
+    assert loader.load_compiled_bytes(first) is compiled
+    loader.load_compiled_bytes(second)
+    loader.load_compiled_bytes(third)
+
+    assert len(loader._memory) == 2
+    assert compiled.key not in loader._memory
+    assert loader.load_compiled_bytes(first) is not compiled
+    # Кеш в памяти принадлежит экземпляру, а не классу
+    assert not InfrastructureLoader()._memory
+
+
+def test_new_loader_reads_compiled_config_from_disk(definition, tmp_path):
+    raw, = _variants(definition, 1)
+    compiled = InfrastructureLoader(cache_dir=tmp_path).load_compiled_bytes(raw)
+
+    loader = InfrastructureLoader(cache_dir=tmp_path)
+    loader.compile = None  # повторная компиляция сломала бы тест
+    restored = loader.load_compiled_bytes(raw)
+    assert restored.key == compiled.key
+    assert restored.config == compiled.config
+    assert restored.snapshot == compiled.snapshot
+
+
+def test_disk_cache_is_plain_json_and_damaged_cache_is_recompiled(definition, tmp_path):
+    raw, = _variants(definition, 1)
+    compiled = InfrastructureLoader(cache_dir=tmp_path).load_compiled_bytes(raw)
+    cache_file, = tmp_path.glob("infrastructure-*.json")
+    assert json.loads(cache_file.read_text())["key"] == compiled.key
+
+    cache_file.write_text('{"key": "%s", "config": {"queues": "not a list"}}' % compiled.key)
+    restored = InfrastructureLoader(cache_dir=tmp_path).load_compiled_bytes(raw)
+    assert restored.config == compiled.config
+    assert restored.snapshot == compiled.snapshot
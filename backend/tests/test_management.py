@@ -0,0 +1,77 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.src.api.rabbitmq.management import RabbitMQManagementClient
+from tests.conftest import run
+
+
+def _client(handler) -> RabbitMQManagementClient:
+    return RabbitMQManagementClient(
+        base_url="http://rabbitmq/api",
+        auth=("guest", "guest"),
+        transport=httpx.MockTransport(handler)
+    )
+
+
+def test_concurrent_requests_are_coalesced():
+    async def scenario():
+        release = asyncio.Event()
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await release.wait()
+            return httpx.Response(200, json=[{"name": "q"}])
+
+        client = _client(handler)
+        waiters = [asyncio.create_task(client.list_vhosts()) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        assert await asyncio.gather(*waiters) == [[{"name": "q"}]] * 5
+        assert client.stats() == {"requests_total": 1, "cache_hits_total": 0, "coalesced_total": 4}
+        await client.close()
+
+    run(scenario())
+
+
+def test_cancelled_leader_does_not_cancel_coalesced_waiters():
+    async def scenario():
+        release = asyncio.Event()
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await release.wait()
+            return httpx.Response(200, json=[{"name": "/"}])
+
+        client = _client(handler)
+        leader = asyncio.create_task(client.list_vhosts())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(client.list_vhosts())
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        assert await waiter == [{"name": "/"}]
+        assert leader.cancelled()
+        assert client.requests_total == 1
+        await client.close()
+
+    run(scenario())
+
+
+def test_error_is_shared_with_waiters_as_regular_exception():
+    async def scenario():
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(0.01)
+            return httpx.Response(503, json={"error": "unavailable"})
+
+        client = _client(handler)
+        results = await asyncio.gather(client.list_vhosts(), client.list_vhosts(), return_exceptions=True)
+        assert all(isinstance(result, httpx.HTTPStatusError) for result in results)
+        # Ошибка не кешируется - следующий вызов снова идёт в брокер
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.list_vhosts()
+        assert client.requests_total == 2
+        await client.close()
+
+    run(scenario())
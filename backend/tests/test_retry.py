@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+from app.src.api.rabbitmq.constants import RETRY_ATTEMPT_HEADER
+from app.src.api.rabbitmq.retry import build_retry_queues
+from app.src.api.rabbitmq.schemas import Event, RetryPolicyConfig
+from benchmarks.fake_broker import FakeBroker
+from tests.conftest import run
+
+
+def _set_retry_policy(definition: dict, config_file, **policy) -> None:
+    binding = definition["services_config"][0]["service_binding_conf"][0]
+    binding["retry_policy"] = policy
+    config_file.write_text(json.dumps(definition))
+
+
+def test_retry_queue_name_contains_ttl():
+    queues = build_retry_queues("q", RetryPolicyConfig(max_attempts=4, delay_ms=100, max_delay_ms=300))
+    assert [(q.name, q.arguments["x-message-ttl"]) for q in queues] == [
+        ("q.retry.100", 100), ("q.retry.200", 200), ("q.retry.300", 300)
+    ]
+    # Уровни, упёршиеся в max_delay_ms, делят одну очередь
+    capped = build_retry_queues("q", RetryPolicyConfig(max_attempts=5, delay_ms=100, max_delay_ms=100))
+    assert [q.name for q in capped] == ["q.retry.100"]
+
+
+def test_changed_retry_delay_declares_new_tier_queues(make_client, definition, config_file):
+    async def scenario():
+        broker = FakeBroker()
+        client = make_client(broker)
+        await client.start()
+        assert {"main.events.retry.1000", "main.events.retry.2000"} <= set(broker.queues)
+
+        _set_retry_policy(definition, config_file, max_attempts=3, delay_ms=500)
+        report = await client.setup_infrastructure()
+        assert not report.conflicts
+        assert [cfg.name for cfg in report.plan.queues.added] == ["main.events.retry.500"]
+        assert broker.queues["main.events.retry.500"].arguments["x-message-ttl"] == 500
+        assert client.is_ready
+        await client.close()
+
+    run(scenario())
+
+
+def test_failed_message_returns_through_retry_queue(make_client, definition, config_file):
+    _set_retry_policy(definition, config_file, max_attempts=2, delay_ms=20)
+
+    async def scenario():
+        broker = FakeBroker()
+        client = make_client(broker)
+        await client.start()
+        attempts: list[int | None] = []
+        done = asyncio.Event()
+
+        async def handler(message) -> None:
+            attempts.append((message.headers or {}).get(RETRY_ATTEMPT_HEADER))
+            if len(attempts) == 1:
+                raise RuntimeError("first attempt fails")
+            done.set()
+
+        binding = client.infrastructure_config.services_config[0].service_binding_conf[0]
+        await client.consume_service_binding(binding, handler)
+        await client.publish("minio_events", "minio.bucket.events", Event(event_type="test", payload=1))
+        await asyncio.wait_for(done.wait(), timeout=2)
+        assert attempts == [None, 1]
+        await client.close()
+
+    run(scenario())
+
+
+def test_retry_without_delay_queue_falls_back_to_dlx(make_client):
+    async def scenario():
+        broker = FakeBroker()
+        client = make_client(broker)
+        await client.start()
+        assert "main.events.retry.20" not in broker.queues
+        attempts = 0
+
+        async def handler(message) -> None:
+            nonlocal attempts
+            attempts += 1
+            raise RuntimeError("always fails")
+
+        # Очередей задержки для этой политики нет: копия вернётся брокером, а не пропадёт
+        policy = RetryPolicyConfig(max_attempts=3, delay_ms=20)
+        await client.consume_events(handler, queue_name="main.events", retry_policy=policy)
+        await client.publish("minio_events", "minio.bucket.events", Event(event_type="test", payload=1))
+        for _ in range(100):
+            if broker.queues["minio_events_dlq"].messages:
+                break
+            await asyncio.sleep(0.01)
+        assert attempts == 1
+        assert len(broker.queues["minio_events_dlq"].messages) == 1
+        await client.close()
+
+    run(scenario())
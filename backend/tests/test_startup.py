@@ -0,0 +1,67 @@
+import asyncio
+import json
+
+import httpx
+from fastapi import FastAPI
+
+from app.src.api.rabbitmq.connection import ExponentialBackoff
+from app.src.api.rabbitmq.routers import rabbitmq_router
+from benchmarks.fake_broker import FakeBroker
+from tests.conftest import run
+
+FAST_BACKOFF = ExponentialBackoff(initial=0.001, maximum=0.005, jitter=False)
+
+
+def test_background_start_retries_until_broker_is_up(make_client):
+    async def scenario():
+        broker = FakeBroker()
+        available = False
+
+        async def connection_factory(*args, **kwargs):
+            if not available:
+                raise ConnectionRefusedError("broker is down")
+            return await broker.connection_factory(*args, **kwargs)
+
+        client = make_client(broker)
+        client._connection_factory = connection_factory
+        client._backoff = FAST_BACKOFF
+        task = asyncio.create_task(client.start_with_retry())
+        await asyncio.sleep(0.1)
+        assert not client.is_ready
+        assert client.readiness()["error"]
+
+        available = True
+        await asyncio.wait_for(task, timeout=2)
+        assert client.is_ready
+        assert client.readiness()["error"] is None
+        await client.close()
+
+    run(scenario())
+
+
+def test_config_can_be_applied_while_client_is_not_ready(make_client, definition, config_file):
+    async def scenario():
+        config_file.write_text("{not json")
+        client = make_client(FakeBroker())
+        client._backoff = FAST_BACKOFF
+        task = asyncio.create_task(client.start_with_retry())
+        await asyncio.sleep(0.05)
+        assert not client.is_ready
+
+        app = FastAPI()
+        app.include_router(rabbitmq_router)
+        app.state.rabbitmq_client = client
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+            response = await http.put("/set_rabbitmq_config", params={"dry_run": True})
+            assert response.status_code == 400
+
+            config_file.write_text(json.dumps(definition))
+            response = await http.put("/set_rabbitmq_config")
+            assert response.status_code == 200
+            assert response.json()["plan"]["queues"]["added"]
+
+        await asyncio.wait_for(task, timeout=2)
+        assert client.is_ready
+        await client.close()
+
+    run(scenario())
@@ -0,0 +1,107 @@
+import json
+
+from app.src.api.rabbitmq.pool import ChannelPool
+from app.src.api.rabbitmq.schemas import InfrastructureConfig
+from app.src.api.rabbitmq.topology import TopologyDeclarer, TopologySnapshot
+from benchmarks.fake_broker import FakeBroker
+from tests.conftest import run
+
+MAX_LENGTH = {"x-max-length": 1000}
+
+
+def _change_main_queue(definition: dict, config_file) -> dict:
+    queue = next(q for q in definition["queues"] if q["name"] == "main.events")
+    queue["arguments"] = {**queue["arguments"], **MAX_LENGTH}
+    config_file.write_text(json.dumps(definition))
+    return queue["arguments"]
+
+
+def test_diff_reports_changed_queue_and_bindings_to_restore(definition):
+    applied = TopologySnapshot.from_config(InfrastructureConfig.model_validate(definition))
+    definition["queues"][0]["arguments"]["x-max-length"] = 1000
+    plan = TopologySnapshot.from_config(InfrastructureConfig.model_validate(definition)).diff(applied)
+
+    assert [cfg.name for cfg in plan.queues.changed] == ["main.events"]
+    assert not plan.queues.added
+    assert [(b.source, b.destination) for b in plan.rebind] == [("minio_events", "main.events")]
+
+
+def test_changed_queue_argument_is_skipped_as_conflict(make_client, definition, config_file):
+    async def scenario():
+        broker = FakeBroker()
+        client = make_client(broker)
+        await client.start()
+        original = dict(broker.queues["main.events"].arguments)
+        _change_main_queue(definition, config_file)
+
+        report = await client.setup_infrastructure()
+        assert [cfg.name for cfg in report.conflicts] == ["main.events"]
+        assert report.as_dict()["conflicts"] == ["queue 'main.events' (vhost '/')"]
+        assert client.is_ready
+        assert broker.queues["main.events"].arguments == original
+
+        # Конфликт не считается применённым: повторная настройка снова его показывает, но не падает
+        report = await client.setup_infrastructure()
+        assert [cfg.name for cfg in report.conflicts] == ["main.events"]
+
+        dry_run = await client.setup_infrastructure(dry_run=True)
+        assert [cfg.name for cfg in dry_run.conflicts] == ["main.events"]
+        await client.close()
+
+    run(scenario())
+
+
+def test_recreate_changed_queue_restores_bindings(make_client, definition, config_file):
+    async def scenario():
+        broker = FakeBroker()
+        client = make_client(broker)
+        await client.start()
+        arguments = _change_main_queue(definition, config_file)
+
+        report = await client.setup_infrastructure(recreate=True)
+        assert [cfg.name for cfg in report.recreated] == ["main.events"]
+        assert not report.conflicts
+        assert broker.queues["main.events"].arguments == arguments
+        assert broker.route("minio_events", "minio.bucket.events") == ["main.events"]
+
+        # Пересозданная очередь применена - дальше план пуст
+        report = await client.setup_infrastructure()
+        assert not report.conflicts and not report.plan.queues.changed
+        await client.close()
+
+    run(scenario())
+
+
+def test_existing_entity_with_other_arguments_is_conflict_on_first_declare(definition):
+    async def scenario():
+        broker = FakeBroker()
+        connection = await broker.connection_factory()
+        channel = await connection.channel()
+        await channel.declare_queue("main.events", durable=True, arguments={"x-queue-type": "classic"})
+
+        infrastructure_config = InfrastructureConfig.model_validate(definition)
+        pool = ChannelPool(connection, broker.channel_factory, max_size=2)
+        report = await TopologyDeclarer(pool, concurrency=2).declare(infrastructure_config)
+        assert [cfg.name for cfg in report.conflicts] == ["main.events"]
+        assert broker.route("minio_events", "minio.bucket.events") == ["main.events"]
+
+        report = await TopologyDeclarer(pool, concurrency=2, recreate=True).declare(infrastructure_config)
+        assert [cfg.name for cfg in report.recreated] == ["main.events"]
+        assert broker.queues["main.events"].arguments == definition["queues"][0]["arguments"]
+        assert broker.route("minio_events", "minio.bucket.events") == ["main.events"]
+        await pool.close()
+
+    run(scenario())
+
+
+def test_conflicts_keep_applied_entry_or_are_dropped(definition):
+    applied = TopologySnapshot.from_config(InfrastructureConfig.model_validate(definition))
+    definition["queues"][0]["arguments"]["x-max-length"] = 1000
+    definition["queues"].append({"name": "foreign.queue", "vhost": "/", "durable": True, "arguments": {}})
+    infrastructure_config = InfrastructureConfig.model_validate(definition)
+    snapshot = TopologySnapshot.from_config(infrastructure_config)
+    changed, foreign = infrastructure_config.queues[0], infrastructure_config.queues[-1]
+
+    plan = snapshot.diff(snapshot.with_conflicts([changed, foreign], applied))
+    assert [cfg.name for cfg in plan.queues.changed] == ["main.events"]
+    assert [cfg.name for cfg in plan.queues.added] == ["foreign.queue"]